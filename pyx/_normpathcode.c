@@ -0,0 +1,614 @@
+/*  _normpathcode.c: Copyright 2026 PyX developers
+ *  This program is distributed in the hope that it will be useful,
+ *  but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, write to the Free Software
+ *  Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307,
+ *  USA.
+ */
+
+/* C implementation of the geometry kernels in normpathcode.py and of
+ * mathutils.realpolyroots. See the Python code for comments on the
+ * algorithms. */
+
+#define PY_SSIZE_T_CLEAN
+
+#include <Python.h>
+#include <math.h>
+#include <stdlib.h>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+
+/* real roots of polynomials (see mathutils.py) */
+
+static int realroots_quadratic(double a1, double a0, double *roots)
+{
+    double D = a1*a1 - 4*a0, SD;
+    if (D < 0)
+        return 0;
+    SD = sqrt(D);
+    roots[0] = 0.5 * (-a1 + SD);
+    roots[1] = 0.5 * (-a1 - SD);
+    return 2;
+}
+
+static int realroots_cubic(double a2, double a1, double a0, double *roots)
+{
+    double Q = (3*a1 - a2*a2) / 9.0;
+    double R = (9*a2*a1 - 27*a0 - 2*a2*a2*a2) / 54.0;
+    double D = Q*Q*Q + R*R;
+
+    if (D > 0) {
+        double SD = sqrt(D), S, T;
+        if (R + SD >= 0)
+            S = pow(R + SD, 1/3.0);
+        else
+            S = -pow(-R - SD, 1/3.0);
+        if (R - SD >= 0)
+            T = pow(R - SD, 1/3.0);
+        else
+            T = -pow(SD - R, 1/3.0);
+        roots[0] = S + T - a2/3.0;
+        return 1;
+    }
+    else if (D == 0) {
+        if (Q == 0) {
+            roots[0] = -a2/3.0;
+            return 1;
+        }
+        else {
+            double S = -sqrt(-Q);
+            roots[0] = 2*S - a2/3.0;
+            roots[1] = -S - a2/3.0;
+            return 2;
+        }
+    }
+    else {
+        double SQ = sqrt(-Q);
+        double arg = R / pow(SQ, 3);
+        double theta;
+        int i;
+        if (arg >= 1)
+            theta = 0;
+        else if (arg <= -1)
+            theta = M_PI;
+        else
+            theta = acos(arg);
+        for (i=0; i<3; i++)
+            roots[i] = 2 * SQ * cos((theta + (2*2*i)*M_PI)/3.0) - a2/3.0;
+        return 3;
+    }
+}
+
+static int realroots_quartic(double a3, double a2, double a1, double a0, double *roots)
+{
+    double ys[3], y1;
+    int n, i, m = 0;
+
+    n = realroots_cubic(-a2, a1*a3 - 4*a0, 4*a0*a2 - a1*a1 - a0*a3*a3, ys);
+    for (i=0; i<n; i++)
+        if (a3*a3-4*a2+4*ys[i] >= 0 && ys[i]*ys[i]-4*a0 >= 0)
+            ys[m++] = ys[i];
+    if (!m)
+        return 0;
+    y1 = ys[0];
+    for (i=1; i<m; i++)
+        if (ys[i] < y1)
+            y1 = ys[i];
+    if (a3*y1-2*a1 < 0) {
+        n = realroots_quadratic(0.5*(a3+sqrt(a3*a3-4*a2+4*y1)), 0.5*(y1-sqrt(y1*y1-4*a0)), roots);
+        return n + realroots_quadratic(0.5*(a3-sqrt(a3*a3-4*a2+4*y1)), 0.5*(y1+sqrt(y1*y1-4*a0)), roots+n);
+    }
+    else {
+        n = realroots_quadratic(0.5*(a3+sqrt(a3*a3-4*a2+4*y1)), 0.5*(y1+sqrt(y1*y1-4*a0)), roots);
+        return n + realroots_quadratic(0.5*(a3-sqrt(a3*a3-4*a2+4*y1)), 0.5*(y1-sqrt(y1*y1-4*a0)), roots+n);
+    }
+}
+
+/* Stores the roots of the polynomial with the n coefficients cs in roots
+ * (which must have space for 4 values) and returns their number. Returns -1
+ * and sets an exception for polynomials of a degree larger than 4. */
+static int realpolyroots(const double *cs, Py_ssize_t n, double *roots)
+{
+    double f, c[4];
+    Py_ssize_t i;
+
+    while (n && cs[0] == 0) {
+        cs++;
+        n--;
+    }
+    if (!n) {
+        roots[0] = 0;
+        return 1;
+    }
+    if (n > 5) {
+        PyErr_SetString(PyExc_RuntimeError, "realpolyroots solver currently limited to polynoms up to the power of 4");
+        return -1;
+    }
+    f = 1.0/cs[0];
+    for (i=1; i<n; i++)
+        c[i-1] = f*cs[i];
+    switch (n-1) {
+        case 0:
+            return 0;
+        case 1:
+            roots[0] = -c[0];
+            return 1;
+        case 2:
+            return realroots_quadratic(c[0], c[1], roots);
+        case 3:
+            return realroots_cubic(c[0], c[1], c[2], roots);
+        default:
+            return realroots_quartic(c[0], c[1], c[2], c[3], roots);
+    }
+}
+
+static PyObject *py_realpolyroots(PyObject *self, PyObject *args)
+{
+    double cs[5], roots[4];
+    Py_ssize_t n = PyTuple_GET_SIZE(args), i;
+    int m;
+    PyObject *result, *root;
+
+    if (n > 5) {
+        PyErr_SetString(PyExc_RuntimeError, "realpolyroots solver currently limited to polynoms up to the power of 4");
+        return NULL;
+    }
+    for (i=0; i<n; i++) {
+        cs[i] = PyFloat_AsDouble(PyTuple_GET_ITEM(args, i));
+        if (cs[i] == -1 && PyErr_Occurred())
+            return NULL;
+    }
+    if ((m = realpolyroots(cs, n, roots)) < 0)
+        return NULL;
+    if (!(result = PyList_New(m)))
+        return NULL;
+    for (i=0; i<m; i++) {
+        if (!(root = PyFloat_FromDouble(roots[i]))) {
+            Py_DECREF(result);
+            return NULL;
+        }
+        PyList_SET_ITEM(result, i, root);
+    }
+    return result;
+}
+
+
+/* curve splitting and flattening */
+
+static PyObject *py_splitcurve_pt(PyObject *self, PyObject *args)
+{
+    double x0, y0, x1, y1, x2, y2, x3, y3, t, s;
+    double x01, y01, x12, y12, x23, y23, x01_12, y01_12, x12_23, y12_23, xm, ym;
+
+    if (!PyArg_ParseTuple(args, "ddddddddd", &x0, &y0, &x1, &y1, &x2, &y2, &x3, &y3, &t))
+        return NULL;
+    s = 1-t;
+    x01 = s*x0 + t*x1;
+    y01 = s*y0 + t*y1;
+    x12 = s*x1 + t*x2;
+    y12 = s*y1 + t*y2;
+    x23 = s*x2 + t*x3;
+    y23 = s*y2 + t*y3;
+    x01_12 = s*x01 + t*x12;
+    y01_12 = s*y01 + t*y12;
+    x12_23 = s*x12 + t*x23;
+    y12_23 = s*y12 + t*y23;
+    xm = s*x01_12 + t*x12_23;
+    ym = s*y01_12 + t*y12_23;
+    return Py_BuildValue("(dddddddd)(dddddddd)",
+                         x0, y0, x01, y01, x01_12, y01_12, xm, ym,
+                         xm, ym, x12_23, y12_23, x23, y23, x3, y3);
+}
+
+static PyObject *py_flatline_pt(PyObject *self, PyObject *args)
+{
+    double x0, y0, x1, y1, x2, y2, x3, y3, epsilon;
+    double l0, l1, l2, l3;
+    int intersect;
+
+    if (!PyArg_ParseTuple(args, "(dddddddd)dp", &x0, &y0, &x1, &y1, &x2, &y2, &x3, &y3, &epsilon, &intersect))
+        return NULL;
+    l0 = hypot(x3-x0, y3-y0);
+    l1 = hypot(x1-x0, y1-y0);
+    l2 = hypot(x2-x1, y2-y1);
+    l3 = hypot(x3-x2, y3-y2);
+
+    if (!intersect) {
+        if (l1+l2+l3-l0 < epsilon)
+            return Py_BuildValue("ddd", l1, l2, l3);
+        Py_RETURN_NONE;
+    }
+
+    if (fabs((x3-x0)*(y0-y1) - (x0-x1)*(y3-y0)) < epsilon*l0 &&
+        fabs((x0-x3)*(y3-y2) - (x3-x2)*(y0-y3)) < epsilon*l0) {
+        double s1 = (x1-x0)*(x3-x0)+(y1-y0)*(y3-y0);
+        double s2 = (x2-x1)*(x3-x0)+(y2-y1)*(y3-y0);
+        double s3 = (x2-x3)*(x0-x3)+(y2-y3)*(y0-y3);
+        if ((s1 > 0 || l1 < epsilon) &&
+            (s2 > 0 || l2 < epsilon) &&
+            (s3 > 0 || l3 < epsilon))
+            return Py_BuildValue("ddd", l1, l2, l3);
+    }
+    Py_RETURN_NONE;
+}
+
+typedef struct {
+    double t0, dt, epsilon;
+    double x0, y0, x1, y1, x2, y2, x3, y3;
+    int line;
+} flattenpart;
+
+static PyObject *py_flatten_pt(PyObject *self, PyObject *args)
+{
+    flattenpart *stack, *part, *newstack;
+    Py_ssize_t size = 64, n = 0;
+    PyObject *result, *line;
+    double epsilon;
+
+    if (!(stack = (flattenpart *) malloc(size*sizeof(flattenpart))))
+        return PyErr_NoMemory();
+    part = stack;
+    if (!PyArg_ParseTuple(args, "ddddddddd", &part->x0, &part->y0, &part->x1, &part->y1,
+                          &part->x2, &part->y2, &part->x3, &part->y3, &epsilon)) {
+        free(stack);
+        return NULL;
+    }
+    part->t0 = 0;
+    part->dt = 1;
+    part->epsilon = epsilon;
+    part->line = 0;
+    n = 1;
+    if (!(result = PyList_New(0))) {
+        free(stack);
+        return NULL;
+    }
+
+    /* The parts are processed depth first with the left part on top of the
+     * stack, such that the lines are created in order. For lines, x1, y1,
+     * x2, y2 hold the lengths of the control polygon and x3, y3 the end
+     * point. */
+    while (n) {
+        flattenpart p = stack[--n];
+        double x01, y01, x12, y12, x23, y23, x01_12, y01_12, x12_23, y12_23, xm, ym;
+        double l1, l2, l3;
+
+        if (p.line) {
+            if (!(line = Py_BuildValue("ddddddddd", p.t0, p.dt, p.x0, p.y0, p.x3, p.y3, p.x1, p.y1, p.x2)) ||
+                PyList_Append(result, line)) {
+                Py_XDECREF(line);
+                Py_DECREF(result);
+                free(stack);
+                return NULL;
+            }
+            Py_DECREF(line);
+            continue;
+        }
+        if (n + 2 > size) {
+            size *= 2;
+            if (!(newstack = (flattenpart *) realloc(stack, size*sizeof(flattenpart)))) {
+                Py_DECREF(result);
+                free(stack);
+                return PyErr_NoMemory();
+            }
+            stack = newstack;
+        }
+
+        x01 = 0.5*p.x0 + 0.5*p.x1;
+        y01 = 0.5*p.y0 + 0.5*p.y1;
+        x12 = 0.5*p.x1 + 0.5*p.x2;
+        y12 = 0.5*p.y1 + 0.5*p.y2;
+        x23 = 0.5*p.x2 + 0.5*p.x3;
+        y23 = 0.5*p.y2 + 0.5*p.y3;
+        x01_12 = 0.5*x01 + 0.5*x12;
+        y01_12 = 0.5*y01 + 0.5*y12;
+        x12_23 = 0.5*x12 + 0.5*x23;
+        y12_23 = 0.5*y12 + 0.5*y23;
+        xm = 0.5*x01_12 + 0.5*x12_23;
+        ym = 0.5*y01_12 + 0.5*y12_23;
+        p.dt *= 0.5;
+        if (!p.dt) {
+            Py_DECREF(result);
+            free(stack);
+            PyErr_SetString(PyExc_RuntimeError, "maximal splitting depth exceeded when flattening a curve");
+            return NULL;
+        }
+
+        /* right part */
+        part = stack + n++;
+        part->t0 = p.t0 + p.dt;
+        part->dt = p.dt;
+        part->x0 = xm;
+        part->y0 = ym;
+        part->x3 = p.x3;
+        part->y3 = p.y3;
+        l1 = hypot(x12_23-xm, y12_23-ym);
+        l2 = hypot(x23-x12_23, y23-y12_23);
+        l3 = hypot(p.x3-x23, p.y3-y23);
+        if (l1+l2+l3-hypot(p.x3-xm, p.y3-ym) < p.epsilon) {
+            part->line = 1;
+            part->x1 = l1;
+            part->y1 = l2;
+            part->x2 = l3;
+        }
+        else {
+            part->line = 0;
+            part->epsilon = 0.5*p.epsilon;
+            part->x1 = x12_23;
+            part->y1 = y12_23;
+            part->x2 = x23;
+            part->y2 = y23;
+        }
+
+        /* left part */
+        part = stack + n++;
+        part->t0 = p.t0;
+        part->dt = p.dt;
+        part->x0 = p.x0;
+        part->y0 = p.y0;
+        part->x3 = xm;
+        part->y3 = ym;
+        l1 = hypot(x01-p.x0, y01-p.y0);
+        l2 = hypot(x01_12-x01, y01_12-y01);
+        l3 = hypot(xm-x01_12, ym-y01_12);
+        if (l1+l2+l3-hypot(xm-p.x0, ym-p.y0) < p.epsilon) {
+            part->line = 1;
+            part->x1 = l1;
+            part->y1 = l2;
+            part->x2 = l3;
+        }
+        else {
+            part->line = 0;
+            part->epsilon = 0.5*p.epsilon;
+            part->x1 = x01;
+            part->y1 = y01;
+            part->x2 = x01_12;
+            part->y2 = y01_12;
+        }
+    }
+    free(stack);
+    return result;
+}
+
+static PyObject *py_lineparam(PyObject *self, PyObject *args)
+{
+    double param, l1, l2, l3, cs[4], roots[4], best;
+    int n, i;
+
+    if (!PyArg_ParseTuple(args, "dddd", &param, &l1, &l2, &l3))
+        return NULL;
+    if (!(0 <= param && param <= 1))
+        return PyFloat_FromDouble(param);
+    cs[0] = l1-2*l2+l3;
+    cs[1] = -3*l1+3*l2;
+    cs[2] = 3*l1;
+    cs[3] = -param*(l1+l2+l3);
+    if ((n = realpolyroots(cs, 4, roots)) < 0)
+        return NULL;
+    if (!n) {
+        PyErr_SetString(PyExc_IndexError, "list index out of range");
+        return NULL;
+    }
+    /* choose the solution closest to 0.5 */
+    best = roots[0];
+    for (i=1; i<n; i++)
+        if (fabs(roots[i]-0.5) < fabs(best-0.5))
+            best = roots[i];
+    return PyFloat_FromDouble(best);
+}
+
+
+/* evaluation of curves */
+
+static PyObject *py_curveat_pt(PyObject *self, PyObject *args)
+{
+    double x0, y0, x1, y1, x2, y2, x3, y3;
+    double a3x, a2x, a1x, a3y, a2y, a1y;
+    PyObject *params, *seq, *result;
+    Py_ssize_t n, i;
+
+    if (!PyArg_ParseTuple(args, "ddddddddO", &x0, &y0, &x1, &y1, &x2, &y2, &x3, &y3, &params))
+        return NULL;
+    if (!(seq = PySequence_Fast(params, "params must be a sequence")))
+        return NULL;
+    a3x = -x0+3*x1-3*x2+x3;
+    a2x = 3*x0-6*x1+3*x2;
+    a1x = -3*x0+3*x1;
+    a3y = -y0+3*y1-3*y2+y3;
+    a2y = 3*y0-6*y1+3*y2;
+    a1y = -3*y0+3*y1;
+    n = PySequence_Fast_GET_SIZE(seq);
+    if (!(result = PyList_New(n))) {
+        Py_DECREF(seq);
+        return NULL;
+    }
+    for (i=0; i<n; i++) {
+        double t = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(seq, i));
+        PyObject *point;
+        if ((t == -1 && PyErr_Occurred()) ||
+            !(point = Py_BuildValue("dd", a3x*t*t*t + a2x*t*t + a1x*t + x0,
+                                          a3y*t*t*t + a2y*t*t + a1y*t + y0))) {
+            Py_DECREF(result);
+            Py_DECREF(seq);
+            return NULL;
+        }
+        PyList_SET_ITEM(result, i, point);
+    }
+    Py_DECREF(seq);
+    return result;
+}
+
+static PyObject *py_curvecurvature_pt(PyObject *self, PyObject *args)
+{
+    double x0, y0, x1, y1, x2, y2, x3, y3;
+    double d1x0, d1x1, d1x2, d1y0, d1y1, d1y2, d2x0, d2x1, d2y0, d2y1;
+    PyObject *params, *seq, *result, *curvature;
+    Py_ssize_t n, i;
+
+    if (!PyArg_ParseTuple(args, "ddddddddO", &x0, &y0, &x1, &y1, &x2, &y2, &x3, &y3, &params))
+        return NULL;
+    if (!(seq = PySequence_Fast(params, "params must be a sequence")))
+        return NULL;
+    d1x0 = -x0 + x1;
+    d1x1 = -x1 + x2;
+    d1x2 = -x2 + x3;
+    d1y0 = -y0 + y1;
+    d1y1 = -y1 + y2;
+    d1y2 = -y2 + y3;
+    d2x0 = x0 - 2*x1 + x2;
+    d2x1 = x1 - 2*x2 + x3;
+    d2y0 = y0 - 2*y1 + y2;
+    d2y1 = y1 - 2*y2 + y3;
+    n = PySequence_Fast_GET_SIZE(seq);
+    if (!(result = PyList_New(n))) {
+        Py_DECREF(seq);
+        return NULL;
+    }
+    for (i=0; i<n; i++) {
+        double param = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(seq, i));
+        double xdot, ydot, xddot, yddot, h3;
+        if (param == -1 && PyErr_Occurred()) {
+            Py_DECREF(result);
+            Py_DECREF(seq);
+            return NULL;
+        }
+        xdot = 3 * (1-param)*(1-param) * d1x0 + 6 * (1-param)*param * d1x1 + 3 * param*param * d1x2;
+        ydot = 3 * (1-param)*(1-param) * d1y0 + 6 * (1-param)*param * d1y1 + 3 * param*param * d1y2;
+        xddot = 6 * (1-param) * d2x0 + 6 * param * d2x1;
+        yddot = 6 * (1-param) * d2y0 + 6 * param * d2y1;
+        h3 = pow(hypot(xdot, ydot), 3);
+        if (h3 == 0) {
+            PyErr_SetString(PyExc_ZeroDivisionError, "float division by zero");
+            Py_DECREF(result);
+            Py_DECREF(seq);
+            return NULL;
+        }
+        if (!(curvature = PyFloat_FromDouble((xdot*yddot - ydot*xddot) / h3))) {
+            Py_DECREF(result);
+            Py_DECREF(seq);
+            return NULL;
+        }
+        PyList_SET_ITEM(result, i, curvature);
+    }
+    Py_DECREF(seq);
+    return result;
+}
+
+
+/* intersection of lines */
+
+/* Returns the line parameter in range [0, 1] for which the point (x, y) is
+ * closest to the line defined by ((x0, y0), (x1, y1)) or -1 if the point has
+ * a greater distance than epsilon. */
+static double closepoint(double x, double y, double x0, double y0, double x1, double y1, double epsilon)
+{
+    double p = (((x0 - x)*(x0 - x1) + (y0 - y)*(y0 - y1)) /
+                ((x1 - x0)*(x1 - x0) + (y1 - y0)*(y1 - y0)));
+    if (p > 1)
+        p = 1;
+    if (p < 0)
+        p = 0;
+    if (hypot(x0 + p*(x1 - x0) - x, y0 + p*(y1 - y0) - y) < epsilon)
+        return p;
+    return -1;
+}
+
+static PyObject *py_lineintersect_pt(PyObject *self, PyObject *args)
+{
+    double ax0, ay0, ax1, ay1, bx0, by0, bx1, by1, epsilon;
+    double a_deltax, a_deltay, b_deltax, b_deltay, invdet, det, a_t, b_t;
+
+    if (!PyArg_ParseTuple(args, "ddddddddd", &ax0, &ay0, &ax1, &ay1, &bx0, &by0, &bx1, &by1, &epsilon))
+        return NULL;
+    a_deltax = ax1 - ax0;
+    a_deltay = ay1 - ay0;
+    b_deltax = bx1 - bx0;
+    b_deltay = by1 - by0;
+    invdet = b_deltax * a_deltay - b_deltay * a_deltax;
+
+    if (fabs(invdet) < epsilon * epsilon) {
+        int short_a = hypot(a_deltax, a_deltay) < epsilon;
+        int short_b = hypot(b_deltax, b_deltay) < epsilon;
+        double ax = 0.5*(ax0 + ax1), ay = 0.5*(ay0 + ay1);
+        double bx = 0.5*(bx0 + bx1), by = 0.5*(by0 + by1);
+        double p;
+
+        if (short_a && short_b) {
+            if (hypot(bx - ax, by - ay) < epsilon)
+                return Py_BuildValue("[(dd)]", 0.5, 0.5);
+        }
+        else if (short_a) {
+            if ((p = closepoint(ax, ay, bx0, by0, bx1, by1, epsilon)) >= 0)
+                return Py_BuildValue("[(dd)]", 0.5, p);
+        }
+        else if (short_b) {
+            if ((p = closepoint(bx, by, ax0, ay0, ax1, ay1, epsilon)) >= 0)
+                return Py_BuildValue("[(dd)]", p, 0.5);
+        }
+        else {
+            if ((p = closepoint(ax0, ay0, bx0, by0, bx1, by1, epsilon)) >= 0)
+                return Py_BuildValue("[(dd)]", 0.0, p);
+            if ((p = closepoint(ax1, ay1, bx0, by0, bx1, by1, epsilon)) >= 0)
+                return Py_BuildValue("[(dd)]", 1.0, p);
+            if ((p = closepoint(bx0, by0, ax0, ay0, ax1, ay1, epsilon)) >= 0)
+                return Py_BuildValue("[(dd)]", p, 0.0);
+            if ((p = closepoint(bx1, by1, ax0, ay0, ax1, ay1, epsilon)) >= 0)
+                return Py_BuildValue("[(dd)]", p, 1.0);
+        }
+        return PyList_New(0);
+    }
+
+    det = 1.0 / invdet;
+    a_t = (b_deltax * (by0 - ay0) - b_deltay * (bx0 - ax0)) * det;
+    b_t = (a_deltax * (by0 - ay0) - a_deltay * (bx0 - ax0)) * det;
+
+    if (!(0 <= a_t && a_t <= 1 && 0 <= b_t && b_t <= 1)) {
+        a_t = a_t > 1 ? 1 : (a_t < 0 ? 0 : a_t);
+        b_t = b_t > 1 ? 1 : (b_t < 0 ? 0 : b_t);
+        if (hypot(ax0 + a_deltax*a_t - bx0 - b_deltax*b_t,
+                  ay0 + a_deltay*a_t - by0 - b_deltay*b_t) > epsilon)
+            return PyList_New(0);
+    }
+    return Py_BuildValue("[(dd)]", a_t, b_t);
+}
+
+
+
+/* exported methods */
+
+static PyMethodDef normpathcode_methods[] = {
+    {"realpolyroots", py_realpolyroots, METH_VARARGS, NULL},
+    {"splitcurve_pt", py_splitcurve_pt, METH_VARARGS, NULL},
+    {"flatline_pt", py_flatline_pt, METH_VARARGS, NULL},
+    {"flatten_pt", py_flatten_pt, METH_VARARGS, NULL},
+    {"lineparam", py_lineparam, METH_VARARGS, NULL},
+    {"curveat_pt", py_curveat_pt, METH_VARARGS, NULL},
+    {"curvecurvature_pt", py_curvecurvature_pt, METH_VARARGS, NULL},
+    {"lineintersect_pt", py_lineintersect_pt, METH_VARARGS, NULL},
+    {NULL, NULL}
+};
+
+static struct PyModuleDef moduledef = {
+        PyModuleDef_HEAD_INIT,
+        "_normpathcode",
+        NULL,
+        -1,
+        normpathcode_methods,
+        NULL,
+        NULL,
+        NULL,
+        NULL
+};
+
+PyMODINIT_FUNC
+PyInit__normpathcode(void)
+{
+  PyObject *module = PyModule_Create(&moduledef);
+  return module;
+}
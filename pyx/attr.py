@@ -73,6 +73,8 @@ class attr:
     """ attr is the base class of all attributes, i.e., colors, decorators,
     styles, text attributes and trafos"""
 
+    __slots__ = ()
+
     def merge(self, attrs):
         """merge self into list of attrs
 
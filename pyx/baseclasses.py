@@ -35,6 +35,13 @@ class canvasitem:
         region"""
         return False
 
+    def requiregstate(self):
+        """indicates whether the graphics state requested by the PDF context
+        has to be written before the processPDF method of a canvasitem is
+        called, i.e. whether the canvasitem does not call the writegstate
+        method of the context itself"""
+        return True
+
     def processPS(self, file, writer, context, registry, bbox):
         """process canvasitem by writing the corresponding PS code to file and
         by updating context, registry as well as bbox
@@ -70,6 +77,8 @@ class canvasitem:
 
 class deformer(attr.attr):
 
+    __slots__ = ()
+
     def deform(self, basepath):
         raise NotImplementedError()
 
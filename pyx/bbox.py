@@ -132,37 +132,33 @@ class bbox_pt:
             self.urx_pt = max(self.urx_pt, x_pt)
             self.ury_pt = max(self.ury_pt, y_pt)
 
+    def _transformed_pt(self, trafo):
+        """return the corners of the bbox of the transformed bbox
+
+        Each transformed coordinate is a sum of terms depending on either the
+        x or the y coordinate of a corner. Thus the extrema are obtained by
+        taking the extrema of the terms separately, which is the same as
+        transforming the four corners and sorting them.
+        """
+        (a, b), (c, d) = trafo.matrix
+        e, f = trafo.vector
+        ax1, ax2 = sorted((a*self.llx_pt, a*self.urx_pt))
+        by1, by2 = sorted((b*self.lly_pt, b*self.ury_pt))
+        cx1, cx2 = sorted((c*self.llx_pt, c*self.urx_pt))
+        dy1, dy2 = sorted((d*self.lly_pt, d*self.ury_pt))
+        return ax1 + by1 + e, cx1 + dy1 + f, ax2 + by2 + e, cx2 + dy2 + f
+
     def transform(self, trafo):
         """transform bbox in place by trafo"""
         if self.llx_pt is None:
             return
-        # we have to transform all four corner points of the bbox
-        llx_pt, lly_pt = trafo.apply_pt(self.llx_pt, self.lly_pt)
-        lrx_pt, lry_pt = trafo.apply_pt(self.urx_pt, self.lly_pt)
-        urx_pt, ury_pt = trafo.apply_pt(self.urx_pt, self.ury_pt)
-        ulx_pt, uly_pt = trafo.apply_pt(self.llx_pt, self.ury_pt)
-
-        # Now, by sorting, we obtain the lower left and upper right corner
-        # of the new bounding box.
-        self.llx_pt = min(llx_pt, lrx_pt, urx_pt, ulx_pt)
-        self.lly_pt = min(lly_pt, lry_pt, ury_pt, uly_pt)
-        self.urx_pt = max(llx_pt, lrx_pt, urx_pt, ulx_pt)
-        self.ury_pt = max(lly_pt, lry_pt, ury_pt, uly_pt)
+        self.llx_pt, self.lly_pt, self.urx_pt, self.ury_pt = self._transformed_pt(trafo)
 
     def transformed(self, trafo):
         """return bbox transformed by trafo"""
         if self.llx_pt is None:
             return empty()
-        # we have to transform all four corner points of the bbox
-        llx_pt, lly_pt = trafo.apply_pt(self.llx_pt, self.lly_pt)
-        lrx_pt, lry_pt = trafo.apply_pt(self.urx_pt, self.lly_pt)
-        urx_pt, ury_pt = trafo.apply_pt(self.urx_pt, self.ury_pt)
-        ulx_pt, uly_pt = trafo.apply_pt(self.llx_pt, self.ury_pt)
-
-        # Now, by sorting, we obtain the lower left and upper right corner
-        # of the new bounding box.
-        return bbox_pt(min(llx_pt, lrx_pt, urx_pt, ulx_pt), min(lly_pt, lry_pt, ury_pt, uly_pt),
-                       max(llx_pt, lrx_pt, urx_pt, ulx_pt), max(lly_pt, lry_pt, ury_pt, uly_pt))
+        return bbox_pt(*self._transformed_pt(trafo))
 
     def enlarge_pt(self, all_pt=0, bottom_pt=None, left_pt=None, top_pt=None, right_pt=None):
         """enlarge bbox in place by the given amounts in pts
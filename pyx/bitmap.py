@@ -253,6 +253,8 @@ class PSimagedata(pswriter.PSresource):
 
 class PDFimagepalettedata(pdfwriter.PDFobject):
 
+    isstream = True
+
     def __init__(self, name, data):
         pdfwriter.PDFobject.__init__(self, "imagepalettedata", _id=name)
         self.data = data
@@ -269,8 +271,14 @@ class PDFimagepalettedata(pdfwriter.PDFobject):
 
 class PDFimage(pdfwriter.PDFobject):
 
+    isstream = True
+
     def __init__(self, name, width, height, palettemode, palettedata, mode,
-                       bitspercomponent, compressmode, data, smask, registry, addresource=True):
+                       bitspercomponent, compressmode, data, smask, registry, addresource=True, compresslevel=None):
+        """create an image object
+
+        For compresslevel not being None, data is flate compressed at this
+        level by the writer when writing the image."""
         pdfwriter.PDFobject.__init__(self, "image", _id=name)
 
         if addresource:
@@ -296,8 +304,17 @@ class PDFimage(pdfwriter.PDFobject):
         self.compressmode = compressmode
         self.data = data
         self.smask = smask
+        self.compresslevel = compresslevel
+
+    def streamdata(self, writer):
+        if self.compresslevel is not None:
+            return self.data
 
     def write(self, file, writer, registry):
+        if self.compresslevel is not None:
+            data = writer.compressstream(self.type, self.data, self.compresslevel)
+        else:
+            data = self.data
         file.write("<<\n"
                    "/Type /XObject\n"
                    "/Subtype /Image\n"
@@ -312,12 +329,12 @@ class PDFimage(pdfwriter.PDFobject):
         if self.smask:
             file.write("/SMask %d 0 R\n" % registry.getrefno(self.smask))
         file.write("/BitsPerComponent %d\n" % self.bitspercomponent)
-        file.write("/Length %d\n" % len(self.data))
+        file.write("/Length %d\n" % len(data))
         if self.compressmode:
             file.write("/Filter /%sDecode\n" % self.compressmode)
         file.write(">>\n"
                    "stream\n")
-        file.write_bytes(self.data)
+        file.write_bytes(data)
         file.write("\n"
                    "endstream\n")
 
@@ -356,10 +373,13 @@ class bitmap_trafo(baseclasses.canvasitem):
             logger.warning("zlib module not available, disable compression")
             self.compressmode = None
 
-    def imagedata(self, interleavealpha):
+    def imagedata(self, interleavealpha, flatecompress=True):
         """ Returns a tuple (mode, data, alpha, palettemode, palettedata, imagehash)
         where mode does not contain the alpha channel anymore.
 
+        For flatecompress == False the flate compression of data and alpha
+        is left to the caller.
+
         If there is an alpha channel, for interleavealpha == False it is
         returned as a band in alpha itself. For interleavealpha == True
         alpha will be True and the channel is interleaved in front of each
@@ -416,7 +436,9 @@ class bitmap_trafo(baseclasses.canvasitem):
             mode = "RGB"
 
         if self.compressmode == "Flate":
-            data = zlib.compress(data.tobytes(), self.flatecompresslevel)
+            data = data.tobytes()
+            if flatecompress:
+                data = zlib.compress(data, self.flatecompresslevel)
         elif self.compressmode == "DCT":
             data = data.tobytes("jpeg", mode, self.dctquality, self.dctoptimize, self.dctprogression)
         else:
@@ -424,7 +446,9 @@ class bitmap_trafo(baseclasses.canvasitem):
         if alpha and not interleavealpha:
             # we might want a separate alphacompressmode
             if self.compressmode == "Flate":
-                alpha = zlib.compress(alpha.tobytes(), self.flatecompresslevel)
+                alpha = alpha.tobytes()
+                if flatecompress:
+                    alpha = zlib.compress(alpha, self.flatecompresslevel)
             elif self.compressmode == "DCT":
                 alpha = alpha.tobytes("jpeg", mode, self.dctquality, self.dctoptimize, self.dctprogression)
             else:
@@ -538,17 +562,22 @@ class bitmap_trafo(baseclasses.canvasitem):
         file.write("grestore\n")
 
     def processPDF(self, file, writer, context, registry, bbox):
-        mode, data, alpha, palettemode, palettedata, imagehash = self.imagedata(False)
+        # flate compression is done by the writer
+        mode, data, alpha, palettemode, palettedata, imagehash = self.imagedata(False, flatecompress=False)
+        if self.compressmode == "Flate":
+            compresslevel = self.flatecompresslevel
+        else:
+            compresslevel = None
 
         name = "image-%s-%s" % (imagehash, self.compressmode or self.imagecompressed)
         if alpha:
             alpha = PDFimage("%s-smask" % name, self.imagewidth, self.imageheight,
                              None, None, "L", 8,
-                             self.compressmode, alpha, None, registry, addresource=False)
+                             self.compressmode, alpha, None, registry, addresource=False, compresslevel=compresslevel)
             registry.add(alpha)
         registry.add(PDFimage(name, self.imagewidth, self.imageheight,
                               palettemode, palettedata, mode, 8,
-                              self.compressmode or self.imagecompressed, data, alpha, registry))
+                              self.compressmode or self.imagecompressed, data, alpha, registry, compresslevel=compresslevel))
 
         bbox += self.bbox()
 
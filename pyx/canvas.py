@@ -26,7 +26,8 @@ A canvas holds a collection of all elements and corresponding attributes to be
 displayed. """
 
 import io, logging, os, sys, string, tempfile
-from . import attr, baseclasses, config, document, style, trafo, svgwriter, unit
+from . import attr, baseclasses, config, document, pdfwriter, pswriter, style, trafo, svgwriter, unit
+from . import writer as writermodule
 from . import bbox as bboxmodule
 
 logger = logging.getLogger("pyx")
@@ -92,6 +93,73 @@ class clip(attr.attr):
         attrs["clip-path"] = "url(#%s)" % clippath.svgid
 
 
+#
+# output of canvases inserted several times
+#
+
+class PDFform(pdfwriter.PDFobject):
+
+    isstream = True
+
+    def __init__(self, name, bbox, strokeextent_pt, content, formregistry):
+        # the name is unique within the page only, the form is identified by the default id
+        pdfwriter.PDFobject.__init__(self, "formxobject")
+        self.name = name
+        self.bbox = bbox
+        self.strokeextent_pt = strokeextent_pt
+        self.content = content
+        self.formregistry = formregistry
+
+    def streamdata(self, writer):
+        return self.content
+
+    def write(self, file, writer, registry):
+        file.write("<<\n"
+                   "/Type /XObject\n"
+                   "/Subtype /Form\n")
+        if self.bbox:
+            # the form is clipped at its bounding box, which needs to include
+            # miter joins and square caps of the strokes
+            formbbox = self.bbox.enlarged_pt(self.strokeextent_pt)
+            file.write("/BBox [%f %f %f %f]\n" % formbbox.highrestuple_pt())
+        else:
+            file.write("/BBox [0 0 0 0]\n")
+        file.write("/Resources ")
+        self.formregistry.writeresources(file)
+        if writer.compress:
+            content = writer.compressstream(self.type, self.content)
+        else:
+            content = self.content
+
+        file.write("/Length %i\n" % len(content))
+        if writer.compress:
+            file.write("/Filter /FlateDecode\n")
+        file.write(">>\n"
+                   "stream\n")
+        file.write_bytes(content)
+        file.write("endstream\n")
+
+
+class SVGgroup(svgwriter.SVGresource):
+
+    def __init__(self, svgid, acanvas, context, writer):
+        self.svgid = svgid
+        super().__init__("group", self.svgid)
+        self.canvas = acanvas
+        self.context = context
+        # the group is written with the resources at the end, but its
+        # bounding box is needed for each use already
+        groupxml = svgwriter.SVGGenerator(io.BytesIO())
+        groupxml.startSVGDocument()
+        self.bbox = bboxmodule.empty()
+        acanvas._processSVG(groupxml, writer, context(), svgwriter.SVGregistry(), self.bbox)
+
+    def output(self, xml, writer, registry):
+        xml.startSVGElement("g", {"id": self.svgid})
+        self.canvas._processSVG(xml, writer, self.context(), registry, bboxmodule.empty())
+        xml.endSVGElement("g")
+
+
 #
 # general canvas class
 #
@@ -119,6 +187,9 @@ class canvas(baseclasses.canvasitem):
         """
 
         self.items = []
+        # number of insertions into other canvases; a canvas inserted several
+        # times is written only once to the output and reused afterwards
+        self._insertcount = 0
         self.trafo = trafo.identity
         self.clip = None
         self.layers = {}
@@ -148,6 +219,19 @@ class canvas(baseclasses.canvasitem):
                     raise ValueError("single clipping allowed only")
                 self.clip = clip(aattr.path.transformed(self.trafo))
 
+    def __getstate__(self):
+        # the text engine is not pickled (it may run a TeX interpreter) and is
+        # replaced by the default text engine when unpickling
+        state = self.__dict__.copy()
+        del state["textengine"]
+        return state
+
+    def __setstate__(self, state):
+        # prevent cyclic imports
+        from . import text
+        self.__dict__.update(state)
+        self.textengine = text.defaulttextengine
+
     def __len__(self):
         return len(self.items)
 
@@ -191,7 +275,84 @@ class canvas(baseclasses.canvasitem):
             obbox *= self.clip.path.bbox()
         return obbox
 
+    def requiregstate(self):
+        return False
+
+    def _reusable(self):
+        """check whether the output of the canvas can be reused
+
+        The canvas may contain nested canvases, decorated paths and texts only,
+        but no patterns, which would be placed relative to the reused output.
+        """
+        from . import deco, pattern, text
+        for attr in self.styles:
+            if isinstance(attr, pattern.pattern):
+                return False
+        for item in self.items:
+            if isinstance(item, canvas):
+                if not item._reusable():
+                    return False
+            elif isinstance(item, deco.decoratedpath):
+                for attr in (item.styles or []) + (item.strokestyles or []) + (item.fillstyles or []):
+                    if isinstance(attr, pattern.pattern):
+                        return False
+                if not item.ornaments._reusable():
+                    return False
+            elif not isinstance(item, text.textbox_pt):
+                return False
+        return True
+
+    def _procedurePS(self, writer, context, registry):
+        """return name and bbox of the procedure of a canvas inserted several times
+
+        The procedure takes the translation to be applied to the output of
+        the canvas. When the canvas cannot be reused, None is returned for
+        the name, and its output is returned for the first time instead of
+        the bbox (None later on).
+        """
+        key = id(self), context.linewidth_pt, context.fillrule
+        if key in context.procedures:
+            return context.procedures[key], None
+        context.procedures[key] = None
+        if not self._reusable():
+            return None, None
+        procfile = writermodule.writer(io.BytesIO())
+        nbbox = bboxmodule.empty()
+        self._processPS(procfile, writer, context(selectedfont=None), registry, nbbox)
+        procedure = procfile.getvalue()
+        name = "canvas%i" % (len(context.proceduredefinitions) + 1)
+        # the procedure pays off only when its body is larger than a call,
+        # and it has to be within the array size limit of PostScript implementations
+        if len(procedure) <= len("%f %f %s\n" % (0, 0, name)) or len(procedure) >= 65535:
+            return None, (procedure, nbbox)
+        context.proceduredefinitions.append(b"/%s {\ngsave translate\n%sgrestore\n} bind def\n" % (name.encode("ascii"), procedure))
+        context.procedures[key] = name, nbbox
+        return context.procedures[key], None
+
     def processPS(self, file, writer, context, registry, bbox):
+        if self._insertcount > 1 and self.items:
+            reusedcanvas, atrafo = self, trafo.identity
+        elif (len(self.items) == 1 and isinstance(self.items[0], canvas) and self.items[0]._insertcount > 1 and
+              not self.styles and self.clip is None and self.trafo._istranslation()):
+            # a canvas inserted with a translation only passes it to the procedure of the inserted canvas
+            reusedcanvas, atrafo = self.items[0], self.trafo
+        else:
+            reusedcanvas = None
+        if reusedcanvas is not None and reusedcanvas.items:
+            procedure, output = reusedcanvas._procedurePS(writer, context, registry)
+            if procedure is not None:
+                name, nbbox = procedure
+                file.write("%f %f %s\n" % (atrafo._v0, atrafo._v1, name))
+                bbox += nbbox.transformed(atrafo)
+                return
+            if output is not None and reusedcanvas is self:
+                # use the output created for the procedure
+                file.write_bytes(output[0])
+                bbox += output[1]
+                return
+        self._processPS(file, writer, context, registry, bbox)
+
+    def _processPS(self, file, writer, context, registry, bbox):
         context = context()
         if self.items:
             if self.modifies_state:
@@ -214,22 +375,57 @@ class canvas(baseclasses.canvasitem):
                 file.write("grestore\n")
 
     def processPDF(self, file, writer, context, registry, bbox):
-        context = context()
-        textregion = False
-        context.trafo = context.trafo * self.trafo
+        if self._insertcount > 1 and self.items:
+            # a canvas inserted several times is written as a form xobject for
+            # the graphics state in effect
+            context.writegstate(file, registry)
+            key = id(self), tuple(sorted(context.gstate.items())), context.linewidth_pt, context.fillrule
+            if key not in context.forms:
+                context.forms[key] = None
+                # the name is taken before forms of nested canvases are added
+                name = "canvas%i" % len(context.forms)
+                if self._reusable():
+                    formregistry = pdfwriter.PDFregistry()
+                    formfile = writermodule.writer(io.BytesIO())
+                    nbbox = bboxmodule.empty()
+                    formcontext = context(selectedfont=None, gstate=context.gstate.copy(), strokeextents=[])
+                    self._processPDF(formfile, writer, formcontext, formregistry, nbbox)
+                    registry.mergeregistry(formregistry)
+                    context.forms[key] = PDFform(name, nbbox, context.pagestrokeextent_pt(formcontext.strokeextents),
+                                                 formfile.getvalue(), formregistry)
+            form = context.forms[key]
+            if form is not None:
+                registry.add(form)
+                registry.addresource("XObject", form.name, form)
+                file.write("/%s Do\n" % form.name)
+                bbox += form.bbox
+                context.addstrokeextent(form.strokeextent_pt)
+                return
+        self._processPDF(file, writer, context, registry, bbox)
+
+    def _processPDF(self, file, writer, context, registry, bbox):
         if self.items:
-            if self.modifies_state:
-                file.write("q\n") # gsave
-                for attr in self.styles:
-                    if isinstance(attr, style.fillstyle):
-                        context.fillstyles.append(attr)
-                    attr.processPDF(file, writer, context, registry)
-                if self.clip is not None:
-                    self.clip.processPDF(file, writer, context, registry)
-                if self.trafo is not trafo.identity:
-                    self.trafo.processPDF(file, writer, context, registry)
+            context = context()
+            textregion = False
+            context.trafo = context.trafo * self.trafo
+            # styles are requested in the scope of the context and written
+            # by the items as needed, i.e. a q/Q pair is needed for the clip
+            # and the trafo only
+            savegstate = self.clip is not None or self.trafo is not trafo.identity
+            if savegstate:
+                context.savegstate(file)
+            for attr in self.styles:
+                if isinstance(attr, style.fillstyle):
+                    context.fillstyles.append(attr)
+                attr.processPDF(file, writer, context, registry)
+            if self.clip is not None:
+                self.clip.processPDF(file, writer, context, registry)
+            if self.trafo is not trafo.identity:
+                self.trafo.processPDF(file, writer, context, registry)
             nbbox = bboxmodule.empty()
             for item in self.items:
+                if item.requiregstate():
+                    context.writegstate(file, registry)
                 if not writer.textaspath:
                     if item.requiretextregion():
                         if not textregion:
@@ -250,10 +446,30 @@ class canvas(baseclasses.canvasitem):
             if self.clip is not None:
                 nbbox *= self.clip.path.bbox()
             bbox += nbbox
-            if self.modifies_state:
+            if savegstate:
                 file.write("Q\n") # grestore
 
     def processSVG(self, xml, writer, context, registry, bbox):
+        if self._insertcount > 1 and self.items:
+            # a canvas inserted several times is defined as a group
+            key = (id(self), context.linewidth_pt, context.strokeattr, context.fillattr,
+                   context.strokecolor, context.fillcolor, context.strokeopacity, context.fillopacity)
+            if key not in context.groups:
+                context.groups[key] = None
+                # the name is taken before groups of nested canvases are added
+                name = "canvas%i" % len(context.groups)
+                if self._reusable():
+                    context.groups[key] = SVGgroup(name, self, context(), writer)
+            group = context.groups[key]
+            if group is not None:
+                registry.add(group)
+                xml.startSVGElement("use", {"xlink:href": "#%s" % group.svgid})
+                xml.endSVGElement("use")
+                bbox += group.bbox
+                return
+        self._processSVG(xml, writer, context, registry, bbox)
+
+    def _processSVG(self, xml, writer, context, registry, bbox):
         if self.items:
             if self.modifies_state:
                 context = context()
@@ -346,6 +562,8 @@ class canvas(baseclasses.canvasitem):
             sc = canvas(attrs)
             sc.insert(item)
             item = sc
+        if isinstance(item, canvas):
+            item._insertcount += 1
 
         self.items.append(item)
         return item
@@ -22,7 +22,7 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
 import binascii, colorsys, logging, math, struct
-from . import attr, style, pdfwriter
+from . import attr, style
 
 logger = logging.getLogger("pyx")
 
@@ -81,9 +81,9 @@ class gray(color):
 
     def processPDF(self, file, writer, context, registry):
         if context.strokeattr:
-            file.write("%f G\n" % self.g)
+            context.setgstate("strokecolor", "%f G\n" % self.g)
         if context.fillattr:
-            file.write("%f g\n" % self.g)
+            context.setgstate("fillcolor", "%f g\n" % self.g)
 
     def cmyk(self):
         return cmyk(0, 0, 0, 1 - self.g)
@@ -130,9 +130,9 @@ class rgb(color):
 
     def processPDF(self, file, writer, context, registry):
         if context.strokeattr:
-            file.write("%f %f %f RG\n" % (self.r, self.g, self.b))
+            context.setgstate("strokecolor", "%f %f %f RG\n" % (self.r, self.g, self.b))
         if context.fillattr:
-            file.write("%f %f %f rg\n" % (self.r, self.g, self.b))
+            context.setgstate("fillcolor", "%f %f %f rg\n" % (self.r, self.g, self.b))
 
     def cmyk(self):
         # conversion to cmy
@@ -249,9 +249,9 @@ class cmyk(color):
 
     def processPDF(self, file, writer, context, registry):
         if context.strokeattr:
-            file.write("%f %f %f %f K\n" % (self.c, self.m, self.y, self.k))
+            context.setgstate("strokecolor", "%f %f %f %f K\n" % (self.c, self.m, self.y, self.k))
         if context.fillattr:
-            file.write("%f %f %f %f k\n" % (self.c, self.m, self.y, self.k))
+            context.setgstate("fillcolor", "%f %f %f %f k\n" % (self.c, self.m, self.y, self.k))
 
     def cmyk(self):
         return cmyk(self.c, self.m, self.y, self.k)
@@ -576,18 +576,6 @@ cmykgradient.ReverseJet = cmykgradient(gradient.ReverseJet)
 
 
 
-class PDFextgstate(pdfwriter.PDFobject):
-
-    def __init__(self, name, extgstate, registry):
-        pdfwriter.PDFobject.__init__(self, "extgstate", _id=name)
-        registry.addresource("ExtGState", name, self)
-        self.name = name
-        self.extgstate = extgstate
-
-    def write(self, file, writer, registry):
-        file.write("%s\n" % self.extgstate)
-
-
 class transparency(attr.exclusiveattr, style.strokestyle, style.fillstyle):
 
     def __init__(self, value):
@@ -599,18 +587,12 @@ class transparency(attr.exclusiveattr, style.strokestyle, style.fillstyle):
         file.write("%f .setshapealpha\n" % self.value)
 
     def processPDF(self, file, writer, context, registry):
-        if context.strokeattr and context.fillattr:
-            registry.add(PDFextgstate("Transparency-%f" % self.value,
-                                      "<< /Type /ExtGState /CA %f /ca %f >>" % (self.value, self.value), registry))
-            file.write("/Transparency-%f gs\n" % self.value)
-        elif context.strokeattr:
-            registry.add(PDFextgstate("Transparency-Stroke-%f" % self.value,
-                                      "<< /Type /ExtGState /CA %f >>" % self.value, registry))
-            file.write("/Transparency-Stroke-%f gs\n" % self.value)
-        elif context.fillattr:
-            registry.add(PDFextgstate("Transparency-Fill-%f" % self.value,
-                                      "<< /Type /ExtGState /ca %f >>" % self.value, registry))
-            file.write("/Transparency-Fill-%f gs\n" % self.value)
+        if context.strokeattr:
+            context.setgstate("strokeopacity", "/Transparency-Stroke-%f gs\n" % self.value,
+                              ("Transparency-Stroke-%f" % self.value, "<< /Type /ExtGState /CA %f >>" % self.value))
+        if context.fillattr:
+            context.setgstate("fillopacity", "/Transparency-Fill-%f gs\n" % self.value,
+                              ("Transparency-Fill-%f" % self.value, "<< /Type /ExtGState /ca %f >>" % self.value))
 
     def processSVGattrs(self, attrs, writer, context, registry):
         if context.strokeattr:
@@ -20,7 +20,7 @@
 # along with PyX; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
-import configparser, io, logging, os, pkgutil, subprocess, shutil
+import collections, configparser, io, logging, os, pkgutil, subprocess, shutil, threading
 
 logger = logging.getLogger("pyx")
 logger_execute = logging.getLogger("pyx.execute")
@@ -361,18 +361,124 @@ def getlist(section, option, default=_marker):
     return l
 
 
+class cache:
+
+    def __init__(self, maxsize=None, maxbytes=None):
+        """Bounded cache with least recently used eviction
+
+        :param maxsize: maximal number of entries
+        :type maxsize: int or None
+        :param maxbytes: maximal total size of the entries in bytes
+        :type maxbytes: int or None
+
+        Entries can be bound to a file, in which case they are discarded when
+        the modification time or the size of the file changes. The attributes
+        ``hits``, ``misses``, and ``evictions`` count the cache accesses and
+        evicted entries.
+
+        """
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.entries = collections.OrderedDict() # key -> (value, filename, stamp, size)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.RLock()
+
+    def stamp(self, filename):
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, key, default=None):
+        """Return the value for key or default for a missing or outdated entry."""
+        with self.lock:
+            try:
+                value, filename, stamp, size = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if filename is not None and self.stamp(filename) != stamp:
+                self.remove(key)
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, filename=None, size=None, stamp=None):
+        """Store value for key.
+
+        :param filename: name of the file the value was created from
+        :type filename: str or None
+        :param size: size of the value in bytes (defaults to the file size)
+        :type size: int or None
+        :param stamp: result of :meth:`stamp` taken before reading the file
+            (defaults to the current state of the file)
+
+        Pass the stamp taken before reading the file to discard the entry
+        when the file is modified while being read.
+
+        """
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            if filename is not None:
+                filename = os.path.abspath(filename)
+                if stamp is None:
+                    stamp = self.stamp(filename)
+            else:
+                stamp = None
+            if size is None:
+                size = stamp[1] if stamp is not None else 0
+            self.entries[key] = value, filename, stamp, size
+            self.bytes += size
+            while self.entries and ((self.maxsize is not None and len(self.entries) > self.maxsize) or
+                                    (self.maxbytes is not None and self.bytes > self.maxbytes)):
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def remove(self, key):
+        value, filename, stamp, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def invalidate(self, filename):
+        """Discard all entries created from the file filename."""
+        filename = os.path.abspath(filename)
+        with self.lock:
+            for key in [key for key, (value, entryfilename, stamp, size) in self.entries.items() if entryfilename == filename]:
+                self.remove(key)
+
+    def clear(self):
+        """Discard all entries."""
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def statistics(self):
+        """Return a dictionary with the cache statistics."""
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self.entries)
+
+
 space = get("general", "space", "SPACE")
 methods = [locator_classes[method]()
            for method in getlist("filelocator", "methods", ["local", "internal", "pykpathsea", "kpsewhich"])]
-opener_cache = {}
+opener_cache = cache(maxsize=getint("filelocator", "cachesize", 1000) or None)
 
 
 def open(filename, formats, ascii=False):
     """returns an open file searched according the list of formats"""
 
     names = tuple([format.name for format in formats])
-    if (filename, names) in opener_cache:
-        file = opener_cache[(filename, names)]()
+    opener = opener_cache.get((filename, names))
+    if opener is not None:
+        file = opener()
     else:
         for method in methods:
             openers = method.openers(filename, formats)
@@ -386,7 +492,9 @@ def open(filename, formats, ascii=False):
                     if hasattr(file, "name"):
                         info += " at {}".format(file.name)
                     logger_filelocator.info(info)
-                    opener_cache[(filename, names)] = opener
+                    # bind the entry to the file found to notice its removal or modification
+                    name = getattr(file, "name", None)
+                    opener_cache.put((filename, names), opener, name if isinstance(name, str) else None, 0)
                     break
             # break two loops here
             else:
@@ -206,8 +206,13 @@ class decoratedpath(baseclasses.canvasitem):
         if self.styles:
             file.write("grestore\n")
 
+    def requiregstate(self):
+        return False
+
     def processPDF(self, file, writer, context, registry, bbox):
         # draw (stroke and/or fill) the decoratedpath on the canvas
+        # the styles are requested in the context and only the operators
+        # of parameters not in effect already are written (without q/Q)
 
         def _writestyles(styles, context, registry):
             for style in styles:
@@ -230,70 +235,63 @@ class decoratedpath(baseclasses.canvasitem):
 
         # apply global styles
         if self.styles:
-            file.write("q\n") # gsave
             context = context()
             _writestyles(self.styles, context, registry)
 
         if self.fillstyles is not None:
-            fillpath.outputPDF(file, writer)
-
             if self.strokestyles is not None and strokepath is fillpath:
                 # do efficient stroking + filling
-                file.write("q\n") # gsave
-                acontext = context()
-
-                if self.fillstyles:
+                if self.fillstyles or self.strokestyles:
+                    acontext = context()
                     _writefillstyles(self.fillstyles, acontext, registry)
-                if self.strokestyles:
                     _writestrokestyles(self.strokestyles, acontext, registry)
+                else:
+                    acontext = context
 
+                acontext.writegstate(file, registry)
+                fillpath.outputPDF(file, writer)
                 if context.fillrule:
                     file.write("B*\n")
                 else:
                     file.write("B\n") # both stroke and fill
                 # take linewidth into account for bbox when stroking a path
                 bbox += strokepath.bbox().enlarged_pt(0.5*acontext.linewidth_pt)
-
-                file.write("Q\n") # grestore
+                acontext.addstrokeextent(acontext.strokeextent_pt())
             else:
                 # only fill fillpath - for the moment
                 if self.fillstyles:
-                    file.write("q\n") # gsave
-                    _writefillstyles(self.fillstyles, context(), registry)
+                    acontext = context()
+                    _writefillstyles(self.fillstyles, acontext, registry)
+                else:
+                    acontext = context
 
+                acontext.writegstate(file, registry, stroke=False)
+                fillpath.outputPDF(file, writer)
                 if context.fillrule:
                     file.write("f*\n")
                 else:
                     file.write("f\n") # fill
                 bbox += fillpath.bbox()
 
-                if self.fillstyles:
-                    file.write("Q\n") # grestore
-
         if self.strokestyles is not None and (strokepath is not fillpath or self.fillstyles is None):
             # this is the only relevant case still left
             # Note that a possible stroking has already been done.
-            acontext = context()
-
             if self.strokestyles:
-                file.write("q\n") # gsave
+                acontext = context()
                 _writestrokestyles(self.strokestyles, acontext, registry)
+            else:
+                acontext = context
 
+            acontext.writegstate(file, registry, fill=False)
             strokepath.outputPDF(file, writer)
             file.write("S\n") # stroke
             # take linewidth into account for bbox when stroking a path
             bbox += strokepath.bbox().enlarged_pt(0.5*acontext.linewidth_pt)
-
-            if self.strokestyles:
-                file.write("Q\n") # grestore
+            acontext.addstrokeextent(acontext.strokeextent_pt())
 
         # now, draw additional elements of decoratedpath
         self.ornaments.processPDF(file, writer, context, registry, bbox)
 
-        # restore global styles
-        if self.styles:
-            file.write("Q\n") # grestore
-
     def processSVG(self, xml, writer, context, registry, bbox):
         def _writestrokestyles(attrs, context):
             context.fillattr = False
@@ -184,19 +184,19 @@ class document:
 
     def writeEPSfile(self, file=None, **kwargs):
         with _outputstream(file, "eps") as f:
-            pswriter.EPSwriter(self, f, **kwargs)
+            return pswriter.EPSwriter(self, f, **kwargs)
 
     def writePSfile(self, file=None, **kwargs):
         with _outputstream(file, "ps") as f:
-            pswriter.PSwriter(self, f, **kwargs)
+            return pswriter.PSwriter(self, f, **kwargs)
 
     def writePDFfile(self, file=None, **kwargs):
         with _outputstream(file, "pdf") as f:
-            pdfwriter.PDFwriter(self, f, **kwargs)
+            return pdfwriter.PDFwriter(self, f, **kwargs)
 
     def writeSVGfile(self, file=None, **kwargs):
         with _outputstream(file, "svg") as f:
-            svgwriter.SVGwriter(self, f, **kwargs)
+            return svgwriter.SVGwriter(self, f, **kwargs)
 
     def writetofile(self, filename, **kwargs):
         for suffix, method in [("eps", pswriter.EPSwriter),
@@ -205,7 +205,6 @@ class document:
                                ("svg", svgwriter.SVGwriter)]:
             if filename.endswith(".{}".format(suffix)):
                 with open(filename, "wb") as f:
-                    method(self, f, **kwargs)
-                return
+                    return method(self, f, **kwargs)
         raise ValueError("unknown file extension")
 
@@ -82,14 +82,19 @@ class DVIError(Exception): pass
 
 class DVIfile:
 
-    def __init__(self, filename, debug=0, debugfile=sys.stdout):
-        """ opens the dvi file and reads the preamble """
+    def __init__(self, filename, debug=0, debugfile=sys.stdout, data=None):
+        """ opens the dvi file and reads the preamble
+
+        When data is given, the dvi file is read from these bytes and filename
+        is used for reference only."""
         self.filename = filename
         self.debug = debug
         self.debugfile = debugfile
         self.debugstack = []
 
         self.fonts = {}
+        # font definitions (checksum, scaling, design size, name) by font number
+        self.fontdefs = {}
         self.activefont = None
 
         # stack of fonts and fontscale currently used (used for VFs)
@@ -102,7 +107,10 @@ class DVIfile:
         # stack for self.file, self.fonts and self.stack, needed for VF inclusion
         self.statestack = []
 
-        self.file = reader.reader(self.filename)
+        if data is None:
+            self.file = reader.reader(self.filename)
+        else:
+            self.file = reader.bytesreader(data)
 
         # currently read byte in file (for debugging output)
         self.filepos = None
@@ -185,6 +193,8 @@ class DVIfile:
     def usefont(self, fontnum, id1234, fontmap):
         self.flushtext(fontmap)
         self.activefont = self.fonts[fontnum]
+        if not self.statestack:
+            self.pagefonts.add(fontnum)
         if self.debug:
             self.debugfile.write("%d: fnt%s%i current font is %s\n" %
                                  (self.filepos,
@@ -208,6 +218,8 @@ class DVIfile:
             afont = texfont.TeXfont(fontname, c, q/self.tfmconv, d/self.tfmconv, self.tfmconv, self.pyxconv, self.debug>1)
 
         self.fonts[num] = afont
+        self.fontdefs[num] = c, q, d, fontname
+        self.pagefontdefs.add(num)
 
         if self.debug:
             self.debugfile.write("%d: fntdef%d %i: %s\n" % (self.filepos, cmdnr, num, fontname))
@@ -371,6 +383,7 @@ class DVIfile:
                 num = afile.readuint32()
                 den = afile.readuint32()
                 self.mag = afile.readuint32()
+                self.pre = num, den, self.mag
 
                 # For the interpretation of the lengths in dvi and tfm files, 
                 # three conversion factors are relevant:
@@ -400,6 +413,24 @@ class DVIfile:
             else:
                 raise DVIError
 
+    def pagedvi(self):
+        """ returns the page read last as a dvi file of its own
+
+        The page is preceded by the preamble, and the definitions of the
+        fonts used on the page but defined on earlier pages are inserted
+        at its beginning."""
+        pos = self.file.tell()
+        self.file.seek(self.pagestart)
+        page = self.file.read(self.pageend - self.pagestart)
+        self.file.seek(pos)
+        fontdefs = []
+        for num in sorted(self.pagefonts - self.pagefontdefs):
+            c, q, d, fontname = self.fontdefs[num]
+            fontname = fontname.encode("ascii")
+            fontdefs.append(struct.pack(">BllllBB", _DVI_FNTDEF1234+3, num, c, q, d, 0, len(fontname)) + fontname)
+        # the beginning of page command is followed by 10 counters and the pointer to the previous page
+        return struct.pack(">BBLLLB", _DVI_PRE, _DVI_VERSION, *self.pre, 0) + page[:45] + b"".join(fontdefs) + page[45:]
+
     def readpage(self, pageid=None, fontmap=None, singlecharmode=False, attrs=[]):
         """ reads a page from the dvi file
 
@@ -421,6 +452,7 @@ class DVIfile:
                 if self.debug:
                     self.debugfile.write("%d: beginning of page %i\n" % (self.filepos, ispageid[0]))
                 self.file.readuint32()
+                self.pagestart = self.filepos
                 break
             elif cmd == _DVI_POST:
                 self.file.close()
@@ -435,6 +467,10 @@ class DVIfile:
         # tuple (hpos, vpos, codepoints) to be output, or None if no output is pending
         self.activetext = None
 
+        # fonts used and defined on the page (for pagedvi)
+        self.pagefonts = set()
+        self.pagefontdefs = set()
+
         while True:
             afile = self.file
             self.filepos = afile.tell()
@@ -461,6 +497,7 @@ class DVIfile:
                 self.flushtext(fontmap)
                 if self.debug:
                     self.debugfile.write("%d: eop\n \n" % self.filepos)
+                self.pageend = afile.tell()
                 return self.actpage
             elif cmd == _DVI_PUSH:
                 self.stack.append(list(self.pos))
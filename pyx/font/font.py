@@ -23,6 +23,7 @@
 
 import logging
 from pyx import bbox, baseclasses, deco, path, pswriter, pdfwriter, svgwriter, trafo, unit
+from pyx import writer as writermodule
 from . import t1file, afmfile
 
 logger = logging.getLogger("pyx")
@@ -263,21 +264,32 @@ class PDFfontdescriptor(pdfwriter.PDFobject):
 
 class PDFfontfile(pdfwriter.PDFobject):
 
+    isstream = True
+
     def __init__(self, t1file, glyphnames, charcodes):
         pdfwriter.PDFobject.__init__(self, "fontfile", _id=t1file.name)
         self.t1file = t1file
         self.glyphnames = set(glyphnames)
         self.charcodes = set(charcodes)
+        self.pdfdata = None
 
     def merge(self, other):
         self.glyphnames.update(other.glyphnames)
         self.charcodes.update(other.charcodes)
+        self.pdfdata = None
+
+    def streamdata(self, writer):
+        # the (stripped) font is created once for precompressing and writing
+        if self.pdfdata is None:
+            if writer.stripfonts:
+                self.pdfdata = self.t1file.getstrippedfont(self.glyphnames, self.charcodes).getPDFdata()
+            else:
+                self.pdfdata = self.t1file.getPDFdata()
+        return self.pdfdata[0]
 
     def write(self, file, writer, registry):
-        if writer.stripfonts:
-            self.t1file.getstrippedfont(self.glyphnames, self.charcodes).outputPDF(file, writer)
-        else:
-            self.t1file.outputPDF(file, writer)
+        self.streamdata(writer)
+        self.t1file.outputPDF(file, writer, self.pdfdata)
 
 
 class PDFencoding(pdfwriter.PDFobject):
@@ -490,10 +502,19 @@ class T1text_pt(text_pt):
         """returns the name of the encoding (in encodings) mapping self.glyphnames to codepoints
         If no such encoding can be found or extended, a new encoding is added to encodings
         """
+        # encodings are shared by all pages of a document, except for pages
+        # processed in a worker process, which use encodings of their own
+        pageno = writermodule.workerpageno()
+        if pageno is None:
+            prefix = "encoding"
+        else:
+            prefix = "page%dencoding" % pageno
         glyphnames = set(self.glyphnames)
         if len(glyphnames) > 256:
             raise ValueError("glyphs do not fit into one single encoding")
         for encodingname, encoding in list(encodings.items()):
+            if not encodingname.startswith(prefix):
+                continue
             glyphsmissing = []
             for glyphname in glyphnames:
                 if glyphname not in list(encoding.keys()):
@@ -505,7 +526,7 @@ class T1text_pt(text_pt):
                     encoding[glyphname] = len(encoding)
                 return encodingname
         # create a new encoding for the glyphnames
-        encodingname = "encoding%d" % len(encodings)
+        encodingname = "%s%d" % (prefix, len([name for name in encodings if name.startswith(prefix)]))
         encodings[encodingname] = dict([(glyphname, i) for i, glyphname in enumerate(glyphnames)])
         return encodingname
 
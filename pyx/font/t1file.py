@@ -989,7 +989,7 @@ class T1File:
             w.write_bytes(self._data2[self.charstringsend:self.subrsstart])
             addsubrs(subrs)
             w.write_bytes(self._data2[self.subrsend:])
-        return w.file.getvalue()
+        return w.getvalue()
 
     def getdata2eexec(self):
         if self._data2eexec:
@@ -1132,7 +1132,8 @@ class T1File:
         """output the PostScript code for the T1File to the file file"""
         self.outputPFA(file, remove_UniqueID_lookup=True)
 
-    def outputPDF(self, file, writer):
+    def getPDFdata(self):
+        """return the data of the font file stream for PDF and the lengths of its three parts"""
         data2eexec = self.getdata2eexec()
         data3 = self.data3
         # we might be allowed to skip the third part ...
@@ -1143,14 +1144,21 @@ class T1File:
             data3 = ""
 
         data = self.data1.encode("ascii", errors="surrogateescape") + data2eexec + data3.encode("ascii", errors="surrogateescape")
+        return data, len(self.data1), len(data2eexec), len(data3)
+
+    def outputPDF(self, file, writer, pdfdata=None):
+        """output the font file stream to the file file
+
+        pdfdata is the result of getPDFdata, if already available"""
+        data, length1, length2, length3 = pdfdata or self.getPDFdata()
         if writer.compress and haszlib:
-            data = zlib.compress(data)
+            data = writer.compressstream("fontfile", data)
 
         file.write("<<\n"
                    "/Length %d\n"
                    "/Length1 %d\n"
                    "/Length2 %d\n"
-                   "/Length3 %d\n" % (len(data), len(self.data1), len(data2eexec), len(data3)))
+                   "/Length3 %d\n" % (len(data), length1, length2, length3))
         if writer.compress and haszlib:
             file.write("/Filter /FlateDecode\n")
         file.write(">>\n"
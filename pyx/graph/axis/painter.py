@@ -187,6 +187,8 @@ class regular(_title):
         labeldist_pt = unit.topt(self.labeldist)
 
         # create & align t.temp_labelbox
+        labelticks = []
+        labeltexts = []
         for t in data.ticks:
             if t.labellevel is not None:
                 labelattrs = attr.selectattrs(self.labelattrs, t.labellevel, maxlabellevel)
@@ -196,7 +198,12 @@ class regular(_title):
                         labelattrs.append(self.labeldirection.trafo(t.temp_dx, t.temp_dy))
                     if t.labelattrs is not None:
                         labelattrs.extend(t.labelattrs)
-                    t.temp_labelbox = canvas.textengine.text_pt(t.temp_x_pt, t.temp_y_pt, t.label, labelattrs)
+                    labelticks.append(t)
+                    labeltexts.append((t.temp_x_pt, t.temp_y_pt, t.label, labelattrs))
+        if labeltexts:
+            # typeset all labels in a single step
+            for t, labelbox in zip(labelticks, text.typeset_many_pt(canvas.textengine, labeltexts)):
+                t.temp_labelbox = labelbox
         if len(data.ticks) > 1:
             equaldirection = 1
             for t in data.ticks[1:]:
@@ -323,11 +330,14 @@ class bar(_title):
             namepos.append((v, x, y, dx, dy))
         nameboxes = []
         if self.nameattrs is not None:
+            nametexts = []
             for (v, x, y, dx, dy), name in zip(namepos, data.names):
                 nameattrs = self.defaultnameattrs + self.nameattrs
                 if self.namedirection is not None:
                     nameattrs.append(self.namedirection.trafo(dx, dy))
-                nameboxes.append(canvas.textengine.text_pt(x, y, str(name), nameattrs))
+                nametexts.append((x, y, str(name), nameattrs))
+            if nametexts:
+                nameboxes = text.typeset_many_pt(canvas.textengine, nametexts)
         labeldist_pt = canvas.extent_pt + unit.topt(self.namedist)
         if len(namepos) > 1:
             equaldirection = 1
@@ -21,8 +21,8 @@
 # along with PyX; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
-import math, re, configparser, struct
-from pyx import text
+import array, collections.abc, io, keyword, math, mmap, os, re, configparser, struct, sys, types
+from pyx import config, text
 from . import style
 builtinlist = list
 
@@ -63,6 +63,26 @@ _mathglobals = {"neg": lambda x: -x,
                 "e": math.e}
 
 
+def _expressionnames(expression):
+    "returns the names used in the expression (a string)"
+    names = set()
+    codes = [compile(expression, "<string>", "eval")]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend([const for const in code.co_consts if isinstance(const, types.CodeType)])
+    return names
+
+
+def _compileexpression(expression, argnames, context):
+    """compiles the expression (a string) into a function taking the values
+    of argnames as arguments, where argnames hide the names in context, which
+    in turn hide the names in _mathglobals"""
+    globals = _mathglobals.copy()
+    globals.update(context)
+    return eval(compile("lambda %s: (%s\n)" % (", ".join(argnames), expression), "<string>", "eval"), globals)
+
+
 class _data:
     """graph data interface
 
@@ -127,7 +147,17 @@ class points(_data):
     defaultstyles = defaultsymbols
 
     def __init__(self, points, title="user provided points", addlinenumbers=1, **columns):
-        if len(points):
+        if getattr(points, "ndim", None) == 2:
+            # two-dimensional arrays (like numpy arrays) are kept columnwise
+            l = points.shape[1]
+            for v in list(columns.values()):
+                if abs(v) > l or (not addlinenumbers and abs(v) == l):
+                    raise ValueError("column number bigger than number of columns")
+            self.columndata = list(points.T)
+            if addlinenumbers:
+                self.columndata = [list(range(1, len(points) + 1))] + self.columndata
+            self.columns = dict([(key, self.columndata[i]) for key, i in list(columns.items())])
+        elif len(points):
             l = len(points[0])
             self.columndata = [[x] for x in points[0]]
             for point in points[1:]:
@@ -147,6 +177,58 @@ class points(_data):
         self.title = title
 
 
+class _lazycolumndata(collections.abc.Sequence):
+    """list of columns, which are created on first access
+
+    reader is a function returning the column for a column number"""
+
+    def __init__(self, count, reader):
+        self.count = count
+        self.reader = reader
+        self.cache = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not isinstance(index, int):
+            raise TypeError("column numbers must be integers")
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("column number out of range")
+        try:
+            return self.cache[index]
+        except KeyError:
+            column = self.cache[index] = self.reader(index)
+            return column
+
+
+class _lazycolumns(collections.abc.Mapping):
+    """dictionary of columns, which are created on first access
+
+    getcolumn is a function returning the column for a column name out of
+    columnnames"""
+
+    def __init__(self, columnnames, getcolumn):
+        self.columnnames = columnnames
+        self.getcolumn = getcolumn
+
+    def __len__(self):
+        return len(self.columnnames)
+
+    def __iter__(self):
+        return iter(self.columnnames)
+
+    def __contains__(self, columnname):
+        return columnname in self.columnnames
+
+    def __getitem__(self, columnname):
+        if columnname not in self.columnnames:
+            raise KeyError(columnname)
+        return self.getcolumn(columnname)
+
+
 class _notitle:
     pass
 
@@ -190,28 +272,46 @@ class data(_data):
                             value = "%s%s(%s)%s" % (value[:m.start()], columncallback, m.groups()[0], value[m.end():])
                             m = _columnintref.search(value)
                         value = value.replace("$", columncallback)
-                    expression = compile(value.strip(), "<string>", "eval")
-                    context = context.copy()
-                    context[columncallback] = self.columncallback
+                    value = value.strip()
+                    names = _expressionnames(value)
+                    argnames = [key for key in self.orgdata.columns
+                                if key in names and isinstance(key, str) and key.isidentifier() and not keyword.iskeyword(key)]
+                    columncontext = context.copy()
+                    columncontext[columncallback] = self.columncallback
+                    expression = _compileexpression(value, argnames, columncontext)
                     if self.orgdata.columns:
-                        key, columndata = list(self.orgdata.columns.items())[0]
-                        count = len(columndata)
+                        count = len(next(iter(self.orgdata.columns.values())))
                     elif self.orgdata.columndata:
                         count = len(self.orgdata.columndata[0])
                     else:
                         count = 0
+                    if argnames:
+                        rows = zip(*[self.orgdata.columns[key] for key in argnames])
+                    else:
+                        rows = [()]*count
                     newdata = []
-                    for i in range(count):
-                        self.columncallbackcount = i
-                        for key, values in list(self.orgdata.columns.items()):
-                            context[key] = values[i]
-                        try:
-                            newdata.append(eval(expression, _mathglobals, context))
-                        except (ArithmeticError, ValueError):
-                            newdata.append(None)
+                    if columncallback in names:
+                        for i, row in enumerate(rows):
+                            self.columncallbackcount = i
+                            try:
+                                newdata.append(expression(*row))
+                            except (ArithmeticError, ValueError):
+                                newdata.append(None)
+                    else:
+                        for row in rows:
+                            try:
+                                newdata.append(expression(*row))
+                            except (ArithmeticError, ValueError):
+                                newdata.append(None)
                     self.columns[columnname] = newdata
 
-        if copy:
+        if copy and isinstance(self.orgdata.columns, _lazycolumns):
+            # keep the columns of the original data unread until needed
+            columns = self.columns
+            orgcolumns = self.orgdata.columns
+            self.columns = _lazycolumns(list(columns.keys()) + [columnname for columnname in orgcolumns if columnname not in columns],
+                                        lambda columnname: columns[columnname] if columnname in columns else orgcolumns[columnname])
+        elif copy:
             # copy other, non-conflicting column names
             for columnname, columndata in list(self.orgdata.columns.items()):
                 if columnname not in self.columns:
@@ -226,7 +326,29 @@ class data(_data):
             return self.orgdata.columns[value][self.columncallbackcount]
 
 
-filecache = {}
+def _getsize(data):
+    """estimate the memory used by the columns of data in bytes"""
+    if isinstance(getattr(data, "columndata", None), _lazycolumndata):
+        # the columns are read on demand into arrays of the size of the line
+        # numbers column, the offsets of the lines take the same size
+        return (len(data.columndata) + 1) * sys.getsizeof(data.columndata[0])
+    columns = {}
+    while data is not None:
+        for column in list(getattr(data, "columndata", [])) + list(data.columns.values()):
+            columns[id(column)] = column
+        data = getattr(data, "orgdata", None)
+    size = 0
+    for column in columns.values():
+        size += sys.getsizeof(column)
+        if isinstance(column, list):
+            size += sum(map(sys.getsizeof, column))
+        else:
+            size += getattr(column, "nbytes", 0)
+    return size
+
+
+filecache = config.cache(maxsize=config.getint("graph", "filecachesize", 100) or None,
+                         maxbytes=config.getint("graph", "filecachebytes", 0) or None)
 
 class file(data):
 
@@ -283,7 +405,7 @@ class file(data):
                        commentpattern=defaultcommentpattern,
                        stringpattern=defaultstringpattern,
                        columnpattern=defaultcolumnpattern,
-                       skiphead=0, skiptail=0, every=1,
+                       skiphead=0, skiptail=0, every=1, memorymap=0,
                        **kwargs):
 
         def readfile(file, title, self=self, commentpattern=commentpattern, stringpattern=stringpattern, columnpattern=columnpattern, skiphead=skiphead, skiptail=skiptail, every=every):
@@ -317,17 +439,114 @@ class file(data):
             return points(columndata, title=title, addlinenumbers=0,
                           **dict([(column, i+1) for i, column in enumerate(columns[:maxcolumns-1])]))
 
+        def readmemorymap(file, title, self=self, commentpattern=commentpattern, skiphead=skiphead, skiptail=skiptail, every=every):
+            try:
+                fileno = file.fileno()
+            except (AttributeError, io.UnsupportedOperation):
+                raise ValueError("memorymap mode requires a file with a file descriptor")
+            if os.fstat(fileno).st_size:
+                buffer = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            else:
+                # empty files can not be mapped
+                buffer = b""
+            columns = []
+            offsets = array.array("q") # start of the selected data lines
+            linenumbers = array.array("q")
+            linenumber = 0
+            maxcolumns = 0
+            offset = 0
+            size = len(buffer)
+            while offset < size:
+                end = buffer.find(b"\n", offset)
+                if end == -1:
+                    end = size
+                line = buffer[offset:end].strip()
+                if line:
+                    match = commentpattern.match(line.decode("utf-8", "replace"))
+                    if match:
+                        if not len(offsets):
+                            columns = self.splitline(line.decode("utf-8", "replace")[match.end():], self.defaultstringpattern, self.defaultcolumnpattern, tofloat=0)
+                    elif b'"' in line:
+                        # quoted strings are handled by the regular expressions of readfile
+                        return readfile(io.StringIO(buffer[:].decode("utf-8", "replace")), title)
+                    else:
+                        if linenumber >= skiphead and not ((linenumber - skiphead) % every):
+                            offsets.append(offset)
+                            linenumbers.append(linenumber + 1)
+                            maxcolumns = max(maxcolumns, len(line.split()) + 1)
+                        linenumber += 1
+                offset = end + 1
+            if skiptail >= every:
+                skip, x = divmod(skiptail, every)
+                del offsets[-skip:]
+                del linenumbers[-skip:]
+            if not maxcolumns:
+                # no data lines at all (like in readfile)
+                return points([], title=title, addlinenumbers=0,
+                              **dict([(column, i+1) for i, column in enumerate(columns[:maxcolumns-1])]))
+
+            def readcolumn(index):
+                if not index:
+                    return linenumbers
+                column = array.array("d")
+                for offset in offsets:
+                    end = buffer.find(b"\n", offset)
+                    if end == -1:
+                        end = size
+                    values = buffer[offset:end].split()
+                    try:
+                        column.append(float(values[index-1]))
+                    except (IndexError, ValueError):
+                        # fall back to a list for missing values and strings
+                        column = column.tolist()
+                        for offset in offsets[len(column):]:
+                            end = buffer.find(b"\n", offset)
+                            if end == -1:
+                                end = size
+                            values = buffer[offset:end].split()
+                            if index > len(values):
+                                column.append(None)
+                            else:
+                                try:
+                                    column.append(float(values[index-1]))
+                                except ValueError:
+                                    column.append(values[index-1].decode("utf-8", "replace"))
+                        break
+                return column
+
+            result = _data()
+            result.columndata = _lazycolumndata(maxcolumns, readcolumn)
+            columnnumbers = dict([(column, i+1) for i, column in enumerate(columns[:maxcolumns-1])])
+            result.columns = _lazycolumns(list(columnnumbers.keys()), lambda columnname: result.columndata[columnnumbers[columnname]])
+            result.columnnames = list(result.columns.keys())
+            result.title = title
+            result.defaultstyles = defaultsymbols
+            return result
+
+        if memorymap and (stringpattern is not self.defaultstringpattern or columnpattern is not self.defaultcolumnpattern):
+            raise ValueError("memorymap mode does not support custom string and column patterns")
+
         try:
             filename.readlines
         except Exception:
             # not a file-like object -> open it
-            cachekey = self.getcachekey(filename, commentpattern, stringpattern, columnpattern, skiphead, skiptail, every)
-            if cachekey not in filecache:
-                with open(filename) as f:
-                    filecache[cachekey] = readfile(f, filename)
-            data.__init__(self, filecache[cachekey], **kwargs)
+            cachekey = self.getcachekey(filename, commentpattern, stringpattern, columnpattern, skiphead, skiptail, every, memorymap)
+            filedata = filecache.get(cachekey)
+            if filedata is None:
+                stamp = filecache.stamp(filename)
+                if memorymap:
+                    with open(filename, "rb") as f:
+                        filedata = readmemorymap(f, filename)
+                else:
+                    with open(filename) as f:
+                        filedata = readfile(f, filename)
+                filecache.put(cachekey, filedata, filename, _getsize(filedata), stamp=stamp)
+            data.__init__(self, filedata, **kwargs)
         else:
-            data.__init__(self, readfile(filename, "user provided file-like object"), **kwargs)
+            if memorymap:
+                data.__init__(self, readmemorymap(filename, "user provided file-like object"), **kwargs)
+            else:
+                data.__init__(self, readfile(filename, "user provided file-like object"), **kwargs)
 
 
 conffilecache = {}
@@ -380,14 +599,19 @@ class conffile(data):
             filename.readlines
         except Exception:
             # not a file-like object -> open it
-            if filename not in filecache:
-                filecache[filename] = readfile(open(filename), filename)
-            data.__init__(self, filecache[filename], **kwargs)
+            filedata = filecache.get(filename)
+            if filedata is None:
+                stamp = filecache.stamp(filename)
+                with open(filename) as f:
+                    filedata = readfile(f, filename)
+                filecache.put(filename, filedata, filename, _getsize(filedata), stamp=stamp)
+            data.__init__(self, filedata, **kwargs)
         else:
             data.__init__(self, readfile(filename, "user provided file-like object"), **kwargs)
 
 
-cbdfilecache = {}
+cbdfilecache = config.cache(maxsize=config.getint("graph", "filecachesize", 100) or None,
+                            maxbytes=config.getint("graph", "filecachebytes", 0) or None)
 
 class cbdfile(data):
 
@@ -487,9 +711,13 @@ class cbdfile(data):
         except Exception:
             # not a file-like object -> open it
             cachekey = self.getcachekey(filename, minrank, maxrank)
-            if cachekey not in cbdfilecache:
-                cbdfilecache[cachekey] = readfile(open(filename, "rb"), filename)
-            data.__init__(self, cbdfilecache[cachekey], **kwargs)
+            filedata = cbdfilecache.get(cachekey)
+            if filedata is None:
+                stamp = cbdfilecache.stamp(filename)
+                with open(filename, "rb") as f:
+                    filedata = readfile(f, filename)
+                cbdfilecache.put(cachekey, filedata, filename, _getsize(filedata), stamp=stamp)
+            data.__init__(self, filedata, **kwargs)
         else:
             data.__init__(self, readfile(filename, "user provided file-like object"), **kwargs)
 
@@ -519,7 +747,8 @@ class function(_data):
             raise ValueError("y(x)=... or similar expected")
         if self.xname in context:
             raise ValueError("xname in context")
-        self.expression = compile(expression.strip(), "<string>", "eval")
+        self.expression = expression.strip()
+        compile(self.expression, "<string>", "eval") # report syntax errors early
         self.columns = {}
         self.columnnames = [self.xname, self.yname]
 
@@ -540,17 +769,19 @@ class function(_data):
         if logaxis:
             min = math.log(min)
             max = math.log(max)
-        for i in range(self.numberofpoints):
-            x = min + (max-min)*i / (self.numberofpoints-1.0)
-            if logaxis:
-                x = math.exp(x)
-            dynamiccolumns[self.xname].append(x)
-            self.context[self.xname] = x
+        xs = [min + (max-min)*i / (self.numberofpoints-1.0) for i in range(self.numberofpoints)]
+        if logaxis:
+            xs = [math.exp(x) for x in xs]
+        # self.context is evaluated late, as it may be modified
+        expression = _compileexpression(self.expression, [self.xname], self.context)
+        ys = []
+        for x in xs:
             try:
-                y = eval(self.expression, _mathglobals, self.context)
+                ys.append(expression(x))
             except (ArithmeticError, ValueError):
-                y = None
-            dynamiccolumns[self.yname].append(y)
+                ys.append(None)
+        dynamiccolumns[self.xname] = xs
+        dynamiccolumns[self.yname] = ys
         return dynamiccolumns
 
 
@@ -572,17 +803,13 @@ class paramfunction(_data):
         else:
             self.title = title
         varlist, expression = expression.split("=")
-        expression = compile(expression.strip(), "<string>", "eval")
+        expression = _compileexpression(expression.strip(), [varname], context)
         keys = [key.strip() for key in varlist.split(",")]
-        self.columns = dict([(key, []) for key in keys])
-        context = context.copy()
-        for i in range(points):
-            param = min + (max-min)*i / (points-1.0)
-            context[varname] = param
-            values = eval(expression, _mathglobals, context)
-            for key, value in zip(keys, values):
-                self.columns[key].append(value)
-        if len(keys) != len(values):
+        rows = [expression(min + (max-min)*i / (points-1.0)) for i in range(points)]
+        self.columns = dict(zip(keys, [builtinlist(column) for column in zip(*rows)]))
+        for key in keys[len(self.columns):]:
+            self.columns[key] = []
+        if points and len(keys) != len(rows[-1]):
             raise ValueError("unpack tuple of wrong size")
         self.columnnames = list(self.columns.keys())
 
@@ -50,6 +50,18 @@ def getdefaultprovider(key):
     return _defaultprovider[key]
 
 
+def hasdrawpoints(style):
+    """returns whether a style can draw many points at once by its
+    drawpoints method, i.e. whether drawpoints is implemented along
+    with (or in a subclass of) the drawpoint method"""
+    for cls in type(style).__mro__:
+        if "drawpoints" in cls.__dict__:
+            return True
+        if "drawpoint" in cls.__dict__:
+            return False
+    return False
+
+
 class styledata:
     """style data storage class
 
@@ -96,8 +108,21 @@ class plotitem:
         for privatedata, style in zip(self.privatedatalist, self.styles):
             style.selectstyle(privatedata, self.sharedata, graph, selectindex, selecttotal)
 
+    def usedcolumns(self, columns):
+        """returns the columns used by the styles
+
+        The other columns are not accessed, which allows for data to
+        create columns on demand."""
+        usedcolumns = dict([(columnname, columns[columnname]) for columnname in columns
+                            if columnname in self.usedcolumnnames])
+        if columns and not usedcolumns:
+            # keep a column to preserve the number of points
+            columnname = next(iter(columns))
+            usedcolumns[columnname] = columns[columnname]
+        return usedcolumns
+
     def adjustaxesstatic(self, graph):
-        for columnname, data in list(self.data.columns.items()):
+        for columnname, data in list(self.usedcolumns(self.data.columns).items()):
             for privatedata, style in zip(self.privatedatalist, self.styles):
                 style.adjustaxis(privatedata, self.sharedata, graph, self, columnname, data)
 
@@ -113,11 +138,21 @@ class plotitem:
         for privatedata, style in zip(self.privatedatalist, self.styles):
             style.initdrawpoints(privatedata, self.sharedata, graph)
 
+        columns = self.usedcolumns(self.data.columns)
+        if all(hasdrawpoints(style) for style in self.styles):
+            self.drawcolumns(graph, columns)
+            # insert an empty point
+            if self.data.columns and self.dynamiccolumns:
+                self.drawcolumns(graph, {}, 1)
+            self.drawcolumns(graph, self.dynamiccolumns)
+            for privatedata, style in zip(self.privatedatalist, self.styles):
+                style.donedrawpoints(privatedata, self.sharedata, graph)
+            return
+
         point = dict([(columnname, None) for columnname in self.usedcolumnnames])
         # fill point with (static) column data first
-        columns = list(self.data.columns.keys())
-        for values in zip(*list(self.data.columns.values())):
-            for column, value in zip(columns, values):
+        for values in zip(*list(columns.values())):
+            for column, value in zip(columns.keys(), values):
                 point[column] = value
             for privatedata, style in zip(self.privatedatalist, self.styles):
                 style.drawpoint(privatedata, self.sharedata, graph, point)
@@ -137,6 +172,22 @@ class plotitem:
         for privatedata, style in zip(self.privatedatalist, self.styles):
             style.donedrawpoints(privatedata, self.sharedata, graph)
 
+    def drawcolumns(self, graph, columns, count=None):
+        """pass the data of columns to the drawpoints method of the styles
+
+        count is the number of points, which is taken from the columns
+        by default. Missing columns are filled by None."""
+        if count is None:
+            if not columns:
+                return
+            count = len(next(iter(columns.values())))
+        if not count:
+            return
+        drawcolumns = dict([(columnname, [None]*count) for columnname in self.usedcolumnnames])
+        drawcolumns.update(columns)
+        for privatedata, style in zip(self.privatedatalist, self.styles):
+            style.drawpoints(privatedata, self.sharedata, graph, drawcolumns)
+
     def key_pt(self, graph, x_pt, y_pt, width_pt, height_pt):
         for privatedata, style in zip(self.privatedatalist, self.styles):
             style.key_pt(privatedata, self.sharedata, graph, x_pt, y_pt, width_pt, height_pt)
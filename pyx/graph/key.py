@@ -80,11 +80,10 @@ class key:
         self.symbolwidth_pt = unit.topt(self.symbolwidth)
         self.symbolheight_pt = unit.topt(self.symbolheight)
         self.symbolspace_pt = unit.topt(self.symbolspace)
-        titleboxes = []
-        for plotitem in plotitems:
-            titlebox = c.textengine.text_pt(0, 0, plotitem.title, self.defaulttextattrs + self.textattrs)
+        titleboxes = text.typeset_many_pt(c.textengine, [(0, 0, plotitem.title, self.defaulttextattrs + self.textattrs)
+                                                         for plotitem in plotitems])
+        for plotitem, titlebox in zip(plotitems, titleboxes):
             titlebox.plotitem = plotitem
-            titleboxes.append(titlebox)
         dy_pt = box.tile_pt(titleboxes, self.dist_pt, 0, -1)
         box.linealignequal_pt(titleboxes, self.symbolwidth_pt + self.symbolspace_pt, 1, 0)
         y_pt = -0.5 * self.symbolheight_pt + titleboxes[0].center[1]
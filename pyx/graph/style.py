@@ -103,6 +103,18 @@ class _style:
         keys are the column names."""
         pass
 
+    def drawpoints(self, privatedata, sharedata, graph, columns):
+        """Draw data of many points at once
+
+        This method is called instead of drawpoint when all styles of
+        a plot item implement it along with drawpoint (a style
+        overwriting drawpoint only is drawn point by point). The data
+        is available in the dictionary columns, which maps the column
+        names to sequences of equal length. The method might be called
+        several times. The variables a style provides via sharedata
+        must be sequences over all points (lists of those for vpos)."""
+        pass
+
     def donedrawpoints(self, privatedata, sharedata, graph):
         """Finalize drawing of data
 
@@ -233,6 +245,26 @@ class pos(_style):
                     sharedata.vposvalid = 0
                 sharedata.vpos[index] = v
 
+    def drawpoints(self, privatedata, sharedata, graph, columns):
+        count = len(next(iter(columns.values())))
+        sharedata.vpos = [None]*(len(graph.axesnames))
+        sharedata.vposavailable = [1]*count
+        sharedata.vposvalid = [1]*count
+        for columnname, index, axis in privatedata.pointpostmplist:
+            convert = axis.convert
+            vcolumn = []
+            for i, value in enumerate(columns[columnname]):
+                try:
+                    v = convert(value)
+                except (ArithmeticError, ValueError, TypeError):
+                    sharedata.vposavailable[i] = sharedata.vposvalid[i] = 0
+                    v = None
+                else:
+                    if v < -self.epsilon or v > 1+self.epsilon:
+                        sharedata.vposvalid[i] = 0
+                vcolumn.append(v)
+            sharedata.vpos[index] = vcolumn
+
 
 registerdefaultprovider(pos(), pos.providesdata)
 
@@ -430,6 +462,9 @@ def _diamondsymbol(c, x_pt, y_pt, size_pt, attrs):
                      path.lineto_pt(x_pt, y_pt+0.930604859*size_pt),
                      path.closepath()), attrs)
 
+# the predefined symbols are drawn once and inserted at the points translated
+_predefinedsymbols = [_crosssymbol, _plussymbol, _squaresymbol, _trianglesymbol, _circlesymbol, _diamondsymbol]
+
 
 class _styleneedingpointpos(_style):
 
@@ -492,11 +527,30 @@ class symbol(_styleneedingpointpos):
 
     def initdrawpoints(self, privatedata, sharedata, graph):
         privatedata.symbolcanvas = canvas.canvas()
+        if privatedata.symbol in _predefinedsymbols and privatedata.symbolattrs is not None:
+            # the symbol is written only once to the output and reused for all points
+            privatedata.symboldrawing = canvas.canvas()
+            privatedata.symbol(privatedata.symboldrawing, 0, 0, privatedata.size_pt, privatedata.symbolattrs)
+        else:
+            privatedata.symboldrawing = None
+
+    def drawsymbol_pt(self, privatedata, x_pt, y_pt):
+        if privatedata.symboldrawing is not None:
+            privatedata.symbolcanvas.insert(privatedata.symboldrawing, [trafo.translate_pt(x_pt, y_pt)])
+        else:
+            privatedata.symbol(privatedata.symbolcanvas, x_pt, y_pt, privatedata.size_pt, privatedata.symbolattrs)
 
     def drawpoint(self, privatedata, sharedata, graph, point):
         if sharedata.vposvalid and privatedata.symbolattrs is not None:
             x_pt, y_pt = graph.vpos_pt(*sharedata.vpos)
-            privatedata.symbol(privatedata.symbolcanvas, x_pt, y_pt, privatedata.size_pt, privatedata.symbolattrs)
+            self.drawsymbol_pt(privatedata, x_pt, y_pt)
+
+    def drawpoints(self, privatedata, sharedata, graph, columns):
+        if privatedata.symbolattrs is not None:
+            for vposvalid, vpos in zip(sharedata.vposvalid, zip(*sharedata.vpos)):
+                if vposvalid:
+                    x_pt, y_pt = graph.vpos_pt(*vpos)
+                    self.drawsymbol_pt(privatedata, x_pt, y_pt)
 
     def donedrawpoints(self, privatedata, sharedata, graph):
         graph.layer("data").insert(privatedata.symbolcanvas)
@@ -511,16 +565,43 @@ class _line(_styleneedingpointpos):
     # this style is not a complete style, but it provides the basic functionality to
     # create a line, which is cut at the graph boundaries (or at otherwise invalid points)
 
-    def __init__(self, epsilon=1e-10):
+    def __init__(self, epsilon=1e-10, simplify=None):
         self.epsilon = epsilon
+        self.simplify = simplify
 
     def initpointstopath(self, privatedata):
         privatedata.path = path.path()
         privatedata.linebasepoints = []
         privatedata.lastvpos = None
 
+    def simplifypoints(self, points, tolerance_pt):
+        # keep the first, the lowest, the highest, and the last point of each
+        # run of consecutive points within a column of width tolerance_pt;
+        # the line between the lowest and the highest point passes all other
+        # points of the run in horizontal distance of less than tolerance_pt
+        result = []
+        column = None
+        for i, (x_pt, y_pt) in enumerate(points):
+            newcolumn = math.floor(x_pt/tolerance_pt)
+            if newcolumn != column:
+                if column is not None:
+                    result.extend([points[j] for j in sorted({first, lowest, highest, last})])
+                column = newcolumn
+                first = lowest = highest = last = i
+                lowy_pt = highy_pt = y_pt
+            else:
+                if y_pt < lowy_pt:
+                    lowest, lowy_pt = i, y_pt
+                if y_pt > highy_pt:
+                    highest, highy_pt = i, y_pt
+                last = i
+        result.extend([points[j] for j in sorted({first, lowest, highest, last})])
+        return result
+
     def addpointstopath(self, privatedata):
         # add baselinepoints to privatedata.path
+        if self.simplify is not None and len(privatedata.linebasepoints) > 2:
+            privatedata.linebasepoints = self.simplifypoints(privatedata.linebasepoints, unit.topt(self.simplify))
         if len(privatedata.linebasepoints) > 1:
             privatedata.path.append(path.moveto_pt(*privatedata.linebasepoints[0]))
             if len(privatedata.linebasepoints) > 2:
@@ -618,6 +699,24 @@ class _line(_styleneedingpointpos):
                 self.addpointstopath(privatedata)
             privatedata.lastvpos = None
 
+    def addpoints(self, privatedata, graphvpos_pt, vposavailable, vposvalid, vpos):
+        # like addpoint, but for sequences of vposavailable and vposvalid and a list of vpos columns
+        vposlist = list(zip(*vpos))
+        count = len(vposlist)
+        i = 0
+        while i < count:
+            if vposvalid[i] and len(privatedata.linebasepoints):
+                # shortcut for a sequence of points inside the graph
+                j = i + 1
+                while j < count and vposvalid[j]:
+                    j += 1
+                privatedata.linebasepoints.extend([graphvpos_pt(*v) for v in vposlist[i:j]])
+                privatedata.lastvpos = list(vposlist[j-1])
+                i = j
+            else:
+                self.addpoint(privatedata, graphvpos_pt, vposavailable[i], vposvalid[i], list(vposlist[i]))
+                i += 1
+
     def addinvalid(self, privatedata):
         if len(privatedata.linebasepoints) > 1:
             self.addpointstopath(privatedata)
@@ -656,6 +755,9 @@ class line(_line):
     def drawpoint(self, privatedata, sharedata, graph, point):
         self.addpoint(privatedata, graph.vpos_pt, sharedata.vposavailable, sharedata.vposvalid, sharedata.vpos)
 
+    def drawpoints(self, privatedata, sharedata, graph, columns):
+        self.addpoints(privatedata, graph.vpos_pt, sharedata.vposavailable, sharedata.vposvalid, sharedata.vpos)
+
     def donedrawpoints(self, privatedata, sharedata, graph):
         path = self.donepointstopath(privatedata)
         if privatedata.lineattrs is not None and len(path):
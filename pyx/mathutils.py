@@ -136,6 +136,11 @@ def realpolyroots(*cs):
         else:
             raise RuntimeError("realpolyroots solver currently limited to polynoms up to the power of 4")
 
+try:
+    from ._normpathcode import realpolyroots
+except Exception:
+    pass
+
 
 # def realpolyroots_eigenvalue(*cs):
 #     # as realpolyroots but using an equivalent eigenvalue problem
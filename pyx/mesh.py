@@ -64,14 +64,33 @@ def coords24bit_pt(coords_pt, min_pt, max_pt):
     return struct.pack(">I", int((coords_pt-min_pt)*16777215.0/(max_pt-min_pt)))[1:]
 
 
-class PDFGenericResource(pdfwriter.PDFobject):
+class PDFshading(pdfwriter.PDFobject):
 
-    def __init__(self, type, name, content):
-        pdfwriter.PDFobject.__init__(self, type, _id=name)
-        self.content = content
+    isstream = True
+
+    def __init__(self, name, dictentries, data):
+        pdfwriter.PDFobject.__init__(self, "shading", _id=name)
+        self.dictentries = dictentries
+        self.data = data
+
+    def streamdata(self, writer):
+        return self.data
 
     def write(self, file, writer, registry):
-        file.write_bytes(self.content)
+        if writer.compress:
+            data = writer.compressstream(self.type, self.data)
+        else:
+            data = self.data
+        file.write("<<\n")
+        file.write(self.dictentries)
+        file.write("/Length %i\n" % len(data))
+        if writer.compress:
+            file.write("/Filter /FlateDecode\n")
+        file.write(">>\n"
+                   "stream\n")
+        file.write_bytes(data)
+        file.write("\n"
+                   "endstream\n")
 
 
 class mesh(baseclasses.canvasitem):
@@ -154,27 +173,17 @@ class mesh(baseclasses.canvasitem):
         else:
             thisbbox = self.bbox()
             bbox += thisbbox
-            d = self.data(thisbbox)
-            if writer.compress:
-                filter = "/Filter /FlateDecode\n"
-                d = zlib.compress(d)
-            else:
-                filter = ""
             name = "shading-%s" % id(self)
-            shading = PDFGenericResource("shading", name, ("""<<
-/ShadingType 4
+            shading = PDFshading(name, """/ShadingType 4
 /ColorSpace %s
 /BitsPerCoordinate 24
 /BitsPerComponent 8
 /BitsPerFlag 8
 /Decode [%f %f %f %f %s]
-/Length %i
-%s>>
-stream
 """ %            (self.elements[0].nodes[0].value.colorspacestring(),
                   thisbbox.llx_pt, thisbbox.urx_pt, thisbbox.lly_pt, thisbbox.ury_pt,
-                  " ".join(["0 1" for value in self.elements[0].nodes[0].value.to8bitbytes()]),
-                  len(d), filter)).encode('ascii') + d + b"\nendstream\n")
+                  " ".join(["0 1" for value in self.elements[0].nodes[0].value.to8bitbytes()])),
+                  self.data(thisbbox))
             registry.add(shading)
             registry.addresource("Shading", name, shading)
             file.write("/%s sh\n" % name)
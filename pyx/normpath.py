@@ -21,10 +21,15 @@
 # along with PyX; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
-import math, functools
+import array, bisect, collections.abc, itertools, math, functools, operator
 from . import mathutils, trafo, unit
 from . import bbox as bboxmodule
 
+try:
+    from ._normpathcode import *
+except Exception:
+    from .normpathcode import *
+
 
 class _marker: pass
 
@@ -203,107 +208,8 @@ class normline_pt(normsubpathitem):
 
     def intersect(self, other, epsilon):
         if isinstance(other, normline_pt):
-            a_deltax_pt = self.x1_pt - self.x0_pt
-            a_deltay_pt = self.y1_pt - self.y0_pt
-
-            b_deltax_pt = other.x1_pt - other.x0_pt
-            b_deltay_pt = other.y1_pt - other.y0_pt
-
-            invdet = b_deltax_pt * a_deltay_pt - b_deltay_pt * a_deltax_pt
-
-            if abs(invdet) < epsilon * epsilon:
-                # As invdet measures the area spanned by the two lines, least
-                # one of the lines is either very short or the lines are almost
-                # parallel. In both cases, a proper colinear check is adequate,
-                # already. Let's first check for short lines.
-                short_self = math.hypot(self.x1_pt - self.x0_pt,
-                                        self.y1_pt - self.y0_pt) < epsilon
-                short_other = math.hypot(other.x1_pt - other.x0_pt,
-                                         other.y1_pt - other.y0_pt) < epsilon
-
-                # For short lines we will only take their middle point into
-                # account.
-                if short_self:
-                    sx_pt = 0.5*(self.x0_pt + self.x1_pt)
-                    sy_pt = 0.5*(self.y0_pt + self.x1_pt)
-                if short_other:
-                    ox_pt = 0.5*(other.x0_pt + other.x1_pt)
-                    oy_pt = 0.5*(other.y0_pt + other.y1_pt)
-
-                def closepoint(x_pt, y_pt,
-                               x0_pt, y0_pt, x1_pt, y1_pt):
-                    """Returns the line parameter p in range [0, 1] for which
-                    the point (x_pt, y_pt) is closest to the line defined by
-                    ((x0_pt, y0_pt), (x1_pt, y1_pt)). The distance of (x0_pt,
-                    y0_pt) and (x1_pt, y1_pt) must be larger than epsilon. If
-                    the point has a greater distance than epsilon, None is
-                    returned."""
-                    p = (((x0_pt - x_pt)*(x0_pt - x1_pt) +
-                          (y0_pt - y_pt)*(y0_pt - y1_pt))/
-                         ((x1_pt - x0_pt)**2 + (y1_pt - y0_pt)**2))
-                    p = min(1, max(0, p))
-                    xs_pt = x0_pt + p*(x1_pt - x0_pt)
-                    ys_pt = y0_pt + p*(y1_pt - y0_pt)
-                    if math.hypot(xs_pt - x_pt, ys_pt - y_pt) < epsilon:
-                        return p
-                    return None # just be explicit in returning None here
-
-                if short_self and short_other:
-                    # If both lines are short, we just measure the distance of
-                    # the middle points.
-                    if math.hypot(ox_pt - sx_pt, oy_pt - sy_pt) < epsilon:
-                        return [(0.5, 0.5)]
-                elif short_self:
-                    p = closepoint(sx_pt, sy_pt,
-                                   other.x0_pt, other.y0_pt, other.x1_pt, other.y1_pt)
-                    if p is not None:
-                        return [(0.5, p)]
-                elif short_other:
-                    p = closepoint(ox_pt, oy_pt,
-                                   self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt)
-                    if p is not None:
-                        return [(p, 0.5)]
-                else:
-                    # For two long colinear lines, we need to test the
-                    # beginning and end point of the two lines with respect to
-                    # the other line, in all combinations. We return just one
-                    # solution even when the lines intersect for a whole range.
-                    p = closepoint(self.x0_pt, self.y0_pt, other.x0_pt, other.y0_pt, other.x1_pt, other.y1_pt)
-                    if p is not None:
-                        return [(0, p)]
-                    p = closepoint(self.x1_pt, self.y1_pt, other.x0_pt, other.y0_pt, other.x1_pt, other.y1_pt)
-                    if p is not None:
-                        return [(1, p)]
-                    p = closepoint(other.x0_pt, other.y0_pt, self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt)
-                    if p is not None:
-                        return [(p, 0)]
-                    p = closepoint(other.x1_pt, other.y1_pt, self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt)
-                    if p is not None:
-                        return [(p, 1)]
-                return []
-
-            det = 1.0 / invdet
-
-            ba_deltax0_pt = other.x0_pt - self.x0_pt
-            ba_deltay0_pt = other.y0_pt - self.y0_pt
-
-            a_t = (b_deltax_pt * ba_deltay0_pt - b_deltay_pt * ba_deltax0_pt) * det
-            b_t = (a_deltax_pt * ba_deltay0_pt - a_deltay_pt * ba_deltax0_pt) * det
-
-            # check for intersections out of bound
-            if not (0<=a_t<=1 and 0<=b_t<=1):
-                # correct the parameters, if the deviation is smaller than epsilon
-                a_t = min(1, max(0, a_t))
-                b_t = min(1, max(0, b_t))
-                a_x = self.x0_pt + a_deltax_pt*a_t
-                a_y = self.y0_pt + a_deltay_pt*a_t
-                b_x = other.x0_pt + b_deltax_pt*b_t
-                b_y = other.y0_pt + b_deltay_pt*b_t
-                if math.hypot(a_x - b_x, a_y - b_y) > epsilon:
-                    return []
-
-            # return parameters of intersection
-            return [(a_t, b_t)]
+            return lineintersect_pt(self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
+                                    other.x0_pt, other.y0_pt, other.x1_pt, other.y1_pt, epsilon)
         else:
             return [(s_t, o_t) for o_t, s_t in other.intersect(self, epsilon)]
 
@@ -343,9 +249,8 @@ class normline_pt(normsubpathitem):
         return result
 
     def trafo(self, params):
-        rotate = trafo.rotate(math.degrees(math.atan2(self.y1_pt-self.y0_pt, self.x1_pt-self.x0_pt)))
-        return [trafo.translate_pt(*at_pt) * rotate
-                for param, at_pt in zip(params, self.at_pt(params))]
+        matrix = trafo._rmatrix(math.degrees(math.atan2(self.y1_pt-self.y0_pt, self.x1_pt-self.x0_pt)))
+        return [trafo.trafo_pt(matrix, at_pt) for at_pt in self.at_pt(params)]
 
     def transformed(self, trafo):
         return normline_pt(*(trafo.apply_pt(self.x0_pt, self.y0_pt) + trafo.apply_pt(self.x1_pt, self.y1_pt)))
@@ -382,139 +287,92 @@ class normcurve_pt(normsubpathitem):
         return "normcurve_pt(%g, %g, %g, %g, %g, %g, %g, %g)" % (self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
                                                                  self.x2_pt, self.y2_pt, self.x3_pt, self.y3_pt)
 
-    def _split(self, t=0.5, epsilon=None, intersect=False):
+    def _split(self, t=0.5):
         """Split curve into two parts
 
         The splitting point is defined by the parameter t (in range 0 to 1).
-        When epsilon is None, the two resulting curves are returned. However,
-        when epsilon is set to a (small) float, the method can be used
-        recursively to reduce the complexity of a problem by turning a
-        normcurve_pt into several normline_pt segments. The method returns
-        normcurve_pt instances only, when they are not yet straight enough to
-        be replaceable by normline_pt instances. The criteria for returning a
-        line instead of a curve depends on the value of the boolean intersect.
-        When not set, the abort cirteria is defined by the error of the arclen
-        of the curve vs. the line not being larger than epsilon. When in
-        intersect mode, all points of the curve must be closer to the line than
-        epsilon.
+        The two resulting curves are returned.
         """
-
-        s = 1-t
-
-        # first, we have to calculate the  midpoints between adjacent
-        # control points
-        x01_pt = s*self.x0_pt + t*self.x1_pt
-        y01_pt = s*self.y0_pt + t*self.y1_pt
-        x12_pt = s*self.x1_pt + t*self.x2_pt
-        y12_pt = s*self.y1_pt + t*self.y2_pt
-        x23_pt = s*self.x2_pt + t*self.x3_pt
-        y23_pt = s*self.y2_pt + t*self.y3_pt
-
-        # In the next iterative step, we need the midpoints between 01 and 12
-        # and between 12 and 23
-        x01_12_pt = s*x01_pt + t*x12_pt
-        y01_12_pt = s*y01_pt + t*y12_pt
-        x12_23_pt = s*x12_pt + t*x23_pt
-        y12_23_pt = s*y12_pt + t*y23_pt
-
-        # Finally the midpoint is given by
-        xmidpoint_pt = s*x01_12_pt + t*x12_23_pt
-        ymidpoint_pt = s*y01_12_pt + t*y12_23_pt
-
-        def subcurve(x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt, newline, newcurve):
-            if epsilon is None:
-                return normcurve_pt(x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt)
-
-            # Before returning the subcurve we check whether we can
-            # replace it by a normline within an error of epsilon pts.
-            l0_pt = math.hypot(x3_pt-x0_pt, y3_pt-y0_pt)
-            l1_pt = math.hypot(x1_pt-x0_pt, y1_pt-y0_pt)
-            l2_pt = math.hypot(x2_pt-x1_pt, y2_pt-y1_pt)
-            l3_pt = math.hypot(x3_pt-x2_pt, y3_pt-y2_pt)
-
-            # When arclen calculation is performed, the maximal error value is
-            # given by the modulus of the difference between the length of the
-            # control polygon (i.e. |P1-P0|+|P2-P1|+|P3-P2|), which consitutes
-            # an upper bound for the length, and the length of the straight
-            # line between start and end point of the normcurve (i.e. |P3-P1|),
-            # which represents a lower bound.
-            if not intersect and l1_pt+l2_pt+l3_pt-l0_pt < epsilon:
-                # We can ignore the sign of l1_pt, l2_pt and l3_pt, as the sum
-                # of the absolute values is close to l0_pt anyway.
-                return newline(x0_pt, y0_pt, x3_pt, y3_pt, l1_pt, l2_pt, l3_pt)
-
-            if intersect:
-                # For intersections we calculate the distance of (x1_pt, y1_pt)
-                # and (x2_pt, y2_pt) from the line defined by (x0_pt, y0_pt)
-                # and (x3_pt, y3_pt). We skip the division by l0_pt in the
-                # result and calculate d1_pt*l0_pt and d2_pt*l0_pt instead.
-                d1_pt_times_l0_pt = (x3_pt-x0_pt)*(y0_pt-y1_pt) - (x0_pt-x1_pt)*(y3_pt-y0_pt)
-                d2_pt_times_l0_pt = (x0_pt-x3_pt)*(y3_pt-y2_pt) - (x3_pt-x2_pt)*(y0_pt-y3_pt)
-                if abs(d1_pt_times_l0_pt) < epsilon*l0_pt and abs(d2_pt_times_l0_pt) < epsilon*l0_pt:
-                    # We could return the line now, but for this to be correct,
-                    # we would need to take into account the signs of l1_pt,
-                    # l2_pt, and l3_pt. In addition, this could result in
-                    # multiple parameters matching a position on the line.
-                    s1 = (x1_pt-x0_pt)*(x3_pt-x0_pt)+(y1_pt-y0_pt)*(y3_pt-y0_pt)
-                    s2 = (x2_pt-x1_pt)*(x3_pt-x0_pt)+(y2_pt-y1_pt)*(y3_pt-y0_pt)
-                    s3 = (x2_pt-x3_pt)*(x0_pt-x3_pt)+(y2_pt-y3_pt)*(y0_pt-y3_pt)
-
-                    # If the signs are negative (i.e. we have backwards
-                    # directed segments in the control polygon), we can still
-                    # continue, if the corresponding segment is smaller than
-                    # epsilon.
-                    if ((s1 > 0 or l1_pt < epsilon) and
-                        (s2 > 0 or l2_pt < epsilon) and
-                        (s3 > 0 or l3_pt < epsilon)):
-                        # As the sign of the segments is either positive or the
-                        # segments are short, we can continue with the unsigned
-                        # values for the segment lengths, as for the arclen
-                        # calculation.
-                        return newline(x0_pt, y0_pt, x3_pt, y3_pt, l1_pt, l2_pt, l3_pt)
-
-            return newcurve(x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt)
-
-        return (subcurve(self.x0_pt, self.y0_pt,
-                         x01_pt, y01_pt,
-                         x01_12_pt, y01_12_pt,
-                         xmidpoint_pt, ymidpoint_pt,
-                         _leftnormline_pt, _leftnormcurve_pt),
-                subcurve(xmidpoint_pt, ymidpoint_pt,
-                         x12_23_pt, y12_23_pt,
-                         x23_pt, y23_pt,
-                         self.x3_pt, self.y3_pt,
-                         _rightnormline_pt, _rightnormcurve_pt))
+        a, b = splitcurve_pt(self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
+                             self.x2_pt, self.y2_pt, self.x3_pt, self.y3_pt, t)
+        return normcurve_pt(*a), normcurve_pt(*b)
+
+    def _flatten_pt(self, epsilon, intersect=False):
+        """Return a polyline approximating the curve
+
+        The curve is split at midpoints until the parts can be replaced by
+        lines within epsilon (see flatline_pt). The lines are returned in
+        order as tuples (t0, dt, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt,
+        l3_pt), where t0 and dt define the parameter range of the line and
+        l1_pt, l2_pt, l3_pt are the lengths of the control polygon needed to
+        convert line parameters into curve parameters by lineparam. When not
+        in intersect mode, epsilon is halved at each level of the splitting
+        such that the error of the total arclen stays below epsilon.
+        """
+        if not intersect:
+            return flatten_pt(self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
+                              self.x2_pt, self.y2_pt, self.x3_pt, self.y3_pt, epsilon)
+        result = []
+        stack = [(0, 1, (self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
+                         self.x2_pt, self.y2_pt, self.x3_pt, self.y3_pt), None)]
+        while stack:
+            t0, dt, points, lengths_pt = stack.pop()
+            if lengths_pt is not None:
+                result.append((t0, dt, points[0], points[1], points[6], points[7]) + lengths_pt)
+                continue
+            left, right = splitcurve_pt(*points, 0.5)
+            dt *= 0.5
+            if not dt:
+                raise RuntimeError("maximal splitting depth exceeded when flattening a curve")
+            stack.append((t0+dt, dt, right, flatline_pt(right, epsilon, True)))
+            stack.append((t0, dt, left, flatline_pt(left, epsilon, True)))
+        return result
 
     def _arclentoparam_pt(self, lengths_pt, epsilon):
-        a, b = self._split(epsilon=epsilon)
-        params_a, arclen_a_pt = a._arclentoparam_pt(lengths_pt, 0.5*epsilon)
-        params_b, arclen_b_pt = b._arclentoparam_pt([length_pt - arclen_a_pt for length_pt in lengths_pt], 0.5*epsilon)
+        lines = self._flatten_pt(epsilon)
+        arclens_pt = [0]
+        for t0, dt, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt, l3_pt in lines:
+            arclens_pt.append(arclens_pt[-1] + math.hypot(x0_pt-x1_pt, y0_pt-y1_pt))
         params = []
-        for param_a, param_b, length_pt in zip(params_a, params_b, lengths_pt):
-            if length_pt > arclen_a_pt:
-                params.append(b.subparamtoparam(param_b))
+        for length_pt in lengths_pt:
+            # take the first line ending at length_pt or beyond and
+            # extrapolate the first or last line for lengths out of range
+            i = min(bisect.bisect_left(arclens_pt, length_pt, 1), len(lines)) - 1
+            t0, dt, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt, l3_pt = lines[i]
+            l_pt = arclens_pt[i+1] - arclens_pt[i]
+            if l_pt:
+                params.append(t0 + dt*lineparam((length_pt-arclens_pt[i])/l_pt, l1_pt, l2_pt, l3_pt))
             else:
-                params.append(a.subparamtoparam(param_a))
-        return params, arclen_a_pt + arclen_b_pt
+                params.append(t0)
+        return params, arclens_pt[-1]
 
     def arclentoparam_pt(self, lengths_pt, epsilon):
         """return a tuple of params"""
         return self._arclentoparam_pt(lengths_pt, epsilon)[0]
 
     def arclen_pt(self, epsilon, upper=False):
-        a, b = self._split(epsilon=epsilon)
-        return a.arclen_pt(0.5*epsilon, upper=upper) + b.arclen_pt(0.5*epsilon, upper=upper)
+        if upper:
+            return sum([l1_pt + l2_pt + l3_pt for t0, dt, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt, l3_pt in self._flatten_pt(epsilon)])
+        return sum([math.hypot(x0_pt-x1_pt, y0_pt-y1_pt) for t0, dt, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt, l3_pt in self._flatten_pt(epsilon)])
+
+    def _polycoefficients_pt(self):
+        """return the coefficients of the polynomials x(t) and y(t)
+
+        The coefficients are returned in the order a3x_pt, a2x_pt, a1x_pt,
+        a0x_pt, a3y_pt, a2y_pt, a1y_pt, a0y_pt for the highest to the lowest
+        power of t."""
+        return (-self.x0_pt+3*self.x1_pt-3*self.x2_pt+self.x3_pt,
+                3*self.x0_pt-6*self.x1_pt+3*self.x2_pt,
+                -3*self.x0_pt+3*self.x1_pt,
+                self.x0_pt,
+                -self.y0_pt+3*self.y1_pt-3*self.y2_pt+self.y3_pt,
+                3*self.y0_pt-6*self.y1_pt+3*self.y2_pt,
+                -3*self.y0_pt+3*self.y1_pt,
+                self.y0_pt)
 
     def at_pt(self, params):
-        return [( (-self.x0_pt+3*self.x1_pt-3*self.x2_pt+self.x3_pt)*t*t*t +
-                  (3*self.x0_pt-6*self.x1_pt+3*self.x2_pt          )*t*t +
-                  (-3*self.x0_pt+3*self.x1_pt                      )*t +
-                  self.x0_pt,
-                  (-self.y0_pt+3*self.y1_pt-3*self.y2_pt+self.y3_pt)*t*t*t +
-                  (3*self.y0_pt-6*self.y1_pt+3*self.y2_pt          )*t*t +
-                  (-3*self.y0_pt+3*self.y1_pt                      )*t +
-                  self.y0_pt )
-                for t in params]
+        return curveat_pt(self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
+                          self.x2_pt, self.y2_pt, self.x3_pt, self.y3_pt, params)
 
     def atbegin_pt(self):
         return self.x0_pt, self.y0_pt
@@ -535,39 +393,65 @@ class normcurve_pt(normsubpathitem):
                                   max(self.y0_pt, self.y1_pt, self.y2_pt, self.y3_pt))
 
     def curvature_pt(self, params):
-        result = []
-        # see notes in rotation
-        approxarclen = (math.hypot(self.x1_pt-self.x0_pt, self.y1_pt-self.y0_pt) +
-                        math.hypot(self.x2_pt-self.x1_pt, self.y2_pt-self.y1_pt) +
-                        math.hypot(self.x3_pt-self.x2_pt, self.y3_pt-self.y2_pt))
-        for param in params:
-            xdot = ( 3 * (1-param)*(1-param) * (-self.x0_pt + self.x1_pt) +
-                     6 * (1-param)*param * (-self.x1_pt + self.x2_pt) +
-                     3 * param*param * (-self.x2_pt + self.x3_pt) )
-            ydot = ( 3 * (1-param)*(1-param) * (-self.y0_pt + self.y1_pt) +
-                     6 * (1-param)*param * (-self.y1_pt + self.y2_pt) +
-                     3 * param*param * (-self.y2_pt + self.y3_pt) )
-            xddot = ( 6 * (1-param) * (self.x0_pt - 2*self.x1_pt + self.x2_pt) +
-                      6 * param * (self.x1_pt - 2*self.x2_pt + self.x3_pt) )
-            yddot = ( 6 * (1-param) * (self.y0_pt - 2*self.y1_pt + self.y2_pt) +
-                      6 * param * (self.y1_pt - 2*self.y2_pt + self.y3_pt) )
-
-            hypot = math.hypot(xdot, ydot)
-            result.append((xdot*yddot - ydot*xddot) / hypot**3)
-        return result
+        return curvecurvature_pt(self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
+                                 self.x2_pt, self.y2_pt, self.x3_pt, self.y3_pt, params)
 
     def intersect(self, other, epsilon):
-        # There can be no intersection point if the control boxes do not
-        # overlap. Note that we use the control box instead of the bounding
-        # box here, because the former can be calculated more efficiently for
-        # Bezier curves.
-        if not self.cbox().enlarged_pt(epsilon).intersects(other.cbox()):
-            return []
-        a, b = self._split(epsilon=epsilon, intersect=True)
-        # To improve the performance in the general case we alternate the
-        # splitting process between the two normsubpathitems
-        return ( [(a.subparamtoparam(a_t), o_t) for o_t, a_t in other.intersect(a, epsilon)] +
-                 [(b.subparamtoparam(b_t), o_t) for o_t, b_t in other.intersect(b, epsilon)] )
+        # The curves are split at midpoints alternating between self and
+        # other as long as their control boxes overlap. Parts are represented
+        # by tuples (t0, dt, points, lengths_pt), where points are the control
+        # points of a curve or the end points of a line, and lengths_pt are
+        # the lengths of the control polygon of a line replacing a part of a
+        # curve (see _flatten_pt). We use the control box instead of the
+        # bounding box, because the former can be calculated more efficiently
+        # for Bezier curves.
+        selfpart = (0, 1, (self.x0_pt, self.y0_pt, self.x1_pt, self.y1_pt,
+                           self.x2_pt, self.y2_pt, self.x3_pt, self.y3_pt), None)
+        if isinstance(other, normline_pt):
+            otherpart = (0, 1, (other.x0_pt, other.y0_pt, other.x1_pt, other.y1_pt), None)
+        else:
+            otherpart = (0, 1, (other.x0_pt, other.y0_pt, other.x1_pt, other.y1_pt,
+                                other.x2_pt, other.y2_pt, other.x3_pt, other.y3_pt), None)
+        result = []
+        # the stack contains pairs of parts, where the first one is to be split
+        # next, and a flag whether this first part belongs to self
+        stack = [(selfpart, otherpart, True)]
+        while stack:
+            splitpart, otherpart, isself = stack.pop()
+            splitpoints = splitpart[2]
+            otherpoints = otherpart[2]
+            if (min(splitpoints[0::2]) - epsilon > max(otherpoints[0::2]) or
+                min(otherpoints[0::2]) > max(splitpoints[0::2]) + epsilon or
+                min(splitpoints[1::2]) - epsilon > max(otherpoints[1::2]) or
+                min(otherpoints[1::2]) > max(splitpoints[1::2]) + epsilon):
+                continue
+            t0, dt, points, lengths_pt = splitpart
+            dt *= 0.5
+            if not dt:
+                raise RuntimeError("maximal splitting depth exceeded when intersecting curves")
+            newpairs = []
+            left, right = splitcurve_pt(*points, 0.5)
+            for subt0, subpoints in (t0, left), (t0+dt, right):
+                sublengths_pt = flatline_pt(subpoints, epsilon, True)
+                if sublengths_pt is not None:
+                    subpart = (subt0, dt, subpoints[0:2] + subpoints[6:8], sublengths_pt)
+                else:
+                    subpart = (subt0, dt, subpoints, None)
+                if len(otherpoints) == 8:
+                    newpairs.append((otherpart, subpart, not isself))
+                elif sublengths_pt is None:
+                    newpairs.append((subpart, otherpart, isself))
+                else:
+                    # intersect two lines
+                    otherline = normline_pt(*otherpoints)
+                    subline = normline_pt(*subpart[2])
+                    for other_t, sub_t in otherline.intersect(subline, epsilon):
+                        if isself:
+                            result.append((_partparam(subpart, sub_t), _partparam(otherpart, other_t)))
+                        else:
+                            result.append((_partparam(otherpart, other_t), _partparam(subpart, sub_t)))
+            stack.extend(reversed(newpairs))
+        return result
 
     def modifiedbegin_pt(self, x_pt, y_pt):
         return normcurve_pt(x_pt, y_pt,
@@ -582,10 +466,28 @@ class normcurve_pt(normsubpathitem):
                             x_pt, y_pt)
 
     def _paramtoarclen_pt(self, params, epsilon):
-        arclens_pt = [segment.arclen_pt(epsilon) for segment in self.segments([0] + list(params) + [1])]
-        for i in range(1, len(arclens_pt)):
-            arclens_pt[i] += arclens_pt[i-1]
-        return arclens_pt[:-1], arclens_pt[-1]
+        # The arc lengths are accumulated along the segments starting at 0,
+        # i.e. in increasing order for positive params (including the end
+        # point 1 for the total arc length) and in decreasing order with a
+        # negative sign for negative params.
+        result = [None] * len(params)
+        totalarclen_pt = None
+        forward = sorted([(param, i) for i, param in enumerate(params) if param >= 0] + [(1, None)],
+                         key=lambda paramindex: paramindex[0])
+        backward = sorted([(param, i) for i, param in enumerate(params) if param < 0],
+                          key=lambda paramindex: paramindex[0], reverse=True)
+        for sign, paramindices in [(1, forward), (-1, backward)]:
+            if not paramindices:
+                continue
+            arclen_pt = 0
+            segments = self.segments([0] + [param for param, i in paramindices])
+            for (param, i), segment in zip(paramindices, segments):
+                arclen_pt += segment.arclen_pt(epsilon)
+                if i is None:
+                    totalarclen_pt = arclen_pt
+                else:
+                    result[i] = sign*arclen_pt
+        return result, totalarclen_pt
 
     def pathitem(self):
         from . import path
@@ -594,17 +496,19 @@ class normcurve_pt(normsubpathitem):
     def reversed(self):
         return normcurve_pt(self.x3_pt, self.y3_pt, self.x2_pt, self.y2_pt, self.x1_pt, self.y1_pt, self.x0_pt, self.y0_pt)
 
+    def _angles(self, params):
+        """return the angles in degrees of the tangents at params"""
+        a3x_pt, a2x_pt, a1x_pt, a0x_pt, a3y_pt, a2y_pt, a1y_pt, a0y_pt = self._polycoefficients_pt()
+        a3x_pt *= 3
+        a2x_pt *= 2
+        a3y_pt *= 3
+        a2y_pt *= 2
+        return [math.degrees(math.atan2(a3y_pt*param*param + a2y_pt*param + a1y_pt,
+                                        a3x_pt*param*param + a2x_pt*param + a1x_pt))
+                for param in params]
+
     def rotation(self, params):
-        result = []
-        for param in params:
-            tdx_pt = (3*(  -self.x0_pt+3*self.x1_pt-3*self.x2_pt+self.x3_pt)*param*param +
-                      2*( 3*self.x0_pt-6*self.x1_pt+3*self.x2_pt           )*param +
-                        (-3*self.x0_pt+3*self.x1_pt                        ))
-            tdy_pt = (3*(  -self.y0_pt+3*self.y1_pt-3*self.y2_pt+self.y3_pt)*param*param +
-                      2*( 3*self.y0_pt-6*self.y1_pt+3*self.y2_pt           )*param +
-                        (-3*self.y0_pt+3*self.y1_pt                        ))
-            result.append(trafo.rotate(math.degrees(math.atan2(tdy_pt, tdx_pt))))
-        return result
+        return [trafo.rotate(angle) for angle in self._angles(params)]
 
     def segments(self, params):
         if len(params) < 2:
@@ -660,10 +564,8 @@ class normcurve_pt(normsubpathitem):
         return result
 
     def trafo(self, params):
-        result = []
-        for rotation, at_pt in zip(self.rotation(params), self.at_pt(params)):
-            result.append(trafo.translate_pt(*at_pt) * rotation)
-        return result
+        return [trafo.trafo_pt(trafo._rmatrix(angle), at_pt)
+                for angle, at_pt in zip(self._angles(params), self.at_pt(params))]
 
     def transformed(self, trafo):
         x0_pt, y0_pt = trafo.apply_pt(self.x0_pt, self.y0_pt)
@@ -714,75 +616,429 @@ class normcurve_pt(normsubpathitem):
         return 6*self.y3_pt-18*self.y2_pt+18*self.y1_pt-6*self.y0_pt
 
 
-# curve replacements used by midpointsplit:
-# The replacements are normline_pt and normcurve_pt instances with an
-# additional subparamtoparam function for proper conversion of the
-# parametrization. Note that we only one direction (when a parameter
-# gets calculated), since the other way around direction midpointsplit
-# is not needed at all
+# helper function for normcurve_pt.intersect
 
-class _leftnormline_pt(normline_pt):
+def _partparam(part, param):
+    """convert the param of a part used in normcurve_pt.intersect into the param of the whole"""
+    t0, dt, points, lengths_pt = part
+    if lengths_pt is not None:
+        return t0 + dt*lineparam(param, *lengths_pt)
+    return t0 + dt*param
 
-    __slots__ = "x0_pt", "y0_pt", "x1_pt", "y1_pt", "l1_pt", "l2_pt", "l3_pt"
 
-    def __init__(self, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt, l3_pt):
-        normline_pt.__init__(self, x0_pt, y0_pt, x1_pt, y1_pt)
-        self.l1_pt = l1_pt
-        self.l2_pt = l2_pt
-        self.l3_pt = l3_pt
+################################################################################
+# normsubpath
+################################################################################
 
-    def arclen_pt(self,  epsilon, upper=False):
-        if upper:
-            return self.l1_pt + self.l2_pt + self.l3_pt
+def _transformednormsubpathitems(normsubpathitems, trafo):
+    """return list of normsubpathitems transformed by trafo
+
+    The points of all normsubpathitems are collected and transformed at
+    once by trafo.apply_pt_many.
+    """
+    points_pt = []
+    for normsubpathitem in normsubpathitems:
+        if isinstance(normsubpathitem, normline_pt):
+            points_pt.extend((normsubpathitem.x0_pt, normsubpathitem.y0_pt, normsubpathitem.x1_pt, normsubpathitem.y1_pt))
         else:
-            return math.hypot(self.x0_pt-self.x1_pt, self.y0_pt-self.y1_pt)
-
-    def subparamtoparam(self, param):
-        if 0 <= param <= 1:
-            params = mathutils.realpolyroots(self.l1_pt-2*self.l2_pt+self.l3_pt,
-                                             -3*self.l1_pt+3*self.l2_pt,
-                                             3*self.l1_pt,
-                                             -param*(self.l1_pt+self.l2_pt+self.l3_pt))
-            # we might get several solutions and choose the one closest to 0.5
-            # (we want the solution to be in the range 0 <= param <= 1; in case
-            # we get several solutions in this range, they all will be close to
-            # each other since l1_pt+l2_pt+l3_pt-l0_pt < epsilon)
-            params.sort(key=lambda t: abs(t-0.5))
-            return 0.5*params[0]
+            points_pt.extend((normsubpathitem.x0_pt, normsubpathitem.y0_pt, normsubpathitem.x1_pt, normsubpathitem.y1_pt,
+                              normsubpathitem.x2_pt, normsubpathitem.y2_pt, normsubpathitem.x3_pt, normsubpathitem.y3_pt))
+    points_pt = trafo.apply_pt_many(points_pt)
+    result = []
+    i = 0
+    for normsubpathitem in normsubpathitems:
+        if isinstance(normsubpathitem, normline_pt):
+            result.append(normline_pt(*points_pt[i:i+4]))
+            i += 4
         else:
-            # when we are outside the proper parameter range, we skip the non-linear
-            # transformation, since it becomes slow and it might even start to be
-            # numerically instable
-            return 0.5*param
+            result.append(normcurve_pt(*points_pt[i:i+8]))
+            i += 8
+    return result
 
 
-class _rightnormline_pt(_leftnormline_pt):
+def _outputnormsubpathitems(normsubpathitems, write, writeitem, lineformat, curveformat, inverse_y=False):
+    """write normsubpathitems formatting the coordinates of many of them at once
 
-    __slots__ = "x0_pt", "y0_pt", "x1_pt", "y1_pt", "l1_pt", "l2_pt", "l3_pt"
+    The format strings of the normlines and normcurves and their coordinates
+    are collected and formatted by a single operation per chunk of
+    normsubpathitems. Other normsubpathitems are passed to writeitem.
+    """
+    formats = []
+    values = []
+    append = values.append
+    for normsubpathitem in normsubpathitems:
+        if normsubpathitem.__class__ is normline_pt:
+            formats.append(lineformat)
+            append(normsubpathitem.x1_pt)
+            append(-normsubpathitem.y1_pt if inverse_y else normsubpathitem.y1_pt)
+        elif normsubpathitem.__class__ is normcurve_pt:
+            formats.append(curveformat)
+            if inverse_y:
+                values.extend((normsubpathitem.x1_pt, -normsubpathitem.y1_pt, normsubpathitem.x2_pt, -normsubpathitem.y2_pt,
+                               normsubpathitem.x3_pt, -normsubpathitem.y3_pt))
+            else:
+                values.extend((normsubpathitem.x1_pt, normsubpathitem.y1_pt, normsubpathitem.x2_pt, normsubpathitem.y2_pt,
+                               normsubpathitem.x3_pt, normsubpathitem.y3_pt))
+        else:
+            if formats:
+                write("".join(formats) % tuple(values))
+                formats = []
+                values = []
+                append = values.append
+            writeitem(normsubpathitem)
+            continue
+        if len(formats) >= 1024:
+            write("".join(formats) % tuple(values))
+            formats = []
+            values = []
+            append = values.append
+    if formats:
+        write("".join(formats) % tuple(values))
+
+
+def _sweeppairs(bboxes_a, bboxes_b, indices_a, indices_b):
+    """return list of index pairs of intersecting bboxes in bboxes_a and bboxes_b
+
+    Only the bboxes given by the lists indices_a and indices_b are taken into
+    account. The pairs are found by a sweep along the x axis over the lower
+    left corners of the bboxes, keeping lists of the bboxes currently crossed
+    by the sweep line.
+    """
+    events = sorted([(bboxes_a[i].llx_pt, 0, i) for i in indices_a] +
+                    [(bboxes_b[i].llx_pt, 1, i) for i in indices_b])
+    bboxes = bboxes_a, bboxes_b
+    active = [], []
+    result = []
+    for llx_pt, which, i in events:
+        abbox = bboxes[which][i]
+        otherbboxes = bboxes[1-which]
+        otheractive = []
+        for j in active[1-which]:
+            otherbbox = otherbboxes[j]
+            if otherbbox.urx_pt >= llx_pt:
+                otheractive.append(j)
+                if otherbbox.lly_pt <= abbox.ury_pt and abbox.lly_pt <= otherbbox.ury_pt:
+                    if which:
+                        result.append((j, i))
+                    else:
+                        result.append((i, j))
+        active[1-which][:] = otheractive
+        active[which].append(i)
+    return result
 
-    def subparamtoparam(self, param):
-        return 0.5+_leftnormline_pt.subparamtoparam(self, param)
 
+def _overlappingpairs(bboxes_a, bboxes_b, leafsize=32):
+    """return sorted list of index pairs of intersecting bboxes in bboxes_a and bboxes_b
 
-class _leftnormcurve_pt(normcurve_pt):
+    The common area of the bboxes is split in halves along its longer side
+    recursively, passing bboxes crossing the split to both halves, until at
+    most leafsize bboxes are left or the split does not separate the bboxes.
+    The pairs of those bboxes are found by a sweep along the x axis. Thus the
+    sweep does not need to check bboxes overlapping in x but not in y.
+    """
+    result = {} # pairs found (as keys, as pairs may be found in several halves)
+    stack = [(list(range(len(bboxes_a))), list(range(len(bboxes_b))))]
+    while stack:
+        indices_a, indices_b = stack.pop()
+        if not indices_a or not indices_b:
+            continue
+        # restrict the bboxes to the common area
+        llx_pt = max(min(bboxes_a[i].llx_pt for i in indices_a), min(bboxes_b[i].llx_pt for i in indices_b))
+        lly_pt = max(min(bboxes_a[i].lly_pt for i in indices_a), min(bboxes_b[i].lly_pt for i in indices_b))
+        urx_pt = min(max(bboxes_a[i].urx_pt for i in indices_a), max(bboxes_b[i].urx_pt for i in indices_b))
+        ury_pt = min(max(bboxes_a[i].ury_pt for i in indices_a), max(bboxes_b[i].ury_pt for i in indices_b))
+        if llx_pt > urx_pt or lly_pt > ury_pt:
+            continue
+        indices_a, indices_b = [[i for i in indices if bboxes[i].llx_pt <= urx_pt and bboxes[i].urx_pt >= llx_pt and
+                                                        bboxes[i].lly_pt <= ury_pt and bboxes[i].ury_pt >= lly_pt]
+                                for indices, bboxes in [(indices_a, bboxes_a), (indices_b, bboxes_b)]]
+        count = len(indices_a) + len(indices_b)
+        if count > leafsize:
+            if urx_pt - llx_pt >= ury_pt - lly_pt:
+                axes = [("llx_pt", "urx_pt", 0.5*(llx_pt+urx_pt)), ("lly_pt", "ury_pt", 0.5*(lly_pt+ury_pt))]
+            else:
+                axes = [("lly_pt", "ury_pt", 0.5*(lly_pt+ury_pt)), ("llx_pt", "urx_pt", 0.5*(llx_pt+urx_pt))]
+            for lower, upper, split_pt in axes:
+                lowerindices = [[i for i in indices if getattr(bboxes[i], lower) <= split_pt]
+                                for indices, bboxes in [(indices_a, bboxes_a), (indices_b, bboxes_b)]]
+                upperindices = [[i for i in indices if getattr(bboxes[i], upper) >= split_pt]
+                                for indices, bboxes in [(indices_a, bboxes_a), (indices_b, bboxes_b)]]
+                if sum(map(len, lowerindices)) < count and sum(map(len, upperindices)) < count:
+                    stack.append(lowerindices)
+                    stack.append(upperindices)
+                    break
+            else:
+                result.update(dict.fromkeys(_sweeppairs(bboxes_a, bboxes_b, indices_a, indices_b)))
+        else:
+            result.update(dict.fromkeys(_sweeppairs(bboxes_a, bboxes_b, indices_a, indices_b)))
+    return sorted(result)
 
-    __slots__ = "x0_pt", "y0_pt", "x1_pt", "y1_pt", "x2_pt", "y2_pt", "x3_pt", "y3_pt"
 
-    def subparamtoparam(self, param):
-        return 0.5*param
+class normsubpathitemarray(collections.abc.MutableSequence):
 
+    """compact storage of the normsubpathitems of a normsubpath
 
-class _rightnormcurve_pt(normcurve_pt):
+    The coordinates are kept in a single array of floats, where the end
+    point of an item and the beginning of the next item share their
+    coordinates whenever they are equal. The type of each item is stored
+    by a tag (0 for a normline_pt, 1 for a normcurve_pt). Items are
+    created on demand when accessed, i.e. modifications of a returned item
+    are not stored in the array, but the item has to be assigned back.
+    Items of other classes (like pdfmoveto_pt) are kept as they are in
+    addition to their coordinates.
+    """
 
-    __slots__ = "x0_pt", "y0_pt", "x1_pt", "y1_pt", "x2_pt", "y2_pt", "x3_pt", "y3_pt"
+    def __init__(self, normsubpathitems=[]):
+        self.points_pt = array.array("d")
+        self.starts = array.array("q")
+        self.tags = array.array("b")
+        self.items = {}
+        self.curves = 0
+        self.extend(normsubpathitems)
 
-    def subparamtoparam(self, param):
-        return 0.5+0.5*param
+    def __len__(self):
+        return len(self.tags)
 
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            if i == slice(None):
+                result = normsubpathitemarray()
+                result.points_pt = self.points_pt[:]
+                result.starts = self.starts[:]
+                result.tags = self.tags[:]
+                result.items = self.items.copy()
+                result.curves = self.curves
+                return result
+            return normsubpathitemarray([self[j] for j in range(*i.indices(len(self.tags)))])
+        if i < 0:
+            i += len(self.tags)
+        if not 0 <= i < len(self.tags):
+            raise IndexError("normsubpathitemarray index out of range")
+        if i in self.items:
+            return self.items[i]
+        s = 2*self.starts[i]
+        if self.tags[i]:
+            return normcurve_pt(*self.points_pt[s:s+8])
+        return normline_pt(*self.points_pt[s:s+4])
+
+    def __iter__(self):
+        points_pt = self.points_pt
+        items = self.items
+        for i, (s, tag) in enumerate(zip(self.starts, self.tags)):
+            if i in items:
+                yield items[i]
+            elif tag:
+                yield normcurve_pt(*points_pt[2*s:2*s+8])
+            else:
+                yield normline_pt(points_pt[2*s], points_pt[2*s+1], points_pt[2*s+2], points_pt[2*s+3])
+
+    def _index(self, i):
+        if i < 0:
+            i += len(self.tags)
+        if not 0 <= i < len(self.tags):
+            raise IndexError("normsubpathitemarray index out of range")
+        return i
+
+    def __setitem__(self, i, anormsubpathitem):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self.tags))
+            if step != 1:
+                normsubpathitems = list(self)
+                normsubpathitems[i] = anormsubpathitem
+                self._rebuild(normsubpathitems)
+            else:
+                self._splice(start, max(start, stop), anormsubpathitem)
+        else:
+            i = self._index(i)
+            self._splice(i, i+1, [anormsubpathitem])
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self.tags))
+            if step != 1:
+                normsubpathitems = list(self)
+                del normsubpathitems[i]
+                self._rebuild(normsubpathitems)
+            else:
+                self._splice(start, max(start, stop), [])
+        else:
+            i = self._index(i)
+            self._splice(i, i+1, [])
+
+    def insert(self, i, anormsubpathitem):
+        if i < 0:
+            i = max(0, i + len(self.tags))
+        i = min(i, len(self.tags))
+        self._splice(i, i, [anormsubpathitem])
+
+    def _rebuild(self, normsubpathitems):
+        self.points_pt = array.array("d")
+        self.starts = array.array("q")
+        self.tags = array.array("b")
+        self.items = {}
+        self.curves = 0
+        self.extend(normsubpathitems)
+
+    def _end(self, i):
+        # index of the end point of item i
+        return self.starts[i] + (3 if self.tags[i] else 1)
+
+    def _begin(self, i):
+        # index of the first point stored for item i (or behind all points)
+        if i == len(self.tags):
+            return len(self.points_pt)//2
+        start = self.starts[i]
+        if i and start == self._end(i-1):
+            return start + 1
+        return start
+
+    def _splice(self, i, j, normsubpathitems):
+        # replace the items i to j (exclusive) by normsubpathitems; the item
+        # behind is stored anew, as its beginning might be shared with the
+        # end of the replaced items, the start indices of all further items
+        # are shifted only
+        count = len(self.tags)
+        k = min(j+1, count)
+        newitems = normsubpathitemarray()
+        if i:
+            # start with the end point of the previous item to share it
+            end = self._end(i-1)
+            newitems.points_pt = self.points_pt[2*end:2*end+2]
+        else:
+            end = 0
+        newitems.extend(list(normsubpathitems) + [self[l] for l in range(j, k)])
+        begin = self._begin(i)
+        stop = self._begin(k)
+        newpoints_pt = newitems.points_pt[2:] if i else newitems.points_pt
+        pointsdelta = len(newpoints_pt)//2 - (stop - begin)
+        itemsdelta = len(newitems.tags) - (k-i)
+        self.points_pt[2*begin:2*stop] = newpoints_pt
+        newstarts = array.array("q", [end + start for start in newitems.starts])
+        if pointsdelta or itemsdelta:
+            self.starts[i:] = newstarts + array.array("q", map(pointsdelta.__add__, self.starts[k:]))
+        else:
+            self.starts[i:k] = newstarts
+        self.curves += newitems.curves - sum(self.tags[i:k])
+        self.tags[i:k] = newitems.tags
+        if self.items or newitems.items:
+            items = dict((l, item) for l, item in self.items.items() if l < i)
+            items.update((i+l, item) for l, item in newitems.items.items())
+            items.update((l+itemsdelta, item) for l, item in self.items.items() if l >= k)
+            self.items = items
+
+    def _appendbegin_pt(self, x_pt, y_pt):
+        points_pt = self.points_pt
+        if not points_pt or points_pt[-2] != x_pt or points_pt[-1] != y_pt:
+            points_pt.append(x_pt)
+            points_pt.append(y_pt)
+        self.starts.append(len(points_pt)//2 - 1)
+
+    def append(self, anormsubpathitem):
+        if type(anormsubpathitem) not in (normline_pt, normcurve_pt):
+            self.items[len(self.tags)] = anormsubpathitem
+        self._appendbegin_pt(anormsubpathitem.x0_pt, anormsubpathitem.y0_pt)
+        if isinstance(anormsubpathitem, normcurve_pt):
+            self.points_pt.extend((anormsubpathitem.x1_pt, anormsubpathitem.y1_pt,
+                                   anormsubpathitem.x2_pt, anormsubpathitem.y2_pt,
+                                   anormsubpathitem.x3_pt, anormsubpathitem.y3_pt))
+            self.tags.append(1)
+            self.curves += 1
+        else:
+            self.points_pt.append(anormsubpathitem.x1_pt)
+            self.points_pt.append(anormsubpathitem.y1_pt)
+            self.tags.append(0)
+
+    def appendline_pt(self, x0_pt, y0_pt, x1_pt, y1_pt):
+        """append a normline_pt given by its coordinates"""
+        self._appendbegin_pt(x0_pt, y0_pt)
+        self.points_pt.append(x1_pt)
+        self.points_pt.append(y1_pt)
+        self.tags.append(0)
+
+    def appendlines_pt(self, x_pt, y_pt, points_pt):
+        """append normlines_pt from (x_pt, y_pt) through points_pt"""
+        if not points_pt:
+            return
+        self.appendline_pt(x_pt, y_pt, *points_pt[0])
+        start = len(self.points_pt)//2 - 1
+        self.points_pt.extend(itertools.chain.from_iterable(points_pt[1:]))
+        self.starts.extend(range(start, start+len(points_pt)-1))
+        self.tags.frombytes(bytes(len(points_pt)-1))
+
+    def _chained(self):
+        # all items are lines and directly follow each other
+        return not self.curves and len(self.points_pt) == 2*len(self.tags) + 2
+
+    def bbox(self):
+        if not self.tags:
+            return bboxmodule.empty()
+        if not self.curves:
+            xs_pt = self.points_pt[0::2]
+            ys_pt = self.points_pt[1::2]
+            return bboxmodule.bbox_pt(min(xs_pt), min(ys_pt), max(xs_pt), max(ys_pt))
+        abbox = bboxmodule.empty()
+        for anormsubpathitem in self:
+            abbox += anormsubpathitem.bbox()
+        return abbox
+
+    def arclen_pt(self, epsilon, upper=False):
+        if self._chained() and not self.items:
+            xs_pt = self.points_pt[0::2]
+            ys_pt = self.points_pt[1::2]
+            return sum(map(math.hypot, map(operator.sub, xs_pt[1:], xs_pt[:-1]), map(operator.sub, ys_pt[1:], ys_pt[:-1])))
+        return sum([anormsubpathitem.arclen_pt(epsilon, upper=upper) for anormsubpathitem in self])
+
+    def transformed(self, trafo):
+        """return normsubpathitemarray with all points transformed by trafo"""
+        result = normsubpathitemarray()
+        result.points_pt = array.array("d", trafo.apply_pt_many(self.points_pt))
+        result.starts = self.starts[:]
+        result.tags = self.tags[:]
+        result.curves = self.curves
+        return result
+
+    def _output(self, count, write, writeitem, lineformat, curveformat, inverse_y=False):
+        points_pt = self.points_pt
+        starts = self.starts
+        tags = self.tags
+        items = self.items
+        i = 0
+        while i < count:
+            if i in items:
+                writeitem(items[i])
+                i += 1
+                continue
+            s = starts[i]
+            if tags[i]:
+                j = i + 1
+                template = curveformat
+                values = points_pt[2*s+2:2*s+8]
+            else:
+                # collect a run of directly connected lines
+                j = i + 1
+                while j < count and not tags[j] and starts[j] == s + j - i and j not in items:
+                    j += 1
+                template = lineformat * (j-i)
+                values = points_pt[2*s+2:2*(s+j-i)+2]
+            if inverse_y:
+                values[1::2] = array.array("d", [-y_pt for y_pt in values[1::2]])
+            write(template % tuple(values))
+            i = j
+
+    def outputPS(self, file, writer, count):
+        self._output(count, file.write, lambda anormsubpathitem: anormsubpathitem.outputPS(file, writer),
+                     "%g %g lineto\n", "%g %g %g %g %g %g curveto\n")
+
+    def outputPDF(self, file, writer, count):
+        self._output(count, file.write, lambda anormsubpathitem: anormsubpathitem.outputPDF(file, writer),
+                     "%f %f l\n", "%f %f %f %f %f %f c\n")
+
+    def returnSVGdata(self, inverse_y, count):
+        data = []
+        self._output(count, data.append, lambda anormsubpathitem: data.append(anormsubpathitem.returnSVGdata(inverse_y)),
+                     "L%g %g", "C%g %g %g %g %g %g", inverse_y)
+        return "".join(data)
 
-################################################################################
-# normsubpath
-################################################################################
 
 class normsubpath:
 
@@ -803,11 +1059,18 @@ class normsubpath:
     - epsilon might be none, disallowing any numerics, but allowing for
       arbitrary short paths. This is used in pdf output, where all paths need
       to be transformed to normpaths.
+
+    When compact is set, the normsubpathitems are stored in a
+    normsubpathitemarray instead of a list.
+
+    The cumulative arc lengths of the normsubpathitems are cached for the
+    conversion between params and arc lengths. The cache is invalidated
+    whenever the normsubpath is modified by its methods.
     """
 
-    __slots__ = "normsubpathitems", "closed", "epsilon", "skippedline"
+    __slots__ = "normsubpathitems", "closed", "epsilon", "skippedline", "_arclens_pt"
 
-    def __init__(self, normsubpathitems=[], closed=0, epsilon=_marker):
+    def __init__(self, normsubpathitems=[], closed=0, epsilon=_marker, compact=0):
         """construct a normsubpath"""
         if epsilon is _marker:
             epsilon = _epsilon
@@ -817,8 +1080,12 @@ class normsubpath:
         # we remember this fact by a line because we have to take it
         # properly into account when appending further normsubpathitems
         self.skippedline = None
+        self._arclens_pt = None
 
-        self.normsubpathitems = []
+        if compact:
+            self.normsubpathitems = normsubpathitemarray()
+        else:
+            self.normsubpathitems = []
         self.closed = 0
 
         # a test (might be temporary)
@@ -856,16 +1123,32 @@ class normsubpath:
         """
 
         result = {}
+        lastindex = len(self.normsubpathitems) - 1
         for i, param in enumerate(params):
             if param > 0:
                 index = int(param)
-                if index > len(self.normsubpathitems) - 1:
-                    index = len(self.normsubpathitems) - 1
+                if index > lastindex:
+                    index = lastindex
             else:
                 index = 0
-            result.setdefault(index, ([], []))
-            result[index][0].append(i)
-            result[index][1].append(param - index)
+            try:
+                indices, normsubpathitemparams = result[index]
+            except KeyError:
+                indices, normsubpathitemparams = result[index] = [], []
+            indices.append(i)
+            normsubpathitemparams.append(param - index)
+        return result
+
+    def _evaluate(self, methodname, params):
+        """return the results of the normsubpathitem method methodname at params
+
+        The params are grouped by the normsubpathitems, such that each
+        normsubpathitem evaluates all of its params in a single call.
+        """
+        result = [None] * len(params)
+        for normsubpathitemindex, (indices, params) in self._distributeparams(params).items():
+            for index, value in zip(indices, getattr(self.normsubpathitems[normsubpathitemindex], methodname)(params)):
+                result[index] = value
         return result
 
     def append(self, anormsubpathitem):
@@ -873,6 +1156,7 @@ class normsubpath:
 
         Fails on closed normsubpath.
         """
+        self._arclens_pt = None
         if self.epsilon is None:
             self.normsubpathitems.append(anormsubpathitem)
         else:
@@ -976,31 +1260,99 @@ class normsubpath:
                 else:
                     self.skippedline = normline_pt(anormsubpathitem.x0_pt, anormsubpathitem.y0_pt, anormsubpathitem.x3_pt, anormsubpathitem.y3_pt)
 
+    def appendlines_pt(self, x_pt, y_pt, points_pt):
+        """append straight lines from (x_pt, y_pt) through points_pt
+
+        This is equivalent to appending the corresponding normline_pt
+        instances, but the normsubpathitems are converted to a
+        normsubpathitemarray and no normline_pt instances are created.
+        """
+        if not points_pt:
+            return
+        self._arclens_pt = None
+        if not isinstance(self.normsubpathitems, normsubpathitemarray):
+            self.normsubpathitems = normsubpathitemarray(self.normsubpathitems)
+        if self.epsilon is None:
+            self.normsubpathitems.appendlines_pt(x_pt, y_pt, points_pt)
+            return
+        # the first line takes care of all consistency checks
+        self.append(normline_pt(x_pt, y_pt, *points_pt[0]))
+        epsilon = self.epsilon
+        appendline_pt = self.normsubpathitems.appendline_pt
+        if self.skippedline:
+            x0_pt, y0_pt = self.skippedline.atbegin_pt()
+        else:
+            x0_pt, y0_pt = points_pt[0]
+        skipped = self.skippedline is not None
+        for x1_pt, y1_pt in points_pt[1:]:
+            if math.hypot(x1_pt-x0_pt, y1_pt-y0_pt) >= epsilon:
+                appendline_pt(x0_pt, y0_pt, x1_pt, y1_pt)
+                x0_pt, y0_pt = x1_pt, y1_pt
+                skipped = False
+            else:
+                skipped = True
+        if skipped:
+            self.skippedline = normline_pt(x0_pt, y0_pt, *points_pt[-1])
+        else:
+            self.skippedline = None
+
     def arclen_pt(self, upper=False):
         """return arc length in pts
 
         When upper is set, the upper bound is calculated, otherwise the lower
         bound is returned."""
+        if not upper:
+            return self._cumulativearclens_pt()[-1]
+        if isinstance(self.normsubpathitems, normsubpathitemarray):
+            return self.normsubpathitems.arclen_pt(self.epsilon, upper=upper)
         return sum([npitem.arclen_pt(self.epsilon, upper=upper) for npitem in self.normsubpathitems])
 
+    def _cumulativearclens_pt(self):
+        """return the cumulative arc lengths in pts of the normsubpathitems
+
+        The list starts with 0 and ends with the total arc length. It is
+        cached for the current epsilon."""
+        # besides the epsilon we check the number of normsubpathitems to
+        # catch modifications of the normsubpathitems list from outside
+        if (self._arclens_pt is None or self._arclens_pt[0] != self.epsilon or
+            len(self._arclens_pt[1]) != len(self.normsubpathitems) + 1):
+            if isinstance(self.normsubpathitems, normsubpathitemarray) and self.normsubpathitems._chained():
+                # fast path for lines only
+                xs_pt = self.normsubpathitems.points_pt[0::2]
+                ys_pt = self.normsubpathitems.points_pt[1::2]
+                arclens_pt = map(math.hypot, map(operator.sub, xs_pt[:-1], xs_pt[1:]), map(operator.sub, ys_pt[:-1], ys_pt[1:]))
+            else:
+                arclens_pt = [normsubpathitem.arclen_pt(self.epsilon) for normsubpathitem in self.normsubpathitems]
+            cumulativearclens_pt = array.array("d", [0])
+            cumulativearclens_pt.extend(itertools.accumulate(arclens_pt))
+            self._arclens_pt = self.epsilon, cumulativearclens_pt
+        return self._arclens_pt[1]
+
     def _arclentoparam_pt(self, lengths_pt):
         """return a tuple of params and the total length arc length in pts"""
-        # work on a copy which is counted down to negative values
-        lengths_pt = lengths_pt[:]
         results = [None] * len(lengths_pt)
+        if not self.normsubpathitems:
+            return results, 0
+        arclens_pt = self._cumulativearclens_pt()
+
+        # find the normsubpathitems by a binary search in the arc lengths
+        lastindex = len(self.normsubpathitems) - 1
+        distributelengths = {}
+        for i, length_pt in enumerate(lengths_pt):
+            index = min(max(bisect.bisect_right(arclens_pt, length_pt) - 1, 0), lastindex)
+            try:
+                indices, normsubpathitemlengths_pt = distributelengths[index]
+            except KeyError:
+                indices, normsubpathitemlengths_pt = distributelengths[index] = [], []
+            indices.append(i)
+            normsubpathitemlengths_pt.append(length_pt - arclens_pt[index])
 
-        totalarclen = 0
-        for normsubpathindex, normsubpathitem in enumerate(self.normsubpathitems):
-            params, arclen = normsubpathitem._arclentoparam_pt(lengths_pt, self.epsilon)
-            for i in range(len(results)):
-                if results[i] is None:
-                    lengths_pt[i] -= arclen
-                    if lengths_pt[i] < 0 or normsubpathindex == len(self.normsubpathitems) - 1:
-                        # overwrite the results until the length has become negative
-                        results[i] = normsubpathindex + params[i]
-            totalarclen += arclen
+        for index, (indices, normsubpathitemlengths_pt) in distributelengths.items():
+            params = self.normsubpathitems[index].arclentoparam_pt(normsubpathitemlengths_pt, self.epsilon)
+            for i, param in zip(indices, params):
+                results[i] = index + param
 
-        return results, totalarclen
+        return results, arclens_pt[-1]
 
     def arclentoparam_pt(self, lengths_pt):
         """return a tuple of params"""
@@ -1010,11 +1362,7 @@ class normsubpath:
         """return coordinates at params in pts"""
         if not self.normsubpathitems and self.skippedline:
             return [self.skippedline.atbegin_pt()]*len(params)
-        result = [None] * len(params)
-        for normsubpathitemindex, (indices, params) in list(self._distributeparams(params).items()):
-            for index, point_pt in zip(indices, self.normsubpathitems[normsubpathitemindex].at_pt(params)):
-                result[index] = point_pt
-        return result
+        return self._evaluate("at_pt", params)
 
     def atbegin_pt(self):
         """return coordinates of first point in pts"""
@@ -1030,6 +1378,8 @@ class normsubpath:
 
     def bbox(self):
         """return bounding box of normsubpath"""
+        if isinstance(self.normsubpathitems, normsubpathitemarray):
+            return self.normsubpathitems.bbox()
         if self.normsubpathitems:
             abbox = self.normsubpathitems[0].bbox()
             for anormpathitem in self.normsubpathitems[1:]:
@@ -1066,6 +1416,7 @@ class normsubpath:
         result = normsubpath(epsilon=self.epsilon)
         result.normsubpathitems = self.normsubpathitems[:]
         result.closed = self.closed
+        result._arclens_pt = self._arclens_pt
 
         # We can share the reference to skippedline, since it is a
         # normsubpathitem as well and thus not modified in place either.
@@ -1075,11 +1426,7 @@ class normsubpath:
 
     def curvature_pt(self, params):
         """return the curvature at params in 1/pts"""
-        result = [None] * len(params)
-        for normsubpathitemindex, (indices, params) in list(self._distributeparams(params).items()):
-            for index, curvature_pt in zip(indices, self.normsubpathitems[normsubpathitemindex].curvature_pt(params)):
-                result[index] = curvature_pt
-        return result
+        return self._evaluate("curvature_pt", params)
 
     def extend(self, normsubpathitems):
         """extend path by normsubpathitems
@@ -1094,6 +1441,7 @@ class normsubpath:
 
         remove the skippedline by modifying the end point of the existing normsubpath
         """
+        self._arclens_pt = None
         while self.skippedline:
             try:
                 lastnormsubpathitem = self.normsubpathitems.pop()
@@ -1112,13 +1460,14 @@ class normsubpath:
         intersections_a = []
         intersections_b = []
         epsilon = min(self.epsilon, other.epsilon)
-        # Intersect all subpaths of self with the subpaths of other, possibly including
-        # one intersection point several times
-        for t_a, pitem_a  in enumerate(self.normsubpathitems):
-            for t_b, pitem_b in enumerate(other.normsubpathitems):
-                for intersection_a, intersection_b in pitem_a.intersect(pitem_b, epsilon):
-                    intersections_a.append(intersection_a + t_a)
-                    intersections_b.append(intersection_b + t_b)
+        # Intersect the subpaths of self with the subpaths of other, possibly
+        # including one intersection point several times. Only pairs of
+        # normsubpathitems with overlapping control boxes can intersect.
+        for t_a, t_b in _overlappingpairs([pitem.cbox().enlarged_pt(epsilon) for pitem in self.normsubpathitems],
+                                          [pitem.cbox() for pitem in other.normsubpathitems]):
+            for intersection_a, intersection_b in self.normsubpathitems[t_a].intersect(other.normsubpathitems[t_b], epsilon):
+                intersections_a.append(intersection_a + t_a)
+                intersections_b.append(intersection_b + t_b)
 
         # although intersectipns_a are sorted for the different normsubpathitems,
         # within a normsubpathitem, the ordering has to be ensured separately:
@@ -1181,34 +1530,27 @@ class normsubpath:
         closepoints_a = closepoints(self, intersections_a)
         closepoints_b = closepoints(other, intersections_b)
 
-        # map intersection point to lowest point which is equivalent to the
-        # point
+        # map intersection point to a point which is equivalent to the point
+        # (union-find with the lowest point of a set of equivalent points
+        # being the representative of the set)
         equivalentpoints = list(range(len(intersections_a)))
-
+        def representative(point):
+            while equivalentpoints[point] != point:
+                equivalentpoints[point] = equivalentpoints[equivalentpoints[point]]
+                point = equivalentpoints[point]
+            return point
+
+        # pairs of close points need to be close on both normsubpaths
+        closepoints_b = dict.fromkeys(closepoints_b)
         for closepoint_a in closepoints_a:
-            for closepoint_b in closepoints_b:
-                if closepoint_a == closepoint_b:
-                    for i in range(closepoint_a[1], len(equivalentpoints)):
-                        if equivalentpoints[i] == closepoint_a[1]:
-                            equivalentpoints[i] = closepoint_a[0]
-
-        # determine the remaining intersection points
-        intersectionpoints = {}
-        for point in equivalentpoints:
-            intersectionpoints[point] = 1
-
-        # build result
-        result = []
-        intersectionpointskeys = list(intersectionpoints.keys())
-        intersectionpointskeys.sort()
-        for point in intersectionpointskeys:
-            for intersection_a, index_a in intersections_a:
-                if index_a == point:
-                    result_a = intersection_a
-            for intersection_b, index_b in intersections_b:
-                if index_b == point:
-                    result_b = intersection_b
-            result.append((result_a, result_b))
+            if closepoint_a in closepoints_b:
+                point1, point2 = sorted(map(representative, closepoint_a))
+                equivalentpoints[point2] = point1
+
+        # build result from the remaining intersection points
+        params_a = dict((index, intersection) for intersection, index in intersections_a)
+        params_b = dict((index, intersection) for intersection, index in intersections_b)
+        result = [(params_a[point], params_b[point]) for point in range(len(equivalentpoints)) if representative(point) == point]
         # note that the result is sorted in a, since we sorted
         # intersections_a in the very beginning
 
@@ -1247,18 +1589,12 @@ class normsubpath:
         if not self.normsubpathitems:
             return [0] * len(params), 0
         result = [None] * len(params)
-        totalarclen_pt = 0
-        distributeparams = self._distributeparams(params)
-        for normsubpathitemindex in range(len(self.normsubpathitems)):
-            if normsubpathitemindex in distributeparams:
-                indices, params = distributeparams[normsubpathitemindex]
-                arclens_pt, normsubpathitemarclen_pt = self.normsubpathitems[normsubpathitemindex]._paramtoarclen_pt(params, self.epsilon)
-                for index, arclen_pt in zip(indices, arclens_pt):
-                    result[index] = totalarclen_pt + arclen_pt
-                totalarclen_pt += normsubpathitemarclen_pt
-            else:
-                totalarclen_pt += self.normsubpathitems[normsubpathitemindex].arclen_pt(self.epsilon)
-        return result, totalarclen_pt
+        totalarclens_pt = self._cumulativearclens_pt()
+        for normsubpathitemindex, (indices, params) in self._distributeparams(params).items():
+            arclens_pt, normsubpathitemarclen_pt = self.normsubpathitems[normsubpathitemindex]._paramtoarclen_pt(params, self.epsilon)
+            for index, arclen_pt in zip(indices, arclens_pt):
+                result[index] = totalarclens_pt[normsubpathitemindex] + arclen_pt
+        return result, totalarclens_pt[-1]
 
     def pathitems(self):
         """return list of pathitems"""
@@ -1290,11 +1626,7 @@ class normsubpath:
 
     def rotation(self, params):
         """return rotations at params"""
-        result = [None] * len(params)
-        for normsubpathitemindex, (indices, params) in list(self._distributeparams(params).items()):
-            for index, rotation in zip(indices, self.normsubpathitems[normsubpathitemindex].rotation(params)):
-                result[index] = rotation
-        return result
+        return self._evaluate("rotation", params)
 
     def segments(self, params):
         """return segments of the normsubpath
@@ -1377,17 +1709,29 @@ class normsubpath:
 
     def trafo(self, params):
         """return transformations at params"""
-        result = [None] * len(params)
-        for normsubpathitemindex, (indices, params) in list(self._distributeparams(params).items()):
-            for index, trafo in zip(indices, self.normsubpathitems[normsubpathitemindex].trafo(params)):
-                result[index] = trafo
-        return result
+        return self._evaluate("trafo", params)
 
     def transformed(self, trafo):
-        """return transformed path"""
-        nnormsubpath = normsubpath(epsilon=self.epsilon)
-        for pitem in self.normsubpathitems:
-            nnormsubpath.append(pitem.transformed(trafo))
+        """return transformed path
+
+        The points of all normsubpathitems are transformed at once.
+        """
+        (a, b), (c, d) = trafo.matrix
+        compact = isinstance(self.normsubpathitems, normsubpathitemarray)
+        if compact:
+            normsubpathitems = self.normsubpathitems.transformed(trafo)
+        else:
+            normsubpathitems = _transformednormsubpathitems(self.normsubpathitems, trafo)
+        nnormsubpath = normsubpath(epsilon=self.epsilon, compact=compact)
+        # The lengths of the normsubpathitems cannot decrease when the
+        # smaller singular value of the matrix is at least one. Then, the
+        # normsubpathitems do not need to be checked again.
+        t = a*a + b*b + c*c + d*d
+        if self.epsilon is None or t - math.sqrt(max(0, t*t - 4*(a*d-b*c)**2)) >= 2:
+            nnormsubpath.normsubpathitems = normsubpathitems
+        else:
+            for pitem in normsubpathitems:
+                nnormsubpath.append(pitem)
         if self.closed:
             nnormsubpath.close()
         elif self.skippedline is not None:
@@ -1399,14 +1743,17 @@ class normsubpath:
         # the end
         if not self.normsubpathitems:
             return
+        count = len(self.normsubpathitems)
         if self.closed and isinstance(self.normsubpathitems[-1], normline_pt):
-            assert len(self.normsubpathitems) > 1, "a closed normsubpath should contain more than a single normline_pt"
-            normsubpathitems = self.normsubpathitems[:-1]
-        else:
-            normsubpathitems = self.normsubpathitems
+            assert count > 1, "a closed normsubpath should contain more than a single normline_pt"
+            count -= 1
         file.write("%g %g moveto\n" % self.atbegin_pt())
-        for anormsubpathitem in normsubpathitems:
-            anormsubpathitem.outputPS(file, writer)
+        if isinstance(self.normsubpathitems, normsubpathitemarray):
+            self.normsubpathitems.outputPS(file, writer, count)
+        else:
+            _outputnormsubpathitems(self.normsubpathitems[:count], file.write,
+                                    lambda anormsubpathitem: anormsubpathitem.outputPS(file, writer),
+                                    "%g %g lineto\n", "%g %g %g %g %g %g curveto\n")
         if self.closed:
             file.write("closepath\n")
 
@@ -1415,14 +1762,17 @@ class normsubpath:
         # the end
         if not self.normsubpathitems:
             return
+        count = len(self.normsubpathitems)
         if self.closed and isinstance(self.normsubpathitems[-1], normline_pt):
-            assert len(self.normsubpathitems) > 1, "a closed normsubpath should contain more than a single normline_pt"
-            normsubpathitems = self.normsubpathitems[:-1]
-        else:
-            normsubpathitems = self.normsubpathitems
+            assert count > 1, "a closed normsubpath should contain more than a single normline_pt"
+            count -= 1
         file.write("%f %f m\n" % self.atbegin_pt())
-        for anormsubpathitem in normsubpathitems:
-            anormsubpathitem.outputPDF(file, writer)
+        if isinstance(self.normsubpathitems, normsubpathitemarray):
+            self.normsubpathitems.outputPDF(file, writer, count)
+        else:
+            _outputnormsubpathitems(self.normsubpathitems[:count], file.write,
+                                    lambda anormsubpathitem: anormsubpathitem.outputPDF(file, writer),
+                                    "%f %f l\n", "%f %f %f %f %f %f c\n")
         if self.closed:
             file.write("h\n")
 
@@ -1431,23 +1781,489 @@ class normsubpath:
         # the end
         if not self.normsubpathitems:
             return ""
+        count = len(self.normsubpathitems)
         if self.closed and isinstance(self.normsubpathitems[-1], normline_pt):
-            assert len(self.normsubpathitems) > 1, "a closed normsubpath should contain more than a single normline_pt"
-            normsubpathitems = self.normsubpathitems[:-1]
-        else:
-            normsubpathitems = self.normsubpathitems
+            assert count > 1, "a closed normsubpath should contain more than a single normline_pt"
+            count -= 1
         x_pt, y_pt = self.atbegin_pt()
         if inverse_y:
             y_pt = -y_pt
         data = ["M%g %g" % (x_pt, y_pt)]
-        for anormsubpathitem in normsubpathitems:
-            data.append(anormsubpathitem.returnSVGdata(inverse_y))
+        if isinstance(self.normsubpathitems, normsubpathitemarray):
+            data.append(self.normsubpathitems.returnSVGdata(inverse_y, count))
+        else:
+            _outputnormsubpathitems(self.normsubpathitems[:count], data.append,
+                                    lambda anormsubpathitem: data.append(anormsubpathitem.returnSVGdata(inverse_y)),
+                                    "L%g %g", "C%g %g %g %g %g %g", inverse_y)
         if self.closed:
             data.append("Z")
         return "".join(data)
 
 
 
+################################################################################
+# boolean operations on the regions enclosed by normpaths
+################################################################################
+
+def _locate_pt(anormsubpath, x_pt, y_pt, tolerance, epsilon):
+    """return the location of a point with respect to a closed normsubpath
+
+    A tuple (inside, param, direction, distance_pt) is returned, where
+    inside tells whether the point is enclosed by the normsubpath. param is
+    the param of the closest point of the normsubpath, direction is the
+    direction (dx_pt, dy_pt) of the normsubpath there and distance_pt is the
+    distance to the point. param and direction are None and distance_pt is
+    tolerance when the distance of the point to the normsubpath exceeds
+    tolerance.
+
+    The crossings of a ray from the point to the right are counted. Curves
+    are subdivided until the parts can be replaced by lines within epsilon,
+    but only the parts whose control box contains the point are subdivided,
+    since the other parts cross the ray as often as their chords modulo 2.
+    """
+    inside = False
+    param = direction = None
+    mindistance_pt = tolerance
+    for i, normsubpathitem in enumerate(anormsubpath.normsubpathitems):
+        if isinstance(normsubpathitem, normline_pt):
+            lines = [(normsubpathitem.x0_pt, normsubpathitem.y0_pt,
+                      normsubpathitem.x1_pt, normsubpathitem.y1_pt, 0, 1, None)]
+        else:
+            lines = []
+            stack = [(0, 1, (normsubpathitem.x0_pt, normsubpathitem.y0_pt, normsubpathitem.x1_pt, normsubpathitem.y1_pt,
+                             normsubpathitem.x2_pt, normsubpathitem.y2_pt, normsubpathitem.x3_pt, normsubpathitem.y3_pt))]
+            while stack:
+                t0, dt, points = stack.pop()
+                if (x_pt < min(points[0::2]) - tolerance or x_pt > max(points[0::2]) + tolerance or
+                    y_pt < min(points[1::2]) - tolerance or y_pt > max(points[1::2]) + tolerance):
+                    lines.append((points[0], points[1], points[6], points[7], None, None, None))
+                    continue
+                lengths_pt = flatline_pt(points, epsilon, True)
+                if lengths_pt is not None:
+                    lines.append((points[0], points[1], points[6], points[7], t0, dt, lengths_pt))
+                    continue
+                left, right = splitcurve_pt(*points, 0.5)
+                dt *= 0.5
+                if not dt:
+                    raise RuntimeError("maximal splitting depth exceeded when flattening a curve")
+                stack.append((t0, dt, left))
+                stack.append((t0+dt, dt, right))
+        for x0_pt, y0_pt, x1_pt, y1_pt, t0, dt, lengths_pt in lines:
+            if (y0_pt > y_pt) != (y1_pt > y_pt) and x_pt < x0_pt + (y_pt-y0_pt)*(x1_pt-x0_pt)/(y1_pt-y0_pt):
+                inside = not inside
+            if t0 is not None and (min(x0_pt, x1_pt) - tolerance <= x_pt <= max(x0_pt, x1_pt) + tolerance and
+                                   min(y0_pt, y1_pt) - tolerance <= y_pt <= max(y0_pt, y1_pt) + tolerance):
+                dx_pt = x1_pt - x0_pt
+                dy_pt = y1_pt - y0_pt
+                norm = dx_pt*dx_pt + dy_pt*dy_pt
+                if not norm:
+                    continue
+                t = min(max(((x_pt-x0_pt)*dx_pt + (y_pt-y0_pt)*dy_pt)/norm, 0), 1)
+                distance_pt = math.hypot(x0_pt + t*dx_pt - x_pt, y0_pt + t*dy_pt - y_pt)
+                if distance_pt <= mindistance_pt:
+                    mindistance_pt = distance_pt
+                    if lengths_pt is not None:
+                        t = lineparam(t, *lengths_pt)
+                    param = i + t0 + t*dt
+                    direction = dx_pt, dy_pt
+    return inside, param, direction, mindistance_pt
+
+
+def _area_pt(anormsubpath):
+    """return the signed area enclosed by a closed normsubpath (positive when counterclockwise)"""
+    result = 0
+    for normsubpathitem in anormsubpath.normsubpathitems:
+        if isinstance(normsubpathitem, normline_pt):
+            result += normsubpathitem.x0_pt*normsubpathitem.y1_pt - normsubpathitem.x1_pt*normsubpathitem.y0_pt
+        else:
+            x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt = (
+                normsubpathitem.x0_pt, normsubpathitem.y0_pt, normsubpathitem.x1_pt, normsubpathitem.y1_pt,
+                normsubpathitem.x2_pt, normsubpathitem.y2_pt, normsubpathitem.x3_pt, normsubpathitem.y3_pt)
+            result += 0.1*(6*(x0_pt*y1_pt - x1_pt*y0_pt) + 3*(x0_pt*y2_pt - x2_pt*y0_pt) + (x0_pt*y3_pt - x3_pt*y0_pt) +
+                           3*(x1_pt*y2_pt - x2_pt*y1_pt) + 3*(x1_pt*y3_pt - x3_pt*y1_pt) + 6*(x2_pt*y3_pt - x3_pt*y2_pt))
+    return 0.5*result
+
+
+def _midpoint_pt(anormsubpathitem):
+    """return a point in the middle of a normsubpathitem and the direction of the normsubpathitem there"""
+    if isinstance(anormsubpathitem, normline_pt):
+        return (0.5*(anormsubpathitem.x0_pt+anormsubpathitem.x1_pt), 0.5*(anormsubpathitem.y0_pt+anormsubpathitem.y1_pt),
+                anormsubpathitem.x1_pt-anormsubpathitem.x0_pt, anormsubpathitem.y1_pt-anormsubpathitem.y0_pt)
+    return (0.125*(anormsubpathitem.x0_pt+anormsubpathitem.x3_pt) + 0.375*(anormsubpathitem.x1_pt+anormsubpathitem.x2_pt),
+            0.125*(anormsubpathitem.y0_pt+anormsubpathitem.y3_pt) + 0.375*(anormsubpathitem.y1_pt+anormsubpathitem.y2_pt),
+            anormsubpathitem.x3_pt+anormsubpathitem.x2_pt-anormsubpathitem.x1_pt-anormsubpathitem.x0_pt,
+            anormsubpathitem.y3_pt+anormsubpathitem.y2_pt-anormsubpathitem.y1_pt-anormsubpathitem.y0_pt)
+
+
+class _region:
+
+    """region enclosed by a normpath
+
+    Open normsubpaths are closed and points enclosed by an odd number of
+    normsubpaths belong to the region (even-odd rule). The normsubpaths
+    are oriented to have the region on their left, i.e. outer boundaries
+    run counterclockwise and the boundaries of holes clockwise.
+
+    When the normsubpaths cross themselves or each other, they are split
+    at the crossings. The parts are oriented by testing on which side the
+    region lies and are joined to new normsubpaths. Parts having the
+    region on both sides or on neither side (like coinciding parts of the
+    boundary) are dropped.
+    """
+
+    def __init__(self, anormpath, epsilon, tolerance):
+        self.epsilon = epsilon
+        self.normsubpaths = []
+        self.bboxes = []
+        for anormsubpath in anormpath.normsubpaths:
+            if not anormsubpath.normsubpathitems:
+                continue
+            if not anormsubpath.closed:
+                anormsubpath = anormsubpath.copy()
+                anormsubpath.close()
+            self.normsubpaths.append(anormsubpath)
+            self.bboxes.append(anormsubpath.bbox().enlarged_pt(tolerance))
+
+        params = [_selfintersectparams(anormsubpath, epsilon, tolerance) for anormsubpath in self.normsubpaths]
+        for k, l in _overlappingpairs(self.bboxes, self.bboxes):
+            if k < l:
+                params_a, params_b = _intersectparams(self.normsubpaths[k], self.normsubpaths[l], epsilon, tolerance)
+                params[k].extend(params_a)
+                params[l].extend(params_b)
+            if k != l:
+                params[k].extend(_touchingparams(self.normsubpaths[k], self.bboxes[k], self.normsubpaths[l], epsilon, tolerance))
+
+        if any(params):
+            parts = []
+            for anormsubpath, subpathparams in zip(self.normsubpaths, params):
+                for part in _splitclosed(anormsubpath, subpathparams, tolerance):
+                    if not part.normsubpathitems:
+                        continue
+                    x_pt, y_pt, dx_pt, dy_pt = _midpoint_pt(part.normsubpathitems[len(part.normsubpathitems)//2])
+                    norm = math.hypot(dx_pt, dy_pt)
+                    if not norm:
+                        continue
+                    dx_pt *= tolerance/norm
+                    dy_pt *= tolerance/norm
+                    left = self.inside_pt(x_pt-dy_pt, y_pt+dx_pt)
+                    if left != self.inside_pt(x_pt+dy_pt, y_pt-dx_pt):
+                        parts.append(part if left else part.reversed())
+            self.normsubpaths = _joinparts(parts, tolerance, epsilon)
+            self.bboxes = [anormsubpath.bbox().enlarged_pt(tolerance) for anormsubpath in self.normsubpaths]
+        else:
+            for i, anormsubpath in enumerate(self.normsubpaths):
+                x_pt, y_pt = _midpoint_pt(anormsubpath.normsubpathitems[0])[:2]
+                depth = len([None for j in range(len(self.normsubpaths)) if j != i and self.insidesubpath_pt(j, x_pt, y_pt)])
+                if (_area_pt(anormsubpath) < 0) == (depth % 2 == 0):
+                    self.normsubpaths[i] = anormsubpath.reversed()
+
+        self.bbox = bboxmodule.empty()
+        for abbox in self.bboxes:
+            self.bbox += abbox
+
+    def insidesubpath_pt(self, i, x_pt, y_pt):
+        """check whether a point is enclosed by normsubpath i"""
+        abbox = self.bboxes[i]
+        if not (abbox.llx_pt <= x_pt <= abbox.urx_pt and abbox.lly_pt <= y_pt <= abbox.ury_pt):
+            return False
+        return _locate_pt(self.normsubpaths[i], x_pt, y_pt, 0, self.epsilon)[0]
+
+    def inside_pt(self, x_pt, y_pt):
+        """check whether a point is inside the region (even-odd rule)"""
+        inside = False
+        for i in range(len(self.normsubpaths)):
+            if self.insidesubpath_pt(i, x_pt, y_pt):
+                inside = not inside
+        return inside
+
+    def locate_pt(self, x_pt, y_pt, tolerance):
+        """return a tuple (inside, direction) describing the location of a point
+
+        inside tells whether the point is inside the region. direction is
+        None unless the point is within tolerance of the boundary, where it
+        is the direction (dx_pt, dy_pt) of the closest part of the boundary.
+        """
+        inside = False
+        result = None
+        mindistance_pt = tolerance
+        for anormsubpath, abbox in zip(self.normsubpaths, self.bboxes):
+            if abbox.llx_pt <= x_pt <= abbox.urx_pt and abbox.lly_pt <= y_pt <= abbox.ury_pt:
+                subpathinside, param, direction, mindistance_pt = _locate_pt(anormsubpath, x_pt, y_pt, mindistance_pt, self.epsilon)
+                if subpathinside:
+                    inside = not inside
+                if direction is not None:
+                    result = direction
+        return inside, result
+
+
+def _controlpoints_pt(anormsubpathitem):
+    """return the control points of a normsubpathitem as a flat tuple"""
+    if isinstance(anormsubpathitem, normline_pt):
+        return (anormsubpathitem.x0_pt, anormsubpathitem.y0_pt, anormsubpathitem.x1_pt, anormsubpathitem.y1_pt)
+    return (anormsubpathitem.x0_pt, anormsubpathitem.y0_pt, anormsubpathitem.x1_pt, anormsubpathitem.y1_pt,
+            anormsubpathitem.x2_pt, anormsubpathitem.y2_pt, anormsubpathitem.x3_pt, anormsubpathitem.y3_pt)
+
+
+def _coinciding(normsubpathitem_a, normsubpathitem_b, tolerance):
+    """check whether two normsubpathitems coincide (in the same or in opposite direction)"""
+    points_a = _controlpoints_pt(normsubpathitem_a)
+    points_b = _controlpoints_pt(normsubpathitem_b)
+    if len(points_a) != len(points_b):
+        return False
+    reversedpoints_b = sum([points_b[i:i+2] for i in range(len(points_b)-2, -1, -2)], ())
+    return (max([abs(a-b) for a, b in zip(points_a, points_b)]) < tolerance or
+            max([abs(a-b) for a, b in zip(points_a, reversedpoints_b)]) < tolerance)
+
+
+def _intersectparams(normsubpath_a, normsubpath_b, epsilon, tolerance):
+    """return the params of the intersection points of two normsubpaths
+
+    In contrast to normsubpath.intersect, pairs of coinciding
+    normsubpathitems (in the same or in opposite direction) are skipped,
+    since they would yield a large number of intersection points. Close
+    intersection points are not merged.
+    """
+    params_a = []
+    params_b = []
+    for t_a, t_b in _overlappingpairs([pitem.cbox().enlarged_pt(epsilon) for pitem in normsubpath_a.normsubpathitems],
+                                      [pitem.cbox() for pitem in normsubpath_b.normsubpathitems]):
+        normsubpathitem_a = normsubpath_a.normsubpathitems[t_a]
+        normsubpathitem_b = normsubpath_b.normsubpathitems[t_b]
+        if _coinciding(normsubpathitem_a, normsubpathitem_b, tolerance):
+            continue
+        for intersection_a, intersection_b in normsubpathitem_a.intersect(normsubpathitem_b, epsilon):
+            params_a.append(intersection_a + t_a)
+            params_b.append(intersection_b + t_b)
+    return params_a, params_b
+
+
+def _selfintersectparams(anormsubpath, epsilon, tolerance):
+    """return the params of the self-intersection points of a closed normsubpath
+
+    Like in _intersectparams, pairs of coinciding normsubpathitems are
+    skipped. The common end points of adjacent normsubpathitems are
+    skipped as well, and adjacent normsubpathitems are not intersected
+    at all when they are lines or when their bboxes overlap by less than
+    tolerance. Self-intersections within a single normsubpathitem are not
+    found.
+    """
+    params = []
+    normsubpathitems = anormsubpath.normsubpathitems
+    cboxes = [pitem.cbox().enlarged_pt(epsilon) for pitem in normsubpathitems]
+    for t_a, t_b in _overlappingpairs(cboxes, cboxes):
+        if t_a >= t_b:
+            continue
+        normsubpathitem_a = normsubpathitems[t_a]
+        normsubpathitem_b = normsubpathitems[t_b]
+        if t_b == t_a + 1:
+            common_pt = normsubpathitem_a.atend_pt()
+        elif t_a == 0 and t_b == len(normsubpathitems) - 1:
+            common_pt = normsubpathitem_a.atbegin_pt()
+        else:
+            common_pt = None
+        if common_pt is not None:
+            if isinstance(normsubpathitem_a, normline_pt) and isinstance(normsubpathitem_b, normline_pt):
+                continue
+            bbox_a = normsubpathitem_a.bbox()
+            bbox_b = normsubpathitem_b.bbox()
+            if (min(bbox_a.urx_pt, bbox_b.urx_pt) - max(bbox_a.llx_pt, bbox_b.llx_pt) < tolerance or
+                min(bbox_a.ury_pt, bbox_b.ury_pt) - max(bbox_a.lly_pt, bbox_b.lly_pt) < tolerance):
+                continue
+        if _coinciding(normsubpathitem_a, normsubpathitem_b, tolerance):
+            continue
+        for intersection_a, intersection_b in normsubpathitem_a.intersect(normsubpathitem_b, epsilon):
+            if common_pt is not None:
+                x_pt, y_pt = normsubpathitem_a.at_pt([intersection_a])[0]
+                if math.hypot(x_pt-common_pt[0], y_pt-common_pt[1]) < tolerance:
+                    continue
+            params.append(intersection_a + t_a)
+            params.append(intersection_b + t_b)
+    return params
+
+
+def _touchingparams(anormsubpath, abbox, othernormsubpath, epsilon, tolerance):
+    """return the params of the end points of the normsubpathitems of othernormsubpath lying on anormsubpath
+
+    Splitting at those points catches shared pieces of the boundaries,
+    which are not found as intersections.
+    """
+    params = []
+    for normsubpathitem in othernormsubpath.normsubpathitems:
+        x_pt, y_pt = normsubpathitem.atbegin_pt()
+        if abbox.llx_pt <= x_pt <= abbox.urx_pt and abbox.lly_pt <= y_pt <= abbox.ury_pt:
+            param = _locate_pt(anormsubpath, x_pt, y_pt, tolerance, epsilon)[1]
+            if param is not None:
+                params.append(param)
+    return params
+
+
+def _splitclosed(anormsubpath, params, tolerance):
+    """split a closed normsubpath at params into open normsubpaths
+
+    Params of points closer than tolerance to the previous split point are
+    skipped, unless the normsubpath moves away in between (like at a
+    self-intersection). When no param is left, the closed normsubpath is
+    returned.
+    """
+    if not params:
+        return [anormsubpath]
+    params.sort()
+
+    def short(*pieces):
+        # check whether the pieces of the normsubpath between pairs of params stay within tolerance
+        for param_a, param_b in pieces:
+            abbox = anormsubpath.segments([param_a, param_b])[0].bbox()
+            if abbox and (abbox.width_pt() >= tolerance or abbox.height_pt() >= tolerance):
+                return False
+        return True
+
+    splitparams = []
+    for param, (x_pt, y_pt) in zip(params, anormsubpath.at_pt(params)):
+        if not splitparams or math.hypot(x_pt-lastx_pt, y_pt-lasty_pt) >= tolerance or not short((splitparams[-1], param)):
+            splitparams.append(param)
+            lastx_pt, lasty_pt = x_pt, y_pt
+    if len(splitparams) > 1:
+        x_pt, y_pt = anormsubpath.at_pt([splitparams[0]])[0]
+        if math.hypot(x_pt-lastx_pt, y_pt-lasty_pt) < tolerance and short((splitparams[-1], len(anormsubpath)), (0, splitparams[0])):
+            splitparams.pop()
+    return anormsubpath.segments([0] + splitparams + [len(anormsubpath)])
+
+
+def _joinparts(parts, tolerance, epsilon):
+    """join normsubpaths at matching end points to closed normsubpaths
+
+    Closed normsubpaths are passed unchanged. The begin points of the open
+    normsubpaths are stored in a grid of cells of size tolerance to look up
+    the continuation of a normsubpath.
+    """
+    result = []
+    grid = {}
+    for i, part in enumerate(parts):
+        if part.closed:
+            result.append(part)
+        else:
+            x_pt, y_pt = part.atbegin_pt()
+            grid.setdefault((math.floor(x_pt/tolerance), math.floor(y_pt/tolerance)), []).append(i)
+    used = [part.closed for part in parts]
+    for i, part in enumerate(parts):
+        if used[i]:
+            continue
+        used[i] = True
+        joined = normsubpath(epsilon=epsilon)
+        xbegin_pt, ybegin_pt = part.atbegin_pt()
+        while True:
+            if joined.normsubpathitems:
+                joined.append(part.normsubpathitems[0].modifiedbegin_pt(x_pt, y_pt))
+                joined.extend(part.normsubpathitems[1:])
+            else:
+                joined.extend(part.normsubpathitems)
+            x_pt, y_pt = part.normsubpathitems[-1].atend_pt()
+            if math.hypot(x_pt-xbegin_pt, y_pt-ybegin_pt) < tolerance:
+                break
+            nextpart = None
+            mindistance_pt = tolerance
+            cellx, celly = math.floor(x_pt/tolerance), math.floor(y_pt/tolerance)
+            for cell in itertools.product((cellx-1, cellx, cellx+1), (celly-1, celly, celly+1)):
+                for j in grid.get(cell, []):
+                    if not used[j]:
+                        xj_pt, yj_pt = parts[j].atbegin_pt()
+                        distance_pt = math.hypot(xj_pt-x_pt, yj_pt-y_pt)
+                        if distance_pt < mindistance_pt:
+                            nextpart = j
+                            mindistance_pt = distance_pt
+            if nextpart is None:
+                break
+            used[nextpart] = True
+            part = parts[nextpart]
+        joined.close()
+        result.append(joined)
+    return result
+
+
+# locations of a part of the boundary of a region with respect to another region
+_outside, _inside, _parallel, _antiparallel = range(4)
+
+def _combine(normpaths, keep):
+    """return a normpath bounding a combination of the regions enclosed by normpaths
+
+    The boundaries of the regions are split at their mutual intersections
+    (including the end points of shared pieces of the boundaries). The
+    parts of the boundary of region i are passed to keep(i, locations), where
+    locations maps the indices of the other regions to the location of the
+    part with respect to them (_outside when missing). keep returns 1 to keep
+    the part, -1 to keep it reversed and 0 to drop it. Finally, the kept
+    parts are joined to closed normsubpaths.
+
+    Pairs of overlapping regions are found by a sweep over their bboxes,
+    such that only overlapping regions are intersected with each other.
+    """
+    epsilon = min([anormsubpath.epsilon for anormpath in normpaths for anormsubpath in anormpath.normsubpaths
+                                        if anormsubpath.epsilon is not None] or [_epsilon])
+    tolerance = 10*epsilon
+    regions = [_region(anormpath, epsilon, tolerance) for anormpath in normpaths]
+    indices = [i for i, region in enumerate(regions) if region.normsubpaths]
+    overlapping = dict((i, []) for i in indices)
+    for i, j in _overlappingpairs([regions[i].bbox for i in indices], [regions[i].bbox for i in indices]):
+        if i != j:
+            overlapping[indices[i]].append(indices[j])
+
+    # collect the split params of the normsubpaths
+    params = dict(((i, k), []) for i in indices for k in range(len(regions[i].normsubpaths)))
+    for i in indices:
+        for j in overlapping[i]:
+            for k, (anormsubpath, abbox) in enumerate(zip(regions[i].normsubpaths, regions[i].bboxes)):
+                for l, (othernormsubpath, otherbbox) in enumerate(zip(regions[j].normsubpaths, regions[j].bboxes)):
+                    if abbox.intersects(otherbbox):
+                        if i < j:
+                            params_a, params_b = _intersectparams(anormsubpath, othernormsubpath, epsilon, tolerance)
+                            params[i, k].extend(params_a)
+                            params[j, l].extend(params_b)
+                        params[i, k].extend(_touchingparams(anormsubpath, abbox, othernormsubpath, epsilon, tolerance))
+
+    parts = []
+    for i in indices:
+        for k, anormsubpath in enumerate(regions[i].normsubpaths):
+            for part in _splitclosed(anormsubpath, params[i, k], tolerance):
+                if not part.normsubpathitems:
+                    continue
+                x_pt, y_pt, dx_pt, dy_pt = _midpoint_pt(part.normsubpathitems[len(part.normsubpathitems)//2])
+                locations = {}
+                for j in overlapping[i]:
+                    inside, direction = regions[j].locate_pt(x_pt, y_pt, tolerance)
+                    if direction is None:
+                        locations[j] = inside and _inside or _outside
+                    elif direction[0]*dx_pt + direction[1]*dy_pt > 0:
+                        locations[j] = _parallel
+                    else:
+                        locations[j] = _antiparallel
+                orientation = keep(i, locations)
+                if orientation == 1:
+                    parts.append(part)
+                elif orientation == -1:
+                    parts.append(part.reversed())
+    return normpath(_joinparts(parts, tolerance, epsilon))
+
+
+def _keepunion(i, locations):
+    # shared boundaries are kept once (for the region with the lowest index)
+    for j, location in locations.items():
+        if location == _inside or location == _antiparallel or (location == _parallel and j < i):
+            return 0
+    return 1
+
+def _keepintersection(i, locations):
+    location = locations.get(1-i, _outside)
+    if location == _inside or (location == _parallel and i == 0):
+        return 1
+    return 0
+
+def _keepdifference(i, locations):
+    location = locations.get(1-i, _outside)
+    if i == 0:
+        return location in (_outside, _antiparallel) and 1 or 0
+    return location == _inside and -1 or 0
+
+
 ################################################################################
 # normpath
 ################################################################################
@@ -1610,9 +2426,24 @@ class normpath:
         result = {}
         for i, param in enumerate(params):
             assert param.normpath is self, "normpathparam has to belong to this path"
-            result.setdefault(param.normsubpathindex, ([], []))
-            result[param.normsubpathindex][0].append(i)
-            result[param.normsubpathindex][1].append(param.normsubpathparam)
+            try:
+                indices, normsubpathparams = result[param.normsubpathindex]
+            except KeyError:
+                indices, normsubpathparams = result[param.normsubpathindex] = [], []
+            indices.append(i)
+            normsubpathparams.append(param.normsubpathparam)
+        return result
+
+    def _evaluate(self, methodname, params):
+        """return the results of the normsubpath method methodname at params
+
+        The params are grouped by the normsubpaths, such that each
+        normsubpath evaluates all of its params in a single call.
+        """
+        result = [None] * len(params)
+        for normsubpathindex, (indices, params) in self._distributeparams(params).items():
+            for index, value in zip(indices, getattr(self.normsubpaths[normsubpathindex], methodname)(params)):
+                result[index] = value
         return result
 
     def append(self, item):
@@ -1675,11 +2506,7 @@ class normpath:
 
     def _at_pt(self, params):
         """return coordinates of normpath in pts at params"""
-        result = [None] * len(params)
-        for normsubpathindex, (indices, params) in list(self._distributeparams(params).items()):
-            for index, point_pt in zip(indices, self.normsubpaths[normsubpathindex].at_pt(params)):
-                result[index] = point_pt
-        return result
+        return self._evaluate("at_pt", params)
 
     @_valueorlistmethod
     def at_pt(self, params):
@@ -1730,6 +2557,15 @@ class normpath:
         else:
             raise NormpathException("empty path")
 
+    def difference(self, other):
+        """return normpath bounding the region enclosed by self but not by other
+
+        The regions are determined by the even-odd rule with open
+        normsubpaths being closed. The resulting normsubpaths are oriented
+        counterclockwise for outer boundaries and clockwise for holes.
+        """
+        return _combine([self, other.normpath()], _keepdifference)
+
     def copy(self):
         """return copy of normpath"""
         result = normpath()
@@ -1740,12 +2576,7 @@ class normpath:
     @_valueorlistmethod
     def curvature_pt(self, params):
         """return the curvature in 1/pt at params or arc length(s) in pts"""
-
-        result = [None] * len(params)
-        for normsubpathindex, (indices, params) in list(self._distributeparams(self._convertparams(params, self.arclentoparam_pt)).items()):
-            for index, curvature_pt in zip(indices, self.normsubpaths[normsubpathindex].curvature_pt(params)):
-                result[index] = curvature_pt
-        return result
+        return self._evaluate("curvature_pt", self._convertparams(params, self.arclentoparam_pt))
 
     def end(self):
         """return param corresponding of the end of the path"""
@@ -1760,6 +2591,13 @@ class normpath:
             # use append to properly handle regular path items as well as normsubpaths
             self.append(anormsubpath)
 
+    def intersection(self, other):
+        """return normpath bounding the region enclosed by both self and other
+
+        See difference for the treatment of the regions.
+        """
+        return _combine([self, other.normpath()], _keepintersection)
+
     def intersect(self, other):
         """intersect self with other path
 
@@ -1854,11 +2692,7 @@ class normpath:
 
     def _rotation(self, params):
         """return rotation at params"""
-        result = [None] * len(params)
-        for normsubpathindex, (indices, params) in list(self._distributeparams(params).items()):
-            for index, rotation in zip(indices, self.normsubpaths[normsubpathindex].rotation(params)):
-                result[index] = rotation
-        return result
+        return self._evaluate("rotation", params)
 
     @_valueorlistmethod
     def rotation_pt(self, params):
@@ -1966,11 +2800,7 @@ class normpath:
 
     def _trafo(self, params):
         """return transformation at params"""
-        result = [None] * len(params)
-        for normsubpathindex, (indices, params) in list(self._distributeparams(params).items()):
-            for index, trafo in zip(indices, self.normsubpaths[normsubpathindex].trafo(params)):
-                result[index] = trafo
-        return result
+        return self._evaluate("trafo", params)
 
     @_valueorlistmethod
     def trafo_pt(self, params):
@@ -1986,6 +2816,23 @@ class normpath:
         """return transformed normpath"""
         return normpath([normsubpath.transformed(trafo) for normsubpath in self.normsubpaths])
 
+    def union(self, other):
+        """return normpath bounding the region enclosed by self or other
+
+        See difference for the treatment of the regions.
+        """
+        return _combine([self, other.normpath()], _keepunion)
+
+    @staticmethod
+    def union_all(paths):
+        """return normpath bounding the union of the regions enclosed by paths
+
+        Only paths with overlapping bboxes are intersected with each other,
+        which makes this more efficient than successive calls of union for
+        many paths.
+        """
+        return _combine([apath.normpath() for apath in paths], _keepunion)
+
     def outputPS(self, file, writer):
         for normsubpath in self.normsubpaths:
             normsubpath.outputPS(file, writer)
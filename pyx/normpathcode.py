@@ -0,0 +1,326 @@
+# -*- encoding: utf-8 -*-
+#
+#
+# Copyright (C) 2002-2011 Jörg Lehmann <joerg@pyx-project.org>
+# Copyright (C) 2003-2013 Michael Schindler <m-schindler@users.sourceforge.net>
+# Copyright (C) 2002-2013 André Wobst <wobsta@pyx-project.org>
+#
+# This file is part of PyX (https://pyx-project.org/).
+#
+# PyX is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# PyX is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyX; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+# Geometry kernels of the normpath module. The C extension module
+# _normpathcode implements the same functions and is used instead of this
+# module when available.
+
+import math
+from . import mathutils
+
+
+def splitcurve_pt(x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt, t):
+    """return the control points of the two parts of a Bezier curve split at parameter t"""
+    s = 1-t
+
+    # first, we have to calculate the  midpoints between adjacent
+    # control points
+    x01_pt = s*x0_pt + t*x1_pt
+    y01_pt = s*y0_pt + t*y1_pt
+    x12_pt = s*x1_pt + t*x2_pt
+    y12_pt = s*y1_pt + t*y2_pt
+    x23_pt = s*x2_pt + t*x3_pt
+    y23_pt = s*y2_pt + t*y3_pt
+
+    # In the next iterative step, we need the midpoints between 01 and 12
+    # and between 12 and 23
+    x01_12_pt = s*x01_pt + t*x12_pt
+    y01_12_pt = s*y01_pt + t*y12_pt
+    x12_23_pt = s*x12_pt + t*x23_pt
+    y12_23_pt = s*y12_pt + t*y23_pt
+
+    # Finally the midpoint is given by
+    xmidpoint_pt = s*x01_12_pt + t*x12_23_pt
+    ymidpoint_pt = s*y01_12_pt + t*y12_23_pt
+
+    return ((x0_pt, y0_pt, x01_pt, y01_pt, x01_12_pt, y01_12_pt, xmidpoint_pt, ymidpoint_pt),
+            (xmidpoint_pt, ymidpoint_pt, x12_23_pt, y12_23_pt, x23_pt, y23_pt, x3_pt, y3_pt))
+
+
+def flatline_pt(points, epsilon, intersect):
+    """check whether a Bezier curve can be replaced by a line within epsilon
+
+    The control points are passed as a tuple points. The lengths l1_pt, l2_pt,
+    l3_pt of the control polygon are returned when the curve is straight
+    enough, otherwise None. The criterion depends on the boolean intersect.
+    When not set, the error of the arclen of the curve vs. the line must not
+    be larger than epsilon. When in intersect mode, all points of the curve
+    must be closer to the line than epsilon.
+    """
+    x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt = points
+    l0_pt = math.hypot(x3_pt-x0_pt, y3_pt-y0_pt)
+    l1_pt = math.hypot(x1_pt-x0_pt, y1_pt-y0_pt)
+    l2_pt = math.hypot(x2_pt-x1_pt, y2_pt-y1_pt)
+    l3_pt = math.hypot(x3_pt-x2_pt, y3_pt-y2_pt)
+
+    # When arclen calculation is performed, the maximal error value is
+    # given by the modulus of the difference between the length of the
+    # control polygon (i.e. |P1-P0|+|P2-P1|+|P3-P2|), which consitutes
+    # an upper bound for the length, and the length of the straight
+    # line between start and end point of the normcurve (i.e. |P3-P1|),
+    # which represents a lower bound.
+    if not intersect:
+        if l1_pt+l2_pt+l3_pt-l0_pt < epsilon:
+            # We can ignore the sign of l1_pt, l2_pt and l3_pt, as the sum
+            # of the absolute values is close to l0_pt anyway.
+            return l1_pt, l2_pt, l3_pt
+        return None
+
+    # For intersections we calculate the distance of (x1_pt, y1_pt)
+    # and (x2_pt, y2_pt) from the line defined by (x0_pt, y0_pt)
+    # and (x3_pt, y3_pt). We skip the division by l0_pt in the
+    # result and calculate d1_pt*l0_pt and d2_pt*l0_pt instead.
+    d1_pt_times_l0_pt = (x3_pt-x0_pt)*(y0_pt-y1_pt) - (x0_pt-x1_pt)*(y3_pt-y0_pt)
+    d2_pt_times_l0_pt = (x0_pt-x3_pt)*(y3_pt-y2_pt) - (x3_pt-x2_pt)*(y0_pt-y3_pt)
+    if abs(d1_pt_times_l0_pt) < epsilon*l0_pt and abs(d2_pt_times_l0_pt) < epsilon*l0_pt:
+        # We could return the line now, but for this to be correct,
+        # we would need to take into account the signs of l1_pt,
+        # l2_pt, and l3_pt. In addition, this could result in
+        # multiple parameters matching a position on the line.
+        s1 = (x1_pt-x0_pt)*(x3_pt-x0_pt)+(y1_pt-y0_pt)*(y3_pt-y0_pt)
+        s2 = (x2_pt-x1_pt)*(x3_pt-x0_pt)+(y2_pt-y1_pt)*(y3_pt-y0_pt)
+        s3 = (x2_pt-x3_pt)*(x0_pt-x3_pt)+(y2_pt-y3_pt)*(y0_pt-y3_pt)
+
+        # If the signs are negative (i.e. we have backwards
+        # directed segments in the control polygon), we can still
+        # continue, if the corresponding segment is smaller than
+        # epsilon.
+        if ((s1 > 0 or l1_pt < epsilon) and
+            (s2 > 0 or l2_pt < epsilon) and
+            (s3 > 0 or l3_pt < epsilon)):
+            # As the sign of the segments is either positive or the
+            # segments are short, we can continue with the unsigned
+            # values for the segment lengths, as for the arclen
+            # calculation.
+            return l1_pt, l2_pt, l3_pt
+    return None
+
+
+def flatten_pt(x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt, epsilon):
+    """return a polyline approximating a Bezier curve within epsilon for its arclen
+
+    See normcurve_pt._flatten_pt for details. Here, the splitting and the
+    check of flatline_pt are inlined for performance reasons. The stack
+    contains the parameter range, the epsilon and the control points of the
+    parts of the curve still to be split.
+    """
+    result = []
+    hypot = math.hypot
+    stack = [(0, 1, epsilon, x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt)]
+    while stack:
+        t0, dt, epsilon, x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt = stack.pop()
+        x01_pt = 0.5*x0_pt + 0.5*x1_pt
+        y01_pt = 0.5*y0_pt + 0.5*y1_pt
+        x12_pt = 0.5*x1_pt + 0.5*x2_pt
+        y12_pt = 0.5*y1_pt + 0.5*y2_pt
+        x23_pt = 0.5*x2_pt + 0.5*x3_pt
+        y23_pt = 0.5*y2_pt + 0.5*y3_pt
+        x01_12_pt = 0.5*x01_pt + 0.5*x12_pt
+        y01_12_pt = 0.5*y01_pt + 0.5*y12_pt
+        x12_23_pt = 0.5*x12_pt + 0.5*x23_pt
+        y12_23_pt = 0.5*y12_pt + 0.5*y23_pt
+        xm_pt = 0.5*x01_12_pt + 0.5*x12_23_pt
+        ym_pt = 0.5*y01_12_pt + 0.5*y12_23_pt
+        dt *= 0.5
+        if not dt:
+            raise RuntimeError("maximal splitting depth exceeded when flattening a curve")
+        l1_pt = hypot(x01_pt-x0_pt, y01_pt-y0_pt)
+        l2_pt = hypot(x01_12_pt-x01_pt, y01_12_pt-y01_pt)
+        l3_pt = hypot(xm_pt-x01_12_pt, ym_pt-y01_12_pt)
+        if l1_pt+l2_pt+l3_pt-hypot(xm_pt-x0_pt, ym_pt-y0_pt) < epsilon:
+            result.append((t0, dt, x0_pt, y0_pt, xm_pt, ym_pt, l1_pt, l2_pt, l3_pt))
+        else:
+            stack.append((t0, dt, 0.5*epsilon, x0_pt, y0_pt, x01_pt, y01_pt, x01_12_pt, y01_12_pt, xm_pt, ym_pt))
+        l1_pt = hypot(x12_23_pt-xm_pt, y12_23_pt-ym_pt)
+        l2_pt = hypot(x23_pt-x12_23_pt, y23_pt-y12_23_pt)
+        l3_pt = hypot(x3_pt-x23_pt, y3_pt-y23_pt)
+        if l1_pt+l2_pt+l3_pt-hypot(x3_pt-xm_pt, y3_pt-ym_pt) < epsilon:
+            result.append((t0+dt, dt, xm_pt, ym_pt, x3_pt, y3_pt, l1_pt, l2_pt, l3_pt))
+        else:
+            stack.append((t0+dt, dt, 0.5*epsilon, xm_pt, ym_pt, x12_23_pt, y12_23_pt, x23_pt, y23_pt, x3_pt, y3_pt))
+    # the lines were not created in order
+    result.sort()
+    return result
+
+
+def lineparam(param, l1_pt, l2_pt, l3_pt):
+    """convert the param of a line replacing a Bezier curve into the param of the curve
+
+    The lengths l1_pt, l2_pt, l3_pt of the control polygon of the curve are
+    used to approximate the arclen of the curve as a function of the param.
+    """
+    if 0 <= param <= 1:
+        params = mathutils.realpolyroots(l1_pt-2*l2_pt+l3_pt,
+                                         -3*l1_pt+3*l2_pt,
+                                         3*l1_pt,
+                                         -param*(l1_pt+l2_pt+l3_pt))
+        # we might get several solutions and choose the one closest to 0.5
+        # (we want the solution to be in the range 0 <= param <= 1; in case
+        # we get several solutions in this range, they all will be close to
+        # each other since l1_pt+l2_pt+l3_pt-l0_pt < epsilon)
+        params.sort(key=lambda t: abs(t-0.5))
+        return params[0]
+    else:
+        # when we are outside the proper parameter range, we skip the non-linear
+        # transformation, since it becomes slow and it might even start to be
+        # numerically instable
+        return param
+
+
+def curveat_pt(x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt, params):
+    """return the points of a Bezier curve at params"""
+    a3x_pt = -x0_pt+3*x1_pt-3*x2_pt+x3_pt
+    a2x_pt = 3*x0_pt-6*x1_pt+3*x2_pt
+    a1x_pt = -3*x0_pt+3*x1_pt
+    a3y_pt = -y0_pt+3*y1_pt-3*y2_pt+y3_pt
+    a2y_pt = 3*y0_pt-6*y1_pt+3*y2_pt
+    a1y_pt = -3*y0_pt+3*y1_pt
+    return [(a3x_pt*t*t*t + a2x_pt*t*t + a1x_pt*t + x0_pt,
+             a3y_pt*t*t*t + a2y_pt*t*t + a1y_pt*t + y0_pt)
+            for t in params]
+
+
+def curvecurvature_pt(x0_pt, y0_pt, x1_pt, y1_pt, x2_pt, y2_pt, x3_pt, y3_pt, params):
+    """return the curvature of a Bezier curve at params"""
+    result = []
+    # differences of the control points for the first and second derivative
+    d1x0_pt = -x0_pt + x1_pt
+    d1x1_pt = -x1_pt + x2_pt
+    d1x2_pt = -x2_pt + x3_pt
+    d1y0_pt = -y0_pt + y1_pt
+    d1y1_pt = -y1_pt + y2_pt
+    d1y2_pt = -y2_pt + y3_pt
+    d2x0_pt = x0_pt - 2*x1_pt + x2_pt
+    d2x1_pt = x1_pt - 2*x2_pt + x3_pt
+    d2y0_pt = y0_pt - 2*y1_pt + y2_pt
+    d2y1_pt = y1_pt - 2*y2_pt + y3_pt
+    for param in params:
+        xdot = 3 * (1-param)*(1-param) * d1x0_pt + 6 * (1-param)*param * d1x1_pt + 3 * param*param * d1x2_pt
+        ydot = 3 * (1-param)*(1-param) * d1y0_pt + 6 * (1-param)*param * d1y1_pt + 3 * param*param * d1y2_pt
+        xddot = 6 * (1-param) * d2x0_pt + 6 * param * d2x1_pt
+        yddot = 6 * (1-param) * d2y0_pt + 6 * param * d2y1_pt
+
+        hypot = math.hypot(xdot, ydot)
+        result.append((xdot*yddot - ydot*xddot) / hypot**3)
+    return result
+
+
+def _closepoint(x_pt, y_pt, x0_pt, y0_pt, x1_pt, y1_pt, epsilon):
+    """Returns the line parameter p in range [0, 1] for which
+    the point (x_pt, y_pt) is closest to the line defined by
+    ((x0_pt, y0_pt), (x1_pt, y1_pt)). The distance of (x0_pt,
+    y0_pt) and (x1_pt, y1_pt) must be larger than epsilon. If
+    the point has a greater distance than epsilon, None is
+    returned."""
+    p = (((x0_pt - x_pt)*(x0_pt - x1_pt) +
+          (y0_pt - y_pt)*(y0_pt - y1_pt))/
+         ((x1_pt - x0_pt)**2 + (y1_pt - y0_pt)**2))
+    p = min(1, max(0, p))
+    xs_pt = x0_pt + p*(x1_pt - x0_pt)
+    ys_pt = y0_pt + p*(y1_pt - y0_pt)
+    if math.hypot(xs_pt - x_pt, ys_pt - y_pt) < epsilon:
+        return p
+    return None # just be explicit in returning None here
+
+
+def lineintersect_pt(ax0_pt, ay0_pt, ax1_pt, ay1_pt, bx0_pt, by0_pt, bx1_pt, by1_pt, epsilon):
+    """return the list of parameter pairs of the intersection of the lines a and b"""
+    a_deltax_pt = ax1_pt - ax0_pt
+    a_deltay_pt = ay1_pt - ay0_pt
+
+    b_deltax_pt = bx1_pt - bx0_pt
+    b_deltay_pt = by1_pt - by0_pt
+
+    invdet = b_deltax_pt * a_deltay_pt - b_deltay_pt * a_deltax_pt
+
+    if abs(invdet) < epsilon * epsilon:
+        # As invdet measures the area spanned by the two lines, least
+        # one of the lines is either very short or the lines are almost
+        # parallel. In both cases, a proper colinear check is adequate,
+        # already. Let's first check for short lines.
+        short_a = math.hypot(a_deltax_pt, a_deltay_pt) < epsilon
+        short_b = math.hypot(b_deltax_pt, b_deltay_pt) < epsilon
+
+        # For short lines we will only take their middle point into
+        # account.
+        if short_a:
+            ax_pt = 0.5*(ax0_pt + ax1_pt)
+            ay_pt = 0.5*(ay0_pt + ay1_pt)
+        if short_b:
+            bx_pt = 0.5*(bx0_pt + bx1_pt)
+            by_pt = 0.5*(by0_pt + by1_pt)
+
+        if short_a and short_b:
+            # If both lines are short, we just measure the distance of
+            # the middle points.
+            if math.hypot(bx_pt - ax_pt, by_pt - ay_pt) < epsilon:
+                return [(0.5, 0.5)]
+        elif short_a:
+            p = _closepoint(ax_pt, ay_pt, bx0_pt, by0_pt, bx1_pt, by1_pt, epsilon)
+            if p is not None:
+                return [(0.5, p)]
+        elif short_b:
+            p = _closepoint(bx_pt, by_pt, ax0_pt, ay0_pt, ax1_pt, ay1_pt, epsilon)
+            if p is not None:
+                return [(p, 0.5)]
+        else:
+            # For two long colinear lines, we need to test the
+            # beginning and end point of the two lines with respect to
+            # the other line, in all combinations. We return just one
+            # solution even when the lines intersect for a whole range.
+            p = _closepoint(ax0_pt, ay0_pt, bx0_pt, by0_pt, bx1_pt, by1_pt, epsilon)
+            if p is not None:
+                return [(0, p)]
+            p = _closepoint(ax1_pt, ay1_pt, bx0_pt, by0_pt, bx1_pt, by1_pt, epsilon)
+            if p is not None:
+                return [(1, p)]
+            p = _closepoint(bx0_pt, by0_pt, ax0_pt, ay0_pt, ax1_pt, ay1_pt, epsilon)
+            if p is not None:
+                return [(p, 0)]
+            p = _closepoint(bx1_pt, by1_pt, ax0_pt, ay0_pt, ax1_pt, ay1_pt, epsilon)
+            if p is not None:
+                return [(p, 1)]
+        return []
+
+    det = 1.0 / invdet
+
+    ba_deltax0_pt = bx0_pt - ax0_pt
+    ba_deltay0_pt = by0_pt - ay0_pt
+
+    a_t = (b_deltax_pt * ba_deltay0_pt - b_deltay_pt * ba_deltax0_pt) * det
+    b_t = (a_deltax_pt * ba_deltay0_pt - a_deltay_pt * ba_deltax0_pt) * det
+
+    # check for intersections out of bound
+    if not (0<=a_t<=1 and 0<=b_t<=1):
+        # correct the parameters, if the deviation is smaller than epsilon
+        a_t = min(1, max(0, a_t))
+        b_t = min(1, max(0, b_t))
+        a_x = ax0_pt + a_deltax_pt*a_t
+        a_y = ay0_pt + a_deltay_pt*a_t
+        b_x = bx0_pt + b_deltax_pt*b_t
+        b_y = by0_pt + b_deltay_pt*b_t
+        if math.hypot(a_x - b_x, a_y - b_y) > epsilon:
+            return []
+
+    # return parameters of intersection
+    return [(a_t, b_t)]
@@ -1005,11 +1005,9 @@ class multilineto_pt(pathitem):
             context.x_pt, context.y_pt = self.points_pt[-1]
 
     def updatenormpath(self, normpath, context):
-        x0_pt, y0_pt = context.x_pt, context.y_pt
-        for point_pt in self.points_pt:
-            normpath.normsubpaths[-1].append(normline_pt(x0_pt, y0_pt, *point_pt))
-            x0_pt, y0_pt = point_pt
-        context.x_pt, context.y_pt = x0_pt, y0_pt
+        normpath.normsubpaths[-1].appendlines_pt(context.x_pt, context.y_pt, self.points_pt)
+        if self.points_pt:
+            context.x_pt, context.y_pt = self.points_pt[-1]
 
     def outputPS(self, file, writer):
         for point_pt in self.points_pt:
@@ -1074,7 +1072,7 @@ class path:
 
     """PS style path"""
 
-    __slots__ = "pathitems", "_normpath"
+    __slots__ = "pathitems", "_normpath", "_bbox"
 
     def __init__(self, *pathitems):
         """construct a path from pathitems *args"""
@@ -1085,6 +1083,8 @@ class path:
         self.pathitems = list(pathitems)
         # normpath cache (when no epsilon is set)
         self._normpath = None
+        # bbox cache
+        self._bbox = None
 
     def __add__(self, other):
         """create new path out of self and other"""
@@ -1098,6 +1098,7 @@ class path:
         """
         self.pathitems += other.path().pathitems
         self._normpath = None
+        self._bbox = None
         return self
 
     def __getitem__(self, i):
@@ -1117,6 +1118,7 @@ class path:
         assert isinstance(apathitem, pathitem), "only pathitem instance allowed"
         self.pathitems.append(apathitem)
         self._normpath = None
+        self._bbox = None
 
     def arclen_pt(self):
         """return arc length in pts"""
@@ -1160,14 +1162,17 @@ class path:
 
     def bbox(self):
         """return bbox of path"""
-        if self.pathitems:
-            bbox = self.pathitems[0].createbbox()
-            context = self.pathitems[0].createcontext()
-            for pathitem in self.pathitems[1:]:
-                pathitem.updatebbox(bbox, context)
-            return bbox
-        else:
-            return bboxmodule.empty()
+        if self._bbox is None:
+            if self.pathitems:
+                bbox = self.pathitems[0].createbbox()
+                context = self.pathitems[0].createcontext()
+                for pathitem in self.pathitems[1:]:
+                    pathitem.updatebbox(bbox, context)
+            else:
+                bbox = bboxmodule.empty()
+            self._bbox = bbox
+        # return a copy, since bboxes can be modified inplace
+        return self._bbox.copy()
 
     def begin(self):
         """return param corresponding of the beginning of the path"""
@@ -1187,6 +1192,7 @@ class path:
             assert isinstance(apathitem, pathitem), "only pathitem instance allowed"
         self.pathitems.extend(pathitems)
         self._normpath = None
+        self._bbox = None
 
     def intersect(self, other):
         """intersect self with other path
@@ -1204,6 +1210,7 @@ class path:
         """
         self.pathitems = self.joined(other).path().pathitems
         self._normpath = None
+        self._bbox = None
         return self
 
     def joined(self, other):
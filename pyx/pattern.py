@@ -75,7 +75,7 @@ class pattern(canvas.canvas, attr.exclusiveattr, style.fillstyle):
         patternfile = writermodule.writer(io.BytesIO())
         realpatternbbox = bboxmodule.empty()
         canvas.canvas.processPS(self, patternfile, writer, pswriter.context(), registry, realpatternbbox)
-        patternproc = patternfile.file.getvalue()
+        patternproc = patternfile.getvalue()
 
         if self.xstep is None:
             xstep = unit.topt(realpatternbbox.width())
@@ -120,7 +120,7 @@ class pattern(canvas.canvas, attr.exclusiveattr, style.fillstyle):
         patternfile = writermodule.writer(io.BytesIO())
         realpatternbbox = bboxmodule.empty()
         canvas.canvas.processPDF(self, patternfile, writer, pdfwriter.context(), patternregistry, realpatternbbox)
-        patternproc = patternfile.file.getvalue()
+        patternproc = patternfile.getvalue()
 
         registry.mergeregistry(patternregistry)
 
@@ -148,16 +148,13 @@ class pattern(canvas.canvas, attr.exclusiveattr, style.fillstyle):
                                 patternbbox, xstep, ystep, patterntrafo, patternproc, writer, registry, patternregistry))
 
         # activate pattern
-        if context.colorspace != "Pattern":
-            # we only set the fill color space (see next comment)
-            file.write("/Pattern cs\n")
-            context.colorspace = "Pattern"
         if context.strokeattr:
             # using patterns as stroke colors doesn't seem to work, so
             # we just don't do this...
             logger.warning("ignoring stroke color for patterns in PDF")
         if context.fillattr:
-            file.write("/%s scn\n"% self.id)
+            # we only set the fill color space (see previous comment)
+            context.setgstate("fillcolor", "/Pattern cs\n/%s scn\n" % self.id)
 
     def processSVGattrs(self, attrs, writer, context, registry):
         assert self.patterntype == 1
@@ -312,6 +309,8 @@ crosshatched45.LARGE = crosshatched45(_base*math.sqrt(64))
 
 class PDFpattern(pdfwriter.PDFobject):
 
+    isstream = True
+
     def __init__(self, name, patterntype, painttype, tilingtype, bbox, xstep, ystep, trafo,
                  patternproc, writer, registry, patternregistry):
         self.patternregistry = patternregistry
@@ -328,6 +327,9 @@ class PDFpattern(pdfwriter.PDFobject):
         self.trafo = trafo
         self.patternproc = patternproc
 
+    def streamdata(self, writer):
+        return self.patternproc
+
     def write(self, file, writer, registry):
         file.write("<<\n"
                    "/Type /Pattern\n"
@@ -341,8 +343,7 @@ class PDFpattern(pdfwriter.PDFobject):
         file.write("/Resources ")
         self.patternregistry.writeresources(file)
         if writer.compress:
-            import zlib
-            content = zlib.compress(self.patternproc)
+            content = writer.compressstream(self.type, self.patternproc)
         else:
             content = self.patternproc
 
@@ -245,6 +245,7 @@ class PDFtextfield(pdfwriter.PDFobject): # <<<
                 cont.fillattr = 1
                 cont.strokeattr = 0
                 attr.processPDF(fillstring, writer, cont, self.registry, bbox)
+                cont.writegstate(fillstring, self.registry)
         self.fillstyles = fillstring.getvalue()
         fillstring.close()
 
@@ -279,6 +280,8 @@ class PDFtextfield(pdfwriter.PDFobject): # <<<
 # >>>
 class PDFdefaulttext(pdfwriter.PDFobject): # <<<
 
+    isstream = True
+
     def __init__(self, writer, registry, fontsize, font, fontleading, texts, bb, borderwidth, vcenter):
 
         super().__init__("defaulttext")
@@ -319,9 +322,9 @@ class PDFdefaulttext(pdfwriter.PDFobject): # <<<
             contentfile.write(" (%s)'" % (text))
         contentfile.write(" ET Q EMC\n")
 
-        content = contentfile.file.getvalue()
+        content = contentfile.getvalue()
         if awriter.compress:
-            content = zlib.compress(content)
+            content = awriter.compressstream(self.type, content)
 
         file.write("<<\n")
         file.write("/Type /XObject\n")
@@ -530,6 +533,8 @@ class PDFcheckboxfield(pdfwriter.PDFobject): # <<<
 # >>>
 class PDFButtonState(pdfwriter.PDFobject): # <<<
 
+    isstream = True
+
     def __init__(self, writer, registry, fontsize, font, bgchar, fgchar,
         bgscale=None, bgrelshift=None, fgscale=None, fgrelshift=None):
 
@@ -567,9 +572,9 @@ class PDFButtonState(pdfwriter.PDFobject): # <<<
         if self.fgchar:
             contentfile.write("q BT /%s %f Tf %s (%s) Tj ET Q\n" % (self.font.name, self.fontsize, self.fgtrafo, self.fgchar))
 
-        content = contentfile.file.getvalue()
+        content = contentfile.getvalue()
         if awriter.compress:
-            content = zlib.compress(content)
+            content = awriter.compressstream(self.type, content)
 
         file.write("<<\n")
         file.write("/Type /XObject\n")
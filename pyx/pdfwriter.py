@@ -21,7 +21,8 @@
 # along with PyX; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
-import io, copy, logging, os, time
+import io, copy, functools, itertools, logging, math, os, time
+from concurrent import futures
 logger = logging.getLogger("pyx")
 try:
     import zlib
@@ -42,6 +43,7 @@ class PDFregistry:
         self.resources = {} # dictionary of dictionaries containing for each resource type a mapping name -> object
         self.procsets = {"PDF": 1}
         self.merged = None
+        self.refno = 1      # next refno to be assigned
 
     def __contains__(self, object):
         if self.merged:
@@ -70,40 +72,25 @@ class PDFregistry:
             self.add(object)
         registry.merged = self
 
+    def newrefno(self):
+        refno = self.refno
+        self.refno += 1
+        return refno
+
     def write(self, file, writer, catalog, pdfinfo):
         # first we set all refnos
-        refno = 1
         for object in self.objects:
-            object.refno = refno
-            refno += 1
+            object.refno = self.newrefno()
 
         # second, all objects are written, keeping the positions in the output file
-        fileposes = []
-        for object in self.objects:
-            fileposes.append(file.tell())
-            file.write("%i 0 obj\n" % object.refno)
-            object.write(file, writer, self)
-            file.write("endobj\n")
-
-        # xref
-        xrefpos = file.tell()
-        file.write("xref\n"
-                   "0 %d\n"
-                   "0000000000 65535 f \n" % refno)
-
-        for filepos in fileposes:
-            file.write("%010i 00000 n \n" % filepos)
-
-        # trailer
-        file.write("trailer\n"
-                   "<<\n"
-                   "/Size %i\n" % refno)
-        file.write("/Root %i 0 R\n" % self.getrefno(catalog))
-        file.write("/Info %i 0 R\n" % self.getrefno(pdfinfo))
-        file.write(">>\n"
-                   "startxref\n"
-                   "%i\n" % xrefpos)
-        file.write("%%EOF\n")
+        xref = PDFxref(file, writer, self)
+        xref.writeobjects(self.objects)
+        xref.write(catalog, pdfinfo)
+
+    def writeobject(self, file, writer, object):
+        file.write("%i 0 obj\n" % object.refno)
+        object.write(file, writer, self)
+        file.write("endobj\n")
 
     def addresource(self, resourcetype, resourcename, object, procset=None):
         self.resources.setdefault(resourcetype, {})[resourcename] = object
@@ -120,23 +107,180 @@ class PDFregistry:
         file.write(">>\n")
 
 
+class PDFstreamregistry(PDFregistry):
+
+    """ registry writing page objects as soon as they are processed
+
+    Refnos are assigned when objects are registered. Pages and their content
+    streams are written immediately by writepage, while all other objects
+    (shared resources like fonts, encodings, patterns, etc., which might still
+    be merged with resources of later pages) are deferred until write is
+    called at the end of the document.
+    """
+
+    def __init__(self, file, writer):
+        PDFregistry.__init__(self)
+        self.xref = PDFxref(file, writer, self)
+
+    def add(self, object):
+        sameobjects = self.types.setdefault(object.type, {})
+        if object.id in sameobjects:
+            sameobjects[object.id].merge(object)
+        else:
+            object.refno = self.newrefno()
+            self.objects.append(object)
+            sameobjects[object.id] = object
+
+    def writepage(self, pdfpage):
+        self.xref.writeobjects([pdfpage.pdfcontent, pdfpage])
+        # release the page data, which is not needed anymore
+        pdfpage.release()
+        self.objects = [object for object in self.objects if object is not pdfpage.pdfcontent and object is not pdfpage]
+
+    def write(self, file, writer, catalog, pdfinfo):
+        self.xref.writeobjects(self.objects)
+        self.objects = []
+        self.xref.write(catalog, pdfinfo)
+
+
+class PDFxref:
+
+    """ positions of the written objects for the cross-reference table
+
+    With object streams enabled in the writer, all objects but streams are
+    collected in (compressed) object streams, and the cross-reference table
+    is written as a (compressed) stream, too. This requires PDF 1.5.
+    """
+
+    # maximal number of objects in an object stream
+    objectstreamsize = 100
+
+    def __init__(self, file, awriter, registry):
+        self.file = file
+        self.awriter = awriter
+        self.registry = registry
+        self.entries = {}      # dictionary mapping refnos to file positions or (object stream refno, index)
+        self.objectstream = [] # list of pending (refno, data) of the current object stream
+
+    def writeobject(self, object):
+        if not self.awriter.objectstreams or object.isstream:
+            self.entries[object.refno] = self.file.tell()
+            self.registry.writeobject(self.file, self.awriter, object)
+        else:
+            objectfile = writer.writer(io.BytesIO())
+            object.write(objectfile, self.awriter, self.registry)
+            self.objectstream.append((object.refno, objectfile.getvalue()))
+            if len(self.objectstream) == self.objectstreamsize:
+                self.writeobjectstream()
+
+    def writeobjects(self, objects):
+        # the streams of the objects are compressed concurrently in advance
+        self.awriter.precompress(objects)
+        for object in objects:
+            self.writeobject(object)
+
+    def writestream(self, refno, type, dictentries, data):
+        self.entries[refno] = self.file.tell()
+        if self.awriter.compress:
+            data = self.awriter.compressstream(type, data)
+        self.file.write("%i 0 obj\n"
+                        "<<\n"
+                        "%s"
+                        "/Length %i\n" % (refno, dictentries, len(data)))
+        if self.awriter.compress:
+            self.file.write("/Filter /FlateDecode\n")
+        self.file.write(">>\n"
+                        "stream\n")
+        self.file.write_bytes(data)
+        self.file.write("endstream\n"
+                        "endobj\n")
+
+    def writeobjectstream(self):
+        refno = self.registry.newrefno()
+        offsets = []
+        offset = 0
+        for index, (objectrefno, data) in enumerate(self.objectstream):
+            self.entries[objectrefno] = refno, index
+            offsets.append("%i %i" % (objectrefno, offset))
+            offset += len(data)
+        header = ("%s\n" % " ".join(offsets)).encode("ascii")
+        self.writestream(refno, "objectstream", "/Type /ObjStm\n/N %i\n/First %i\n" % (len(self.objectstream), len(header)),
+                         header + b"".join(data for objectrefno, data in self.objectstream))
+        self.objectstream = []
+
+    def write(self, catalog, pdfinfo):
+        """ write xref and trailer """
+        if self.objectstream:
+            self.writeobjectstream()
+        if self.awriter.objectstreams:
+            refno = self.registry.newrefno()
+            xrefpos = self.file.tell()
+            self.entries[refno] = xrefpos
+            # entries of the types 0 (free), 1 (file position) and 2 (object stream refno and index)
+            width = max(1, (max(xrefpos, refno).bit_length() + 7) // 8)
+            entries = [b"\x00" + bytes(width) + b"\xff\xff"]
+            for refno in range(1, self.registry.refno):
+                entry = self.entries[refno]
+                if isinstance(entry, tuple):
+                    entries.append(b"\x02" + entry[0].to_bytes(width, "big") + entry[1].to_bytes(2, "big"))
+                else:
+                    entries.append(b"\x01" + entry.to_bytes(width, "big") + b"\x00\x00")
+            self.writestream(refno, "xref", "/Type /XRef\n/Size %i\n/W [1 %i 2]\n/Root %i 0 R\n/Info %i 0 R\n" %
+                             (self.registry.refno, width, self.registry.getrefno(catalog), self.registry.getrefno(pdfinfo)),
+                             b"".join(entries))
+        else:
+            xrefpos = self.file.tell()
+            self.file.write("xref\n"
+                            "0 %d\n"
+                            "0000000000 65535 f \n" % self.registry.refno)
+
+            for refno in range(1, self.registry.refno):
+                self.file.write("%010i 00000 n \n" % self.entries[refno])
+
+            # trailer
+            self.file.write("trailer\n"
+                            "<<\n"
+                            "/Size %i\n" % self.registry.refno)
+            self.file.write("/Root %i 0 R\n" % self.registry.getrefno(catalog))
+            self.file.write("/Info %i 0 R\n" % self.registry.getrefno(pdfinfo))
+            self.file.write(">>\n")
+        self.file.write("startxref\n"
+                        "%i\n" % xrefpos)
+        self.file.write("%%EOF\n")
+
+
+_objectids = itertools.count()
+
 class PDFobject:
 
+    compresslevel = None # compression level of the stream data, None for the compresslevel of the writer
+    isstream = False # whether the object is a stream, which can not be stored in an object stream
+
     def __init__(self, type, _id=None):
         """create a PDFobject
           - type has to be a string describing the type of the object
           - _id is a unique identification used for the object if it is not None.
-            Otherwise id(self) is used
+            Otherwise a unique id is generated
         """
         self.type = type
         if _id is None:
-            self.id = id(self)
+            # the process id keeps the id unique for objects created in
+            # worker processes (see writer.processpages)
+            self.id = (os.getpid(), next(_objectids))
         else:
             self.id = _id
 
     def merge(self, other):
         pass
 
+    def streamdata(self, writer):
+        """return the stream data to be compressed by writer.compressstream when writing the object
+
+        Objects returning the data here (instead of None) get their stream
+        compressed in advance, concurrently with the streams of other objects.
+        """
+        return None
+
     def write(self, file, writer, registry):
         raise NotImplementedError("write method has to be provided by PDFobject subclass")
 
@@ -241,13 +385,24 @@ class PDFform(PDFobject):
 
 class PDFpages(PDFobject):
 
-    def __init__(self, document, writer, registry):
+    def __init__(self, document, awriter, registry):
         PDFobject.__init__(self, "pages")
         self.pdfpagelist = []
-        for pageno, page in enumerate(document.pages):
-            page = PDFpage(page, pageno, self, writer, registry)
+        if awriter.streaming:
+            # the pages are written immediately and need the refno of their parent
+            registry.add(self)
+        if awriter.workers is not None and awriter.workers > 1:
+            # the TeX interpreters are not available in the worker processes
+            # prevent cyclic imports
+            from . import text
+            text.finishtextboxes([page.canvas for page in document.pages])
+        processedpages = writer.processpages(document.pages, functools.partial(processpage, awriter=awriter), awriter.workers)
+        for pageno, (page, processedpage) in enumerate(zip(document.pages, processedpages)):
+            page = PDFpage(page, pageno, self, awriter, registry, processedpage)
             registry.add(page)
             self.pdfpagelist.append(page)
+            if awriter.streaming:
+                registry.writepage(page)
 
     def write(self, file, writer, registry):
         file.write("<<\n"
@@ -261,7 +416,7 @@ class PDFpages(PDFobject):
 
 class PDFpage(PDFobject):
 
-    def __init__(self, page, pageno, pdfpages, writer, registry):
+    def __init__(self, page, pageno, pdfpages, writer, registry, processedpage):
         PDFobject.__init__(self, "page")
         self.pdfpages = pdfpages
         self.page = page
@@ -279,7 +434,11 @@ class PDFpage(PDFobject):
         #     if object.type == "form":
         #         self.pageregistry.add(object)
 
-        self.pdfcontent = PDFcontent(page, writer, self.pageregistry)
+        # the page content was processed into a registry of its own by processpage
+        self.pdfcontent, contentregistry = processedpage
+        self.pageregistry.resources = contentregistry.resources
+        self.pageregistry.procsets = contentregistry.procsets
+        self.pageregistry.mergeregistry(contentregistry)
         self.pageregistry.add(self.pdfcontent)
         registry.mergeregistry(self.pageregistry)
 
@@ -305,20 +464,37 @@ class PDFpage(PDFobject):
         self.pageregistry.writeresources(file)
         file.write(">>\n")
 
+    def release(self):
+        """ release page data not needed after the page has been written """
+        self.page = None
+        self.pageregistry = None
+        self.pdfcontent.content = None
+
+
+def processpage(page, awriter):
+    """ process the content of page and return it together with the registry of used resources """
+    registry = PDFregistry()
+    return PDFcontent(page, awriter, registry), registry
+
 
 class PDFcontent(PDFobject):
 
+    isstream = True
+
     def __init__(self, page, awriter, registry):
-        PDFobject.__init__(self, registry, _id="content")
+        PDFobject.__init__(self, "content")
         contentfile = writer.writer(io.BytesIO())
         self.bbox = bbox.empty()
         acontext = context()
         page.processPDF(contentfile, awriter, acontext, registry, self.bbox)
-        self.content = contentfile.file.getvalue()
+        self.content = contentfile.getvalue()
+
+    def streamdata(self, awriter):
+        return self.content
 
     def write(self, file, awriter, registry):
         if awriter.compress:
-            content = zlib.compress(self.content)
+            content = awriter.compressstream(self.type, self.content)
         else:
             content = self.content
         file.write("<<\n"
@@ -337,6 +513,7 @@ class PDFwriter:
                        title=None, author=None, subject=None, keywords=None,
                        fullscreen=False, writebbox=False, compress=True, compresslevel=6,
                        stripfonts=True, textaspath=False, meshasbitmap=False, meshasbitmapresolution=300,
+                       streaming=False, workers=None, objectstreams=False, compressthreads=None,
                        strip_fonts=None, text_as_path=None, mesh_as_bitmap=None, mesh_as_bitmap_resolution=None):
         self._fontmap = None
 
@@ -351,6 +528,11 @@ class PDFwriter:
             logger.warning("PDFwriter: compression disabled due to missing zlib module")
         self.compress = compress
         self.compresslevel = compresslevel
+        self.compressthreads = compressthreads
+        # dictionary mapping object types to [number of streams, uncompressed bytes, compressed bytes]
+        self.compressionstats = {}
+        self._compressed = {} # dictionary mapping id of stream data to (data, future of compressed data)
+        self._compressexecutor = None
         if strip_fonts is not None:
             logger.warning("PDFwriter: strip_fonts deprecated, use stripfonts instead")
             stripfonts = strip_fonts
@@ -367,21 +549,76 @@ class PDFwriter:
             logger.warning("PDFwriter: mesh_as_bitmap_resolution deprecated, use meshasbitmapresolution instead")
             meshasbitmapresolution = mash_as_bitmap_resolution
         self.meshasbitmapresolution = meshasbitmapresolution
+        self.streaming = streaming
+        self.workers = workers
+        self.objectstreams = objectstreams
 
         # dictionary mapping font names to dictionaries mapping encoding names to encodings
         # encodings themselves are mappings from glyphnames to codepoints
         self.encodings = {}
 
+        file = writer.writer(file)
+        if objectstreams:
+            file.write_bytes(b"%PDF-1.5\n%\xc3\xb6\xc3\xa9\n")
+        else:
+            file.write_bytes(b"%PDF-1.4\n%\xc3\xb6\xc3\xa9\n")
+
         # the PDFcatalog class automatically builds up the pdfobjects from a document
-        registry = PDFregistry()
+        if streaming:
+            # pages are written while they are processed
+            registry = PDFstreamregistry(file, self)
+        else:
+            registry = PDFregistry()
         catalog = PDFcatalog(document, self, registry)
         registry.add(catalog)
         pdfinfo = PDFinfo()
         registry.add(pdfinfo)
-
-        file = writer.writer(file)
-        file.write_bytes(b"%PDF-1.4\n%\xc3\xb6\xc3\xa9\n")
-        registry.write(file, self, catalog, pdfinfo)
+        try:
+            registry.write(file, self, catalog, pdfinfo)
+        finally:
+            if self._compressexecutor is not None:
+                self._compressexecutor.shutdown()
+                self._compressexecutor = None
+        file.flush()
+
+    def precompress(self, objects):
+        """start compressing the stream data of objects in a thread pool
+
+        zlib releases the global interpreter lock while compressing, i.e.
+        independent streams are compressed in parallel. compressthreads sets
+        the number of threads (None for the default of the executor, 1 to
+        compress sequentially when writing the streams)."""
+        if not haszlib or self.compressthreads == 1:
+            return
+        for object in objects:
+            if object.compresslevel is None:
+                if not self.compress:
+                    continue
+                compresslevel = self.compresslevel
+            else:
+                compresslevel = object.compresslevel
+            data = object.streamdata(self)
+            if data is not None:
+                if self._compressexecutor is None:
+                    self._compressexecutor = futures.ThreadPoolExecutor(self.compressthreads)
+                # data is kept to keep its id unique until the stream is written
+                self._compressed[id(data)] = data, self._compressexecutor.submit(zlib.compress, data, compresslevel)
+
+    def compressstream(self, type, data, compresslevel=None):
+        """return data compressed at compresslevel (defaulting to the compresslevel of the writer)
+        collecting statistics for the object type"""
+        if compresslevel is None:
+            compresslevel = self.compresslevel
+        prepared = self._compressed.pop(id(data), None)
+        if prepared is not None and prepared[0] is data:
+            compressed = prepared[1].result()
+        else:
+            compressed = zlib.compress(data, compresslevel)
+        stats = self.compressionstats.setdefault(type, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += len(data)
+        stats[2] += len(compressed)
+        return compressed
 
     def getfontmap(self):
         if self._fontmap is None:
@@ -392,22 +629,123 @@ class PDFwriter:
         return self._fontmap
 
 
+class PDFextgstate(PDFobject):
+
+    def __init__(self, name, extgstate, registry):
+        PDFobject.__init__(self, "extgstate", _id=name)
+        registry.addresource("ExtGState", name, self)
+        self.name = name
+        self.extgstate = extgstate
+
+    def write(self, file, writer, registry):
+        file.write("%s\n" % self.extgstate)
+
+
+# graphics state parameters tracked by the context for stroking and for
+# filling: the operators setting their initial values at the beginning of a
+# content stream together with the name and dictionary of an ExtGState
+# resource used by the operator
+_initialstrokegstate = {"strokecolor": ("0.000000 G\n", None),
+                        "linewidth": ("1.000000 w\n", None),
+                        "linecap": ("0 J\n", None),
+                        "linejoin": ("0 j\n", None),
+                        "miterlimit": ("10.000000 M\n", None),
+                        "dash": ("[] 0.000000 d\n", None),
+                        "strokeopacity": ("/Transparency-Stroke-1.000000 gs\n",
+                                          ("Transparency-Stroke-1.000000", "<< /Type /ExtGState /CA 1.000000 >>"))}
+_initialfillgstate = {"fillcolor": ("0.000000 g\n", None),
+                      "fillopacity": ("/Transparency-Fill-1.000000 gs\n",
+                                      ("Transparency-Fill-1.000000", "<< /Type /ExtGState /ca 1.000000 >>"))}
+
+
 class context:
 
     def __init__(self):
         self.linewidth_pt = None
-        # XXX there are both stroke and fill color spaces
-        self.colorspace = None
+        self.miterlimit = 10
         self.strokeattr = 1
         self.fillattr = 1
         self.selectedfont = None
         self.trafo = trafo.trafo()
         self.fillstyles = []
         self.fillrule = 0
+        # operators of the graphics state parameters in effect in the content
+        # stream (shared by all contexts up to the next q operator) and the
+        # ones requested in the current scope (copied for each new context)
+        self.gstate = {}
+        self.requestedgstate = {}
+        # forms of canvases inserted several times (shared by all contexts)
+        self.forms = {}
+        # extents of strokes beyond their paths in the coordinates of the page
+        # (a list shared by all contexts while processing a form or None)
+        self.strokeextents = None
 
     def __call__(self, **kwargs):
         newcontext = copy.copy(self)
+        newcontext.requestedgstate = self.requestedgstate.copy()
         for key, value in list(kwargs.items()):
             setattr(newcontext, key, value)
         return newcontext
 
+    def setgstate(self, key, operator, extgstate=None):
+        """request operator for the graphics state parameter key
+
+        The operator is written by writegstate only if the parameter is not
+        set accordingly already. The optional extgstate is a tuple of the name
+        and the dictionary of an ExtGState resource used by the operator.
+        """
+        self.requestedgstate[key] = operator, extgstate
+
+    def writegstate(self, file, registry, stroke=True, fill=True):
+        """write operators for requested graphics state parameters not in effect
+
+        Only the parameters used for stroking and/or filling are written.
+        Parameters changed by other scopes without a surrounding q/Q pair
+        are reset to their initial values if not requested in this scope.
+        """
+        for initialgstate in (stroke and _initialstrokegstate or {}), (fill and _initialfillgstate or {}):
+            for key, initial in initialgstate.items():
+                operator, extgstate = self.requestedgstate.get(key, initial)
+                if self.gstate.get(key, initial[0]) != operator:
+                    if extgstate is not None:
+                        registry.add(PDFextgstate(*extgstate, registry))
+                    file.write(operator)
+                    self.gstate[key] = operator
+
+    def _scales(self):
+        # minimal and maximal scaling of lengths by the trafo (its singular values)
+        (a, b), (c, d) = self.trafo.matrix
+        s = 0.5*(a*a + b*b + c*c + d*d)
+        r = math.sqrt(max(s*s - (a*d - b*c)**2, 0))
+        return math.sqrt(max(s - r, 0)), math.sqrt(s + r)
+
+    def addstrokeextent(self, extent_pt):
+        """record the extent of a stroke beyond its path in the current coordinates
+
+        The extent is converted to (an upper bound of) the extent in the
+        coordinates of the page."""
+        if self.strokeextents is not None:
+            self.strokeextents.append(extent_pt*self._scales()[1])
+
+    def pagestrokeextent_pt(self, strokeextents):
+        """return the maximal extent of strokeextents in the current coordinates
+
+        The strokeextents are given in the coordinates of the page as
+        recorded by addstrokeextent."""
+        minscale = self._scales()[0]
+        if not strokeextents or not minscale:
+            return 0
+        return max(strokeextents)/minscale
+
+    def strokeextent_pt(self):
+        """return the maximal extent of a stroke beyond its path
+
+        The extent is bounded by the miterlimit for miter joins and
+        by the diagonal of the half linewidth for square caps."""
+        return 0.5*self.linewidth_pt*max(self.miterlimit, math.sqrt(2))
+
+    def savegstate(self, file):
+        """write a q operator and track the graphics state up to the Q operator separately"""
+        file.write("q\n")
+        self.gstate = self.gstate.copy()
+
@@ -20,9 +20,11 @@
 # along with PyX; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
-import io, copy, time, math, os
+import io, copy, functools, logging, time, math, os
 from . import bbox, config, style, version, unit, trafo, writer
 
+logger = logging.getLogger("pyx")
+
 
 class PSregistry:
 
@@ -43,7 +45,7 @@ class PSregistry:
            self.resourceslist.append(resource)
 
     def mergeregistry(self, registry):
-        for resource in registry.resources:
+        for resource in registry.resourceslist:
             self.add(resource)
 
     def output(self, file, writer):
@@ -169,16 +171,18 @@ class EPSwriter(_PSwriter):
         registry.output(file, self)
         file.write("%%EndProlog\n")
 
-        file.write_bytes(pagefile.file.getvalue())
+        file.write_bytes(b"".join(acontext.proceduredefinitions))
+        file.write_bytes(pagefile.getvalue())
 
         file.write("showpage\n")
         file.write("%%Trailer\n")
         file.write("%%EOF\n")
+        file.flush()
 
 
 class PSwriter(_PSwriter):
 
-    def __init__(self, document, file, writebbox=False, **kwargs):
+    def __init__(self, document, file, writebbox=False, workers=None, **kwargs):
         _PSwriter.__init__(self, **kwargs)
         file = writer.writer(file)
 
@@ -191,13 +195,14 @@ class PSwriter(_PSwriter):
         # calculated bounding boxes of the whole document
         documentbbox = bbox.empty()
 
-        for nr, page in enumerate(document.pages):
-            # process contents of page
-            pagefile = writer.writer(io.BytesIO())
-            acontext = context()
-            pagebbox = bbox.empty()
-            page.processPS(pagefile, self, acontext, registry, pagebbox)
-
+        if workers is not None and workers > 1:
+            # the TeX interpreters are not available in the worker processes
+            # prevent cyclic imports
+            from . import text
+            text.finishtextboxes([page.canvas for page in document.pages])
+        processedpages = writer.processpages(document.pages, functools.partial(processpage, awriter=self), workers)
+        for nr, (page, (pagedefinitions, pagecontent, pagebbox, pageregistry)) in enumerate(zip(document.pages, processedpages)):
+            registry.mergeregistry(pageregistry)
             documentbbox += pagebbox
 
             pagesfile.write("%%%%Page: %s %d\n" % (page.pagename is None and str(nr+1) or page.pagename, nr+1))
@@ -210,9 +215,10 @@ class PSwriter(_PSwriter):
             # page setup section
             pagesfile.write("%%BeginPageSetup\n")
             pagesfile.write("/pgsave save def\n")
+            pagesfile.write_bytes(pagedefinitions)
 
             pagesfile.write("%%EndPageSetup\n")
-            pagesfile.write_bytes(pagefile.file.getvalue())
+            pagesfile.write_bytes(pagecontent)
             pagesfile.write("pgsave restore\n")
             pagesfile.write("showpage\n")
             pagesfile.write("%%PageTrailer\n")
@@ -259,10 +265,21 @@ class PSwriter(_PSwriter):
         #file.write("%%BeginSetup\n")
         #file.write("%%EndSetup\n")
 
-        file.write_bytes(pagesfile.file.getvalue())
+        file.write_bytes(pagesfile.getvalue())
 
         file.write("%%Trailer\n")
         file.write("%%EOF\n")
+        file.flush()
+
+
+def processpage(page, awriter):
+    """ process page and return its procedure definitions, content, bounding box, and the registry of used resources """
+    pagefile = writer.writer(io.BytesIO())
+    registry = PSregistry()
+    acontext = context()
+    pagebbox = bbox.empty()
+    page.processPS(pagefile, awriter, acontext, registry, pagebbox)
+    return b"".join(acontext.proceduredefinitions), pagefile.getvalue(), pagebbox, registry
 
 
 class context:
@@ -272,6 +289,10 @@ class context:
         self.colorspace = None
         self.selectedfont = None
         self.fillrule = 0
+        # procedures of canvases inserted several times and their definitions
+        # to be written at the beginning of the page (shared by all contexts)
+        self.procedures = {}
+        self.proceduredefinitions = []
 
     def __call__(self, **kwargs):
         newcontext = copy.copy(self)
@@ -32,6 +32,9 @@ class reader:
     def tell(self):
         return self.file.tell()
 
+    def seek(self, pos):
+        self.file.seek(pos)
+
     def eof(self):
         return self.file.eof()
 
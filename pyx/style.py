@@ -57,7 +57,7 @@ class linecap(attr.exclusiveattr, strokestyle):
         file.write("%d setlinecap\n" % self.value)
 
     def processPDF(self, file, writer, context, registry):
-        file.write("%d J\n" % self.value)
+        context.setgstate("linecap", "%d J\n" % self.value)
 
     def processSVGattrs(self, attrs, writer, context, registry):
         attrs["stroke-linecap"] = {0: "butt", 1: "round", 2: "square"}[self.value]
@@ -84,7 +84,7 @@ class linejoin(attr.exclusiveattr, strokestyle):
         file.write("%d setlinejoin\n" % self.value)
 
     def processPDF(self, file, writer, context, registry):
-        file.write("%d j\n" % self.value)
+        context.setgstate("linejoin", "%d j\n" % self.value)
 
     def processSVGattrs(self, attrs, writer, context, registry):
         attrs["stroke-linejoin"] = {0: "miter", 1: "round", 2: "bevel"}[self.value]
@@ -110,7 +110,8 @@ class miterlimit(attr.exclusiveattr, strokestyle):
         file.write("%f setmiterlimit\n" % self.value)
 
     def processPDF(self, file, writer, context, registry):
-        file.write("%f M\n" % self.value)
+        context.miterlimit = self.value
+        context.setgstate("miterlimit", "%f M\n" % self.value)
 
     def processSVGattrs(self, attrs, writer, context, registry):
         attrs["stroke-miterlimit"] = "%f" % self.value
@@ -157,7 +158,7 @@ class dash(attr.exclusiveattr, strokestyle):
             patternstring = " ".join(["%f" % (element * context.linewidth_pt/_defaultlinewidth_pt) for element in self.pattern])
         else:
             patternstring = " ".join(["%f" % element for element in self.pattern])
-        file.write("[%s] %f d\n" % (patternstring, self.offset))
+        context.setgstate("dash", "[%s] %f d\n" % (patternstring, self.offset))
 
     def processSVGattrs(self, attrs, writer, context, registry):
         if self.rellengths:
@@ -225,7 +226,7 @@ class linewidth(attr.sortbeforeexclusiveattr, strokestyle):
 
     def processPDF(self, file, writer, context, registry):
         context.linewidth_pt = unit.topt(self.width)
-        file.write("%f w\n" % context.linewidth_pt)
+        context.setgstate("linewidth", "%f w\n" % context.linewidth_pt)
 
     def processSVGattrs(self, attrs, writer, context, registry):
         context.linewidth_pt = unit.topt(self.width)
@@ -44,7 +44,7 @@ class SVGregistry:
            self.resourceslist.append(resource)
 
     def mergeregistry(self, registry):
-        for resource in registry.resources:
+        for resource in registry.resourceslist:
             self.add(resource)
 
     def output(self, xml, writer):
@@ -253,6 +253,8 @@ class context:
         self.fillopacity = 1
         self.strokeopacity = 1
         self.indent = 1
+        # groups of canvases inserted several times (shared by all contexts)
+        self.groups = {}
 
     def __call__(self, **kwargs):
         newcontext = copy.copy(self)
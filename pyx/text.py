@@ -19,11 +19,12 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
 
-import atexit, errno, functools, glob, inspect, io, itertools, logging, os
+import atexit, errno, functools, glob, hashlib, inspect, io, itertools, json, logging, os
 import queue, re, shutil, sys, tempfile, textwrap, threading
 
 from pyx import config, unit, box, baseclasses, trafo, version, attr, style, path, canvas
 from pyx import bbox as bboxmodule
+from pyx import writer as writermodule
 from pyx.dvi import dvifile
 
 logger = logging.getLogger("pyx")
@@ -858,6 +859,19 @@ class textextbox_pt(textbox_pt):
         self._dvicanvas = dvifile.readpage([ord("P"), ord("y"), ord("X"), page, 0, 0, 0, 0, 0, 0],
                                            fontmap=self.fontmap, singlecharmode=self.singlecharmode, attrs=[self.texttrafo] + self.fillstyles)
 
+    def setdvipage(self, items, markers):
+        """Set the DVI output from the items and markers of a DVI page read before.
+
+        :param items: canvas items of the DVI page
+        :type items: list of :class:`baseclasses.canvasitem`
+        :param dict markers: markers of the DVI page
+
+        """
+        self._dvicanvas = canvas.canvas([self.texttrafo] + self.fillstyles)
+        self._dvicanvas.markers = dict(markers)
+        for item in items:
+            self._dvicanvas.insert(item)
+
     @property
     def dvicanvas(self):
         if self._dvicanvas is None:
@@ -906,10 +920,83 @@ class textextbox_pt(textbox_pt):
         bbox += box.rect.bbox(self)
 
 
+def finishtextboxes(items):
+    """Read the output of the text boxes in advance.
+
+    :param items: canvas items to be searched for text boxes, including
+        the items of canvases and the ornaments of decorated paths
+    :type items: list of :class:`baseclasses.canvasitem`
+
+    This finishes the TeX interpreters of the text boxes, like it happens
+    when the text boxes are output. It is used before processing pages in
+    worker processes, where the TeX interpreters are not available.
+
+    """
+    # prevent cyclic imports
+    from . import deco
+    for item in items:
+        if isinstance(item, textextbox_pt):
+            item.dvicanvas
+        elif isinstance(item, canvas.canvas):
+            finishtextboxes(item.items)
+        elif isinstance(item, deco.decoratedpath):
+            finishtextboxes(item.ornaments.items)
+
+
 class _marker:
     pass
 
 
+class TypesetCache:
+
+    def __init__(self, dirname):
+        """Persistent cache of typesetting results.
+
+        :param str dirname: directory to store the cache entries in
+
+        The cache stores the extent and the DVI page of typeset expressions in
+        separate files named by a hash of the key. The key and the extent are
+        stored as a JSON line followed by the DVI page as a DVI file of its
+        own, which refers to the fonts by their names. Entries which cannot be
+        read are treated as missing and are overwritten.
+
+        """
+        self.dirname = dirname
+
+    def filename(self, key):
+        return os.path.join(self.dirname, "%s.pyxtext" % hashlib.sha256(repr(key).encode("utf-8", errors="surrogateescape")).hexdigest())
+
+    def get(self, key, singlecharmode=False):
+        """Return the stored (extent_pt, items, markers) for key or ``None``."""
+        filename = self.filename(key)
+        try:
+            with open(filename, "rb") as f:
+                header = json.loads(f.readline())
+                if header["key"] != json.loads(json.dumps(key)):
+                    return None
+                extent_pt = tuple(map(float, header["extent_pt"]))
+                page = dvifile.DVIfile(filename, data=f.read()).readpage(None, singlecharmode=singlecharmode)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable typeset cache entry: {}".format(e))
+            return None
+        return extent_pt, page.items, page.markers
+
+    def put(self, key, extent_pt, dvidata):
+        """Store the extent and the DVI file of a single page for key."""
+        data = json.dumps({"key": key, "extent_pt": list(extent_pt)}).encode("ascii") + b"\n" + dvidata
+        os.makedirs(self.dirname, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=self.dirname)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmpname, self.filename(key))
+        finally:
+            if os.path.exists(tmpname):
+                os.unlink(tmpname)
+
+
 class errordetail:
     "Constants defining the verbosity of the :exc:`TexResultError`."
     none = 0    #: Without any input and output.
@@ -937,6 +1024,7 @@ class Tee(object):
 
 # The tex engine state represents the next (or current) execute state.
 STATE_START, STATE_PREAMBLE, STATE_TYPESET, STATE_DONE = range(4)
+PyXPageOutPattern = re.compile(r"\[80\.121\.88\.(?P<page>\d+)\]")
 PyXBoxPattern = re.compile(r"PyXBox:page=(?P<page>\d+),lt=(?P<lt>-?\d*((\d\.?)|(\.?\d))\d*)pt,rt=(?P<rt>-?\d*((\d\.?)|(\.?\d))\d*)pt,ht=(?P<ht>-?\d*((\d\.?)|(\.?\d))\d*)pt,dp=(?P<dp>-?\d*((\d\.?)|(\.?\d))\d*)pt:")
 dvi_pattern = re.compile(r'Output written on .*texput\.dvi"? \((?P<page>\d+) pages?, \d+ bytes\)\.', re.DOTALL)
 
@@ -960,6 +1048,7 @@ class SingleEngine:
                        texenc="ascii",
                        usefiles=[],
                        texipc=config.getboolean("text", "texipc", 0),
+                       cachedir=config.get("text", "cachedir", None),
                        copyinput=None,
                        dvitype=False,
                        errordetail=errordetail.default,
@@ -984,6 +1073,9 @@ class SingleEngine:
             details)
         :type usefiles: list of str
         :param bool texipc: :ref:`texipc` flag.
+        :param cachedir: directory of a :ref:`typesetcache`, or ``None`` to
+            disable caching
+        :type cachedir: None or str
         :param copyinput: filename or file to be used to store a copy of all
             the input passed to the TeX interpreter
         :type copyinput: None or str or file
@@ -1007,6 +1099,10 @@ class SingleEngine:
         self.texenc = texenc
         self.usefiles = usefiles
         self.texipc = texipc
+        if cachedir:
+            self.cache = TypesetCache(cachedir)
+        else:
+            self.cache = None
         self.copyinput = copyinput
         self.dvitype = dvitype
         self.errordetail = errordetail
@@ -1022,6 +1118,10 @@ class SingleEngine:
         self.needdvitextboxes = [] # when texipc-mode off
         self.dvifile = None
 
+        self.preambles = [] # executed and pending preamble expressions
+        self.pendingpreambles = [] # preambles deferred until TeX is needed (when caching)
+        self.cacheboxes = {} # (key, extent_pt) by id of the box to be stored in the cache
+
     def _cleanup(self):
         """Clean-up TeX interpreter and tmp directory.
 
@@ -1061,7 +1161,10 @@ class SingleEngine:
     def _execute(self, expr, texmessages, oldstate, newstate):
         """Execute TeX expression.
 
-        :param str expr: expression to be passed to TeX
+        :param expr: expression to be passed to TeX; in typeset mode
+            (*oldstate* and *newstate* being ``STATE_TYPESET``) a list of
+            expressions to be typeset in separate boxes
+        :type expr: str or list of str
         :param texmessages: message parsers to analyse the textual output of
             TeX
         :type texmessages: list of :class:`texmessage` parsers
@@ -1069,24 +1172,30 @@ class SingleEngine:
             expression execution
         :param int newstate: state of the TeX interpreter after to the
             expression execution
+        :returns: in typeset mode, the list of extents of the boxes
 
         """
         assert STATE_PREAMBLE <= oldstate <= STATE_TYPESET
         assert oldstate == self.state
+        writermodule.checkworkerprocess("TeX interpreter")
         assert newstate >= oldstate
         if newstate == STATE_DONE:
             self.texoutput.expect(None)
             self.texinput.write(expr)
         else:
 
-            # test to encode expr early to not pile up expected results
-            # if the expression won't make it to the texinput at all
-            # (which would otherwise harm a proper cleanup)
-            expr.encode(self.texenc)
-
             if oldstate == newstate == STATE_TYPESET:
-                self.page += 1
-                expr = "\\ProcessPyXBox{%s%%\n}{%i}" % (expr, self.page)
+                # test to encode expr early to not pile up expected results
+                # if the expression won't make it to the texinput at all
+                # (which would otherwise harm a proper cleanup)
+                for boxexpr in expr:
+                    boxexpr.encode(self.texenc)
+                firstpage = self.page + 1
+                self.page += len(expr)
+                expr = "".join("\\ProcessPyXBox{%s%%\n}{%i}" % (boxexpr, page)
+                               for page, boxexpr in enumerate(expr, start=firstpage))
+            else:
+                expr.encode(self.texenc)
             self.executeid += 1
             self.texoutput.expect("PyXInputMarker:executeid=%i:" % self.executeid)
             expr += "%%\n\\PyXInput{%i}%%\n" % self.executeid
@@ -1106,15 +1215,32 @@ class SingleEngine:
                 if not m:
                     raise TexResultError("PyXInputMarker expected")
                 if oldstate == newstate == STATE_TYPESET:
-                    parsed, m = remove_pattern(PyXBoxPattern, parsed, ignore_nl=False)
-                    if not m:
+                    # parse all boxes in a single pass
+                    extents_pt = []
+                    remaining = []
+                    pos = 0
+                    for m in PyXBoxPattern.finditer(parsed):
+                        if m.group("page") != str(firstpage + len(extents_pt)):
+                            raise TexResultError("Wrong page number in PyXBox")
+                        extents_pt.append([float(x)*72/72.27 for x in m.group("lt", "rt", "ht", "dp")])
+                        remaining.append(parsed[pos:m.start()])
+                        pos = m.end()
+                    remaining.append(parsed[pos:])
+                    if len(extents_pt) != self.page - firstpage + 1:
                         raise TexResultError("PyXBox expected")
-                    if m.group("page") != str(self.page):
-                        raise TexResultError("Wrong page number in PyXBox")
-                    extent_pt = [float(x)*72/72.27 for x in m.group("lt", "rt", "ht", "dp")]
-                    parsed, m = remove_string("[80.121.88.%s]" % self.page, parsed)
-                    if not m:
+                    parsed = "".join(remaining)
+                    remaining = []
+                    pos = 0
+                    page = firstpage
+                    for m in PyXPageOutPattern.finditer(parsed):
+                        if m.group("page") == str(page):
+                            remaining.append(parsed[pos:m.start()])
+                            pos = m.end()
+                            page += 1
+                    remaining.append(parsed[pos:])
+                    if page != self.page + 1:
                         raise TexResultError("PyXPageOutMarker expected")
+                    parsed = "".join(remaining)
             else:
                 # check for "Output written on ...dvi (1 page, 220 bytes)."
                 if self.page:
@@ -1144,11 +1270,12 @@ class SingleEngine:
                 add("\nAfter parsing the return message from TeX, the following was left:\n{}".format(indent_text(parsed.rstrip())))
             raise e
         if oldstate == newstate == STATE_TYPESET:
-            return extent_pt
+            return extents_pt
 
     def do_start(self):
         """Setup environment and start TeX interpreter."""
         assert self.state == STATE_START
+        writermodule.checkworkerprocess("TeX interpreter")
 
         chroot = config.get("text", "chroot", "")
         if chroot:
@@ -1210,19 +1337,26 @@ class SingleEngine:
                       "\\def\\PyXMarker#1{\\hskip0pt\\special{PyX:marker #1}}%", # write PyXMarker special into the dvi-file
                       self.texmessages_start_default + self.texmessages_start, STATE_PREAMBLE, STATE_PREAMBLE)
 
+    def start(self):
+        """Start TeX interpreter and execute pending preambles."""
+        self.do_start()
+        for expr, texmessages in self.pendingpreambles:
+            self._execute(expr, texmessages, STATE_PREAMBLE, STATE_PREAMBLE)
+        self.pendingpreambles = []
+
     def do_preamble(self, expr, texmessages):
         """Ensure preamble mode and execute expr."""
         if self.state < STATE_PREAMBLE:
-            self.do_start()
+            self.start()
         self._execute(expr, texmessages, STATE_PREAMBLE, STATE_PREAMBLE)
 
-    def do_typeset(self, expr, texmessages):
-        """Ensure typeset mode and typeset expr."""
+    def do_typeset(self, exprs, texmessages):
+        """Ensure typeset mode and typeset exprs in a single execution."""
         if self.state < STATE_PREAMBLE:
-            self.do_start()
+            self.start()
         if self.state < STATE_TYPESET:
             self.go_typeset()
-        return self._execute(expr, texmessages, STATE_TYPESET, STATE_TYPESET)
+        return self._execute(exprs, texmessages, STATE_TYPESET, STATE_TYPESET)
 
     def do_finish(self, cleanup=True):
         """Teardown TeX interpreter and cleanup environment.
@@ -1231,6 +1365,7 @@ class SingleEngine:
         """
         if self.state == STATE_DONE:
             return
+        writermodule.checkworkerprocess("TeX interpreter")
         if self.state < STATE_TYPESET:
             self.go_typeset()
         self.go_finish()
@@ -1243,7 +1378,11 @@ class SingleEngine:
             self.dvifile = dvifile.DVIfile(dvifilename, debug=self.dvitype)
             page = 1
             for box in self.needdvitextboxes:
-                box.readdvipage(self.dvifile, page)
+                if box is None:
+                    self.skipdvipage(page)
+                else:
+                    box.readdvipage(self.dvifile, page)
+                    self.storecache(box)
                 page += 1
         if self.dvifile is not None and self.dvifile.readpage(None) is not None:
             raise ValueError("end of dvifile expected but further pages follow")
@@ -1266,7 +1405,27 @@ class SingleEngine:
 
         """
         texmessages = self.texmessages_preamble_default + self.texmessages_preamble + texmessages
-        self.do_preamble(expr, texmessages)
+        self.preambles.append(expr)
+        if self.cache is not None and self.state == STATE_START:
+            # do not start the TeX interpreter before it is needed
+            self.pendingpreambles.append((expr, texmessages))
+        else:
+            self.do_preamble(expr, texmessages)
+
+    def cacheid(self):
+        """Return data identifying the typesetting setup for the :ref:`typesetcache`."""
+        return [version.version, type(self).__name__, self.cmd, self.texenc, self.preambles]
+
+    def skipdvipage(self, page):
+        """Skip the DVI page of a text whose typesetting failed."""
+        self.dvifile.readpage([ord("P"), ord("y"), ord("X"), page, 0, 0, 0, 0, 0, 0])
+
+    def storecache(self, box):
+        """Store the DVI page just read for box in the cache, if requested."""
+        cacheentry = self.cacheboxes.pop(id(box), None)
+        if cacheentry is not None:
+            key, extent_pt = cacheentry
+            self.cache.put(key, extent_pt, self.dvifile.pagedvi())
 
     def text_pt(self, x_pt, y_pt, expr, textattrs=[], texmessages=[], fontmap=None, singlecharmode=False):
         """Typeset text.
@@ -1289,32 +1448,100 @@ class SingleEngine:
         :raises: :exc:`TexDoneError`: when the TeX interpreter has been
             terminated already.
 
+        """
+        return self.text_many_pt([(x_pt, y_pt, expr, textattrs)], texmessages=texmessages, fontmap=fontmap, singlecharmode=singlecharmode)[0]
+
+    def text_many_pt(self, texts, texmessages=[], fontmap=None, singlecharmode=False):
+        """Typeset several texts at once.
+
+        :param texts: texts to be typeset
+        :type texts: list of tuples (x_pt, y_pt, expr, textattrs) with the
+            meaning of the arguments of :meth:`text_pt`
+        :param texmessages: additional message parsers
+        :type texmessages: list of :class:`texmessage` parsers
+        :param fontmap: force a fontmap to be used (instead of the default
+            depending on the output format)
+        :type fontmap: None or fontmap
+        :param bool singlecharmode: position each character separately
+        :returns: text output insertable into a canvas for each text
+        :rtype: list of :class:`textextbox_pt`
+        :raises: :exc:`TexDoneError`: when the TeX interpreter has been
+            terminated already.
+
+        All texts are passed to the TeX interpreter in a single step, and the
+        interpreter output is analysed at once. This is much faster than
+        typesetting the texts one after the other. When an error occurs, the
+        texts are typeset one after the other, so that the error is reported
+        for the failing text only.
+
         """
         if self.state == STATE_DONE:
             raise TexDoneError("typesetting process was terminated already")
-        textattrs = attr.mergeattrs(textattrs) # perform cleans
-        attr.checkattrs(textattrs, [textattr, trafo.trafo_pt, style.fillstyle])
-        trafos = attr.getattrs(textattrs, [trafo.trafo_pt])
-        fillstyles = attr.getattrs(textattrs, [style.fillstyle])
-        textattrs = attr.getattrs(textattrs, [textattr])
-        if isinstance(expr, MultiEngineText):
-            expr = expr.tex
-        for ta in textattrs[::-1]:
-            expr = ta.apply(expr)
-        first = self.state < STATE_TYPESET
-        left_pt, right_pt, height_pt, depth_pt = self.do_typeset(expr, self.texmessages_run_default + self.texmessages_run + texmessages)
-        if self.texipc and first:
-            self.dvifile = dvifile.DVIfile(os.path.join(self.tmpdir, "texput.dvi"), debug=self.dvitype)
-        box = textextbox_pt(x_pt, y_pt, left_pt, right_pt, height_pt, depth_pt, self.do_finish, fontmap, singlecharmode, fillstyles)
-        for t in trafos:
-            box.reltransform(t) # TODO: should trafos really use reltransform???
-                                #       this is quite different from what we do elsewhere!!!
-                                #       see https://sourceforge.net/mailarchive/forum.php?thread_id=9137692&forum_id=23700
-        if self.texipc:
-            box.readdvipage(self.dvifile, self.page)
-        else:
-            self.needdvitextboxes.append(box)
-        return box
+        prepared = [] # tuples (x_pt, y_pt, expr, trafos, fillstyles, cachekey, cached)
+        for x_pt, y_pt, expr, textattrs in texts:
+            textattrs = attr.mergeattrs(textattrs) # perform cleans
+            attr.checkattrs(textattrs, [textattr, trafo.trafo_pt, style.fillstyle])
+            trafos = attr.getattrs(textattrs, [trafo.trafo_pt])
+            fillstyles = attr.getattrs(textattrs, [style.fillstyle])
+            textattrs = attr.getattrs(textattrs, [textattr])
+            if isinstance(expr, MultiEngineText):
+                expr = expr.tex
+            for ta in textattrs[::-1]:
+                expr = ta.apply(expr)
+            if self.cache is not None and fontmap is None:
+                # the key does not contain the fillstyles and trafos, which are applied to the DVI page
+                cachekey = self.cacheid() + [expr, singlecharmode]
+                cached = self.cache.get(cachekey, singlecharmode)
+            else:
+                cachekey = cached = None
+            prepared.append((x_pt, y_pt, expr, trafos, fillstyles, cachekey, cached))
+
+        exprs = [expr for x_pt, y_pt, expr, trafos, fillstyles, cachekey, cached in prepared if cached is None]
+        if exprs:
+            first = self.state < STATE_TYPESET
+            firstpage = self.page + 1
+            try:
+                extents_pt = iter(self.do_typeset(exprs, self.texmessages_run_default + self.texmessages_run + texmessages))
+            except TexResultError:
+                # skip the pages shipped out in spite of the error
+                if self.texipc:
+                    if self.dvifile is None and self.page >= firstpage:
+                        self.dvifile = dvifile.DVIfile(os.path.join(self.tmpdir, "texput.dvi"), debug=self.dvitype)
+                    for page in range(firstpage, self.page + 1):
+                        self.skipdvipage(page)
+                else:
+                    self.needdvitextboxes.extend([None]*(self.page - firstpage + 1))
+                if len(exprs) == 1 or self.page < firstpage:
+                    raise
+                return [box for text in texts for box in self.text_many_pt([text], texmessages=texmessages, fontmap=fontmap, singlecharmode=singlecharmode)]
+            if self.texipc and first:
+                self.dvifile = dvifile.DVIfile(os.path.join(self.tmpdir, "texput.dvi"), debug=self.dvitype)
+            page = self.page - len(exprs)
+
+        boxes = []
+        for x_pt, y_pt, expr, trafos, fillstyles, cachekey, cached in prepared:
+            if cached is not None:
+                extent_pt, items, markers = cached
+            else:
+                extent_pt = next(extents_pt)
+            box = textextbox_pt(x_pt, y_pt, *extent_pt, self.do_finish, fontmap, singlecharmode, fillstyles)
+            for t in trafos:
+                box.reltransform(t) # TODO: should trafos really use reltransform???
+                                    #       this is quite different from what we do elsewhere!!!
+                                    #       see https://sourceforge.net/mailarchive/forum.php?thread_id=9137692&forum_id=23700
+            if cached is not None:
+                box.setdvipage(items, markers)
+            else:
+                if cachekey is not None:
+                    self.cacheboxes[id(box)] = cachekey, extent_pt
+                page += 1
+                if self.texipc:
+                    box.readdvipage(self.dvifile, page)
+                    self.storecache(box)
+                else:
+                    self.needdvitextboxes.append(box)
+            boxes.append(box)
+        return boxes
 
     def text(self, x, y, *args, **kwargs):
         """Typeset text.
@@ -1330,6 +1557,18 @@ class SingleEngine:
         """
         return self.text_pt(unit.topt(x), unit.topt(y), *args, **kwargs)
 
+    def text_many(self, texts, *args, **kwargs):
+        """Typeset several texts at once.
+
+        This method is identical to :meth:`text_many_pt` with the only
+        difference of using PyX lengths to position the output.
+
+        :param texts: texts to be typeset
+        :type texts: list of tuples (x, y, expr, textattrs)
+
+        """
+        return self.text_many_pt([(unit.topt(x), unit.topt(y), expr, textattrs) for x, y, expr, textattrs in texts], *args, **kwargs)
+
 
 class SingleTexEngine(SingleEngine):
 
@@ -1367,12 +1606,16 @@ class SingleTexEngine(SingleEngine):
     def force_done(self):
         self.texinput.write("\n\\end\n")
 
+    def cacheid(self):
+        return super().cacheid() + [self.lfs]
+
     def do_start(self):
         super().do_start()
         if self.lfs:
-            if not self.lfs.endswith(".lfs"):
-                self.lfs = "%s.lfs" % self.lfs
-            with config.open(self.lfs, [config.format.pyx]) as lfsfile:
+            lfs = self.lfs
+            if not lfs.endswith(".lfs"):
+                lfs = "%s.lfs" % lfs
+            with config.open(lfs, [config.format.pyx]) as lfsfile:
                 lfsdef = lfsfile.read().decode("ascii")
             self._execute(lfsdef, [], STATE_PREAMBLE, STATE_PREAMBLE)
             self._execute("\\normalsize%\n", [], STATE_PREAMBLE, STATE_PREAMBLE)
@@ -1427,6 +1670,9 @@ class SingleLatexEngine(SingleEngine):
     def force_done(self):
         self.texinput.write("\n\\catcode`\\@11\\relax\\@@end\n")
 
+    def cacheid(self):
+        return super().cacheid() + [self.docclass, self.docopt, self.pyxgraphics]
+
     def do_start(self):
         super().do_start()
         if self.pyxgraphics:
@@ -1490,6 +1736,16 @@ class MultiEngine:
         "resembles :meth:`SingleEngine.text`"
         return self.instance.text(*args, **kwargs)
 
+    @reset_for_tex_done
+    def text_many_pt(self, *args, **kwargs):
+        "resembles :meth:`SingleEngine.text_many_pt`"
+        return self.instance.text_many_pt(*args, **kwargs)
+
+    @reset_for_tex_done
+    def text_many(self, *args, **kwargs):
+        "resembles :meth:`SingleEngine.text_many`"
+        return self.instance.text_many(*args, **kwargs)
+
     def reset(self, reinit=False):
         """Start a new :class:`SingleEngine` instance
 
@@ -1532,6 +1788,218 @@ class LatexEngine(MultiEngine):
         super().__init__(SingleLatexEngine, *args, **kwargs)
 
 
+class TexEnginePool:
+
+    def __init__(self, cls, *args, size=None, **kwargs):
+        """A pool of :class:`SingleEngine` instances for concurrent typesetting
+
+        :param cls: the class of the pooled instances
+        :type cls: :class:`SingleEngine` class
+        :param list args: args at class instantiation
+        :param size: number of instances (defaults to the number of CPUs)
+        :type size: int or None
+        :param dict kwargs: keyword args at at class instantiation
+
+        The pool provides the interface of a :class:`MultiEngine`, but its
+        methods can be called from several threads at once. Each call is
+        served by an idle instance. The instances are started in the
+        background, so that they are ready for typesetting when needed.
+        Instances terminated by the output of their text boxes are replaced
+        by new ones.
+
+        """
+        self.cls = cls
+        self.args = args
+        self.kwargs = kwargs
+        self.size = size or os.cpu_count() or 1
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.reset()
+
+    def _create(self, preambles):
+        """Create an instance and start its interpreter."""
+        instance = self.cls(*self.args, **self.kwargs)
+        instance.poollock = threading.Lock()
+        instance.poolpreambles = 0
+        for expr, texmessages in preambles:
+            instance.preamble(expr, texmessages)
+            instance.poolpreambles += 1
+        if instance.state == STATE_START:
+            instance.start()
+        return instance
+
+    def _start(self, generation):
+        """Create an instance in the background and add it to the idle list."""
+        with self.condition:
+            preambles = list(self.preambles)
+        try:
+            instance = self._create(preambles)
+        except Exception:
+            # errors will be raised by instances created on demand in _typeset
+            logger.debug("starting a pooled interpreter failed", exc_info=True)
+            instance = None
+        with self.condition:
+            if generation == self.generation:
+                if instance is None:
+                    self.count -= 1
+                else:
+                    self.idle.append(instance)
+                    instance = None
+                self.condition.notify()
+        if instance is not None:
+            # the pool was reset in the meantime
+            self._finishdiscarded([instance])
+
+    def _spawn(self):
+        # to be called with the condition being acquired
+        self.count += 1
+        threading.Thread(target=self._start, args=(self.generation,), daemon=True).start()
+
+    def _acquire(self, discarded):
+        """Get an idle instance or the permission to create a new one.
+
+        Returns a tuple of the instance (or ``None``), the generation, and the
+        list of preambles still to be executed. Instances removed from the
+        pool are appended to discarded to be finished by the caller.
+
+        """
+        with self.condition:
+            while True:
+                while self.idle:
+                    instance = self.idle.pop()
+                    if instance.state != STATE_DONE and (instance.state < STATE_TYPESET or
+                                                         instance.poolpreambles == len(self.preambles)):
+                        return instance, self.generation, self.preambles[instance.poolpreambles:]
+                    # replace an instance finished by its text boxes or
+                    # not able to execute further preambles anymore
+                    discarded.append(instance)
+                    self.count -= 1
+                    self._spawn()
+                if self.count < self.size:
+                    self.count += 1
+                    return None, self.generation, list(self.preambles)
+                self.condition.wait()
+
+    def _release(self, instance, generation):
+        """Return the instance to the pool, unless the pool was reset.
+
+        Returns whether the instance was returned.
+
+        """
+        with self.condition:
+            if generation == self.generation:
+                self.idle.append(instance)
+                self.condition.notify()
+                return True
+            return False
+
+    def _discard(self, generation):
+        with self.condition:
+            if generation == self.generation:
+                self.count -= 1
+                self.condition.notify()
+
+    def _finish(self, instance):
+        with instance.poollock:
+            instance.do_finish()
+
+    def _finishdiscarded(self, instances):
+        """Finish instances removed from the pool.
+
+        This terminates their interpreters and removes their temporary
+        directories. Text boxes of the instances get their output as well.
+
+        """
+        for instance in instances:
+            if STATE_START < instance.state < STATE_DONE:
+                try:
+                    self._finish(instance)
+                except Exception:
+                    # errors are raised again when the text boxes are output
+                    logger.debug("finishing a discarded pooled interpreter failed", exc_info=True)
+
+    def _typeset(self, method, *args, **kwargs):
+        discarded = []
+        instance, generation, preambles = self._acquire(discarded)
+        self._finishdiscarded(discarded)
+        if instance is None:
+            try:
+                instance = self._create(preambles)
+            except:
+                self._discard(generation)
+                raise
+            preambles = []
+        released = True
+        with instance.poollock:
+            done = instance.state == STATE_DONE
+            if not done:
+                try:
+                    for expr, texmessages in preambles:
+                        instance.preamble(expr, texmessages)
+                        instance.poolpreambles += 1
+                    result = getattr(instance, method)(*args, **kwargs)
+                    # the text boxes must not finish the instance while it is
+                    # in use, which is ensured before it becomes available again
+                    for box in result if isinstance(result, list) else [result]:
+                        box.do_finish = functools.partial(self._finish, instance)
+                finally:
+                    released = self._release(instance, generation)
+        if not released:
+            # the pool was reset in the meantime
+            self._finishdiscarded([instance])
+        if done:
+            # finished by one of its text boxes in the meantime
+            self._discard(generation)
+            return self._typeset(method, *args, **kwargs)
+        return result
+
+    def preamble(self, expr, texmessages=[]):
+        """Execute a preamble.
+
+        The preamble is executed by all instances prior to their next
+        typesetting. Instances, which have created text output already, are
+        replaced by new ones.
+
+        """
+        with self.condition:
+            self.preambles.append((expr, texmessages))
+
+    def text_pt(self, *args, **kwargs):
+        "resembles :meth:`SingleEngine.text_pt`"
+        return self._typeset("text_pt", *args, **kwargs)
+
+    def text(self, *args, **kwargs):
+        "resembles :meth:`SingleEngine.text`"
+        return self._typeset("text", *args, **kwargs)
+
+    def text_many_pt(self, *args, **kwargs):
+        "resembles :meth:`SingleEngine.text_many_pt`"
+        return self._typeset("text_many_pt", *args, **kwargs)
+
+    def text_many(self, *args, **kwargs):
+        "resembles :meth:`SingleEngine.text_many`"
+        return self._typeset("text_many", *args, **kwargs)
+
+    def reset(self):
+        """Replace all instances by new ones
+
+        The :meth:`preamble` calls are forgotten. Instances in use by other
+        threads are not returned to the pool anymore. All instances are
+        finished when they are removed from the pool.
+
+        """
+        with self.condition:
+            self.generation += 1
+            self.preambles = []
+            discarded = getattr(self, "idle", [])
+            self.idle = []
+            self.count = 0
+            for i in range(self.size):
+                self._spawn()
+            self.condition.notify_all()
+        self._finishdiscarded(discarded)
+
+
 from pyx import deco
 from pyx.font import T1font
 from pyx.font.t1file import T1File
@@ -1761,6 +2229,24 @@ class UnicodeEngine:
     def text(self, x, y, *args, **kwargs):
         return self.text_pt(unit.topt(x), unit.topt(y), *args, **kwargs)
 
+    def text_many_pt(self, texts, *args, **kwargs):
+        return [self.text_pt(x_pt, y_pt, text, textattrs, *args, **kwargs) for x_pt, y_pt, text, textattrs in texts]
+
+    def text_many(self, texts, *args, **kwargs):
+        return [self.text(x, y, text, textattrs, *args, **kwargs) for x, y, text, textattrs in texts]
+
+
+def typeset_many_pt(engine, texts):
+    """typeset texts by the text_many_pt method of engine
+
+    Engines not providing text_many_pt (like custom engines implementing
+    text_pt only) typeset the texts one by one."""
+    try:
+        text_many_pt = engine.text_many_pt
+    except AttributeError:
+        return [engine.text_pt(x_pt, y_pt, expr, textattrs) for x_pt, y_pt, expr, textattrs in texts]
+    return text_many_pt(texts)
+
 
 # from pyx.font.otffile import OpenTypeFont
 # 
@@ -49,6 +49,21 @@ def _mmatrix(angle):
 
 # trafo: affine transformations
 
+class TrafoException(Exception): pass
+
+def _trafo_pt(m00, m01, m10, m11, v0, v1):
+    """return trafo_pt with given matrix elements and vector components"""
+    result = trafo_pt.__new__(trafo_pt)
+    result._m00 = m00
+    result._m01 = m01
+    result._m10 = m10
+    result._m11 = m11
+    result._v0 = v0
+    result._v1 = v1
+    result._inverse = None
+    return result
+
+
 class trafo_pt(baseclasses.deformer):
 
     """affine transformation (coordinates in constructor in pts)
@@ -57,66 +72,90 @@ class trafo_pt(baseclasses.deformer):
     pts (which is useful for internal purposes), all other
     methods only accept units in the standard user notation.
 
+    The matrix elements and vector components are stored as separate
+    attributes. Trafos are not modified after their construction, which
+    allows for caching the inverse and for returning a trafo itself
+    when it is multiplied by the identity.
+
     """
 
+    __slots__ = "_m00", "_m01", "_m10", "_m11", "_v0", "_v1", "_inverse"
+
     def __init__(self, matrix=((1, 0), (0, 1)), vector=(0, 0)):
         """Return trafo with given transformation matrix and vector.
         """
-        self.matrix = matrix
-        self.vector = vector
+        (self._m00, self._m01), (self._m10, self._m11) = matrix
+        self._v0, self._v1 = vector
+        self._inverse = None
+
+    @property
+    def matrix(self):
+        return (self._m00, self._m01), (self._m10, self._m11)
+
+    @property
+    def vector(self):
+        return self._v0, self._v1
 
     def __mul__(self, other):
         if isinstance(other, trafo_pt):
-            matrix = ( ( self.matrix[0][0]*other.matrix[0][0] +
-                         self.matrix[0][1]*other.matrix[1][0],
-                         self.matrix[0][0]*other.matrix[0][1] +
-                         self.matrix[0][1]*other.matrix[1][1] ),
-                       ( self.matrix[1][0]*other.matrix[0][0] +
-                         self.matrix[1][1]*other.matrix[1][0],
-                         self.matrix[1][0]*other.matrix[0][1] +
-                         self.matrix[1][1]*other.matrix[1][1] )
-                     )
-
-            vector = ( self.matrix[0][0]*other.vector[0] +
-                       self.matrix[0][1]*other.vector[1] +
-                       self.vector[0],
-                       self.matrix[1][0]*other.vector[0] +
-                       self.matrix[1][1]*other.vector[1] +
-                       self.vector[1] )
-
-            return trafo_pt(matrix=matrix, vector=vector)
+            if other is identity:
+                return self
+            if self is identity:
+                return other
+            return _trafo_pt(self._m00*other._m00 + self._m01*other._m10,
+                             self._m00*other._m01 + self._m01*other._m11,
+                             self._m10*other._m00 + self._m11*other._m10,
+                             self._m10*other._m01 + self._m11*other._m11,
+                             self._m00*other._v0 + self._m01*other._v1 + self._v0,
+                             self._m10*other._v0 + self._m11*other._v1 + self._v1)
         else:
             raise NotImplementedError("can only multiply two transformations")
 
     def __str__(self):
         return "[%f %f %f %f %f %f]" % \
-               ( self.matrix[0][0], self.matrix[1][0],
-                 self.matrix[0][1], self.matrix[1][1],
-                 self.vector[0], self.vector[1] )
+               ( self._m00, self._m10, self._m01, self._m11, self._v0, self._v1 )
+
+    def _istranslation(self):
+        return self._m00 == 1 and self._m01 == 0 and self._m10 == 0 and self._m11 == 1
 
     def processPS(self, file, writer, context, registry):
-        file.write("[%f %f %f %f %f %f] concat\n" % \
-                    ( self.matrix[0][0], self.matrix[1][0],
-                      self.matrix[0][1], self.matrix[1][1],
-                      self.vector[0], self.vector[1] ) )
+        if self._istranslation():
+            file.write("%f %f translate\n" % (self._v0, self._v1))
+        else:
+            file.write("[%f %f %f %f %f %f] concat\n" % \
+                        ( self._m00, self._m10, self._m01, self._m11, self._v0, self._v1 ) )
 
     def processPDF(self, file, writer, context, registry):
         file.write("%f %f %f %f %f %f cm\n" % \
-                    ( self.matrix[0][0], self.matrix[1][0],
-                      self.matrix[0][1], self.matrix[1][1],
-                      self.vector[0], self.vector[1] ) )
+                    ( self._m00, self._m10, self._m01, self._m11, self._v0, self._v1 ) )
 
     def processSVGattrs(self, attrs, writer, context, registry):
         assert "transform" not in attrs
-        attrs["transform"] = "matrix(%f,%f,%f,%f,%f,%f)" % \
-                    ( self.matrix[0][0], -self.matrix[1][0],
-                      -self.matrix[0][1], self.matrix[1][1],
-                      self.vector[0], -self.vector[1] )
+        if self._istranslation():
+            attrs["transform"] = "translate(%f,%f)" % (self._v0, -self._v1)
+        else:
+            attrs["transform"] = "matrix(%f,%f,%f,%f,%f,%f)" % \
+                        ( self._m00, -self._m10, -self._m01, self._m11, self._v0, -self._v1 )
 
     def apply_pt(self, x_pt, y_pt):
         """apply transformation to point (x_pt, y_pt) in pts"""
-        return ( self.matrix[0][0]*x_pt + self.matrix[0][1]*y_pt + self.vector[0],
-                 self.matrix[1][0]*x_pt + self.matrix[1][1]*y_pt + self.vector[1] )
+        return ( self._m00*x_pt + self._m01*y_pt + self._v0,
+                 self._m10*x_pt + self._m11*y_pt + self._v1 )
+
+    def apply_pt_many(self, points_pt):
+        """apply transformation to a sequence of points in pts
+
+        The points are given by a flat sequence of coordinates x0_pt, y0_pt,
+        x1_pt, y1_pt, ... (like an array.array). A list of the transformed
+        coordinates in the same layout is returned.
+        """
+        m00, m01, m10, m11, v0, v1 = self._m00, self._m01, self._m10, self._m11, self._v0, self._v1
+        xs_pt = points_pt[0::2]
+        ys_pt = points_pt[1::2]
+        result = [None] * (2*len(xs_pt))
+        result[0::2] = [m00*x_pt + m01*y_pt + v0 for x_pt, y_pt in zip(xs_pt, ys_pt)]
+        result[1::2] = [m10*x_pt + m11*y_pt + v1 for x_pt, y_pt in zip(xs_pt, ys_pt)]
+        return result
 
     def apply(self, x, y):
         # for the transformation we have to convert to points
@@ -127,26 +166,60 @@ class trafo_pt(baseclasses.deformer):
         return path.transformed(self)
 
     def inverse(self):
-        det = 1.0*(self.matrix[0][0]*self.matrix[1][1] - self.matrix[0][1]*self.matrix[1][0])
-        matrix = ( ( self.matrix[1][1]/det, -self.matrix[0][1]/det),
-                   (-self.matrix[1][0]/det,  self.matrix[0][0]/det) )
-        return ( trafo_pt(matrix=matrix) *
-                 trafo_pt(vector=(-self.vector[0], -self.vector[1])) )
+        if self._inverse is None:
+            det = 1.0*(self._m00*self._m11 - self._m01*self._m10)
+            m00 = self._m11/det
+            m01 = -self._m01/det
+            m10 = -self._m10/det
+            m11 = self._m00/det
+            self._inverse = _trafo_pt(m00, m01, m10, m11,
+                                      -m00*self._v0 - m01*self._v1,
+                                      -m10*self._v0 - m11*self._v1)
+            self._inverse._inverse = self
+        return self._inverse
 
     def mirrored(self, angle):
         return mirror(angle) * self
 
     def rotated_pt(self, angle, x=None, y=None):
-        return rotate_pt(angle, x, y) * self
+        phi = math.pi*angle/180.0
+        c = math.cos(phi)
+        s = math.sin(phi)
+        v0 = c*self._v0 - s*self._v1
+        v1 = s*self._v0 + c*self._v1
+        if x is not None or y is not None:
+            if x is None or y is None:
+                raise TrafoException("either specify both x and y or none of them")
+            v0 += (1-c)*x + s*y
+            v1 += -s*x + (1-c)*y
+        return _trafo_pt(c*self._m00 - s*self._m10, c*self._m01 - s*self._m11,
+                         s*self._m00 + c*self._m10, s*self._m01 + c*self._m11, v0, v1)
 
     def rotated(self, angle, x=None, y=None):
-        return rotate(angle, x, y) * self
+        if x is not None:
+            x = unit.topt(x)
+        if y is not None:
+            y = unit.topt(y)
+        return self.rotated_pt(angle, x, y)
 
     def scaled_pt(self, sx, sy=None, x=None, y=None):
-        return scale_pt(sx, sy, x, y) * self
+        if sy is None:
+            sy = sx
+        v0 = sx*self._v0
+        v1 = sy*self._v1
+        if x is not None or y is not None:
+            if x is None or y is None:
+                raise TrafoException("either specify both x and y or none of them")
+            v0 += (1-sx)*x
+            v1 += (1-sy)*y
+        return _trafo_pt(sx*self._m00, sx*self._m01, sy*self._m10, sy*self._m11, v0, v1)
 
     def scaled(self, sx, sy=None, x=None, y=None):
-        return scale(sx, sy, x, y) * self
+        if x is not None:
+            x = unit.topt(x)
+        if y is not None:
+            y = unit.topt(y)
+        return self.scaled_pt(sx, sy, x, y)
 
     def slanted_pt(self, a, angle=0, x=None, y=None):
         return slant_pt(a, angle, x, y) * self
@@ -155,16 +228,18 @@ class trafo_pt(baseclasses.deformer):
         return slant(a, angle, x, y) * self
 
     def translated_pt(self, x, y):
-        return translate_pt(x, y) * self
+        return _trafo_pt(self._m00, self._m01, self._m10, self._m11, self._v0 + x, self._v1 + y)
 
     def translated(self, x, y):
-        return translate(x, y) * self
+        return self.translated_pt(unit.topt(x), unit.topt(y))
 
 
 class trafo(trafo_pt):
 
     """affine transformation"""
 
+    __slots__ = ()
+
     def __init__(self, matrix=((1,0), (0,1)), vector=(0, 0)):
         trafo_pt.__init__(self,
                           matrix, (unit.topt(vector[0]), unit.topt(vector[1])))
@@ -176,11 +251,17 @@ class trafo(trafo_pt):
 identity = trafo()
 
 class mirror(trafo):
+
+    __slots__ = ()
+
     def __init__(self, angle=0):
         trafo.__init__(self, matrix=_mmatrix(angle))
 
 
 class rotate_pt(trafo_pt):
+
+    __slots__ = ()
+
     def __init__(self, angle, x=None, y=None):
         vector = 0, 0
         if x is not None or y is not None:
@@ -192,6 +273,9 @@ class rotate_pt(trafo_pt):
 
 
 class rotate(trafo_pt):
+
+    __slots__ = ()
+
     def __init__(self, angle, x=None, y=None):
         vector = 0, 0 
         if x is not None or y is not None:
@@ -203,6 +287,9 @@ class rotate(trafo_pt):
 
 
 class scale_pt(trafo_pt):
+
+    __slots__ = ()
+
     def __init__(self, sx, sy=None, x=None, y=None):
         if sy is None:
             sy = sx
@@ -215,6 +302,9 @@ class scale_pt(trafo_pt):
 
 
 class scale(trafo):
+
+    __slots__ = ()
+
     def __init__(self, sx, sy=None, x=None, y=None):
         if sy is None:
             sy = sx
@@ -227,6 +317,9 @@ class scale(trafo):
 
 
 class slant_pt(trafo_pt):
+
+    __slots__ = ()
+
     def __init__(self, a, angle=0, x=None, y=None):
         t = ( rotate_pt(-angle, x, y) *
               trafo(matrix=((1, a), (0, 1))) *
@@ -235,6 +328,9 @@ class slant_pt(trafo_pt):
 
 
 class slant(trafo):
+
+    __slots__ = ()
+
     def __init__(self, a, angle=0, x=None, y=None):
         t = ( rotate(-angle, x, y) *
               trafo(matrix=((1, a), (0, 1))) *
@@ -243,10 +339,16 @@ class slant(trafo):
 
 
 class translate_pt(trafo_pt):
+
+    __slots__ = ()
+
     def __init__(self, x, y):
         trafo_pt.__init__(self, vector=(x, y))
 
 
 class translate(trafo):
+
+    __slots__ = ()
+
     def __init__(self, x, y):
         trafo.__init__(self, vector=(x, y))
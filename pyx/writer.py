@@ -20,24 +20,148 @@
 # along with PyX; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
+import collections, logging, multiprocessing, pickle
+
+logger = logging.getLogger("pyx")
+
+
 class writer:
 
-    def __init__(self, file, encoding="ascii", errors="surrogateescape"):
+    """wrapper of a binary file for writing strings
+
+    The strings are collected and encoded and written to the file in chunks
+    of about bufsize characters, since content streams consist of many small
+    strings. The buffer is flushed before bytes are written and before the
+    position in the file is queried. Call flush after the last write.
+    """
+
+    def __init__(self, file, encoding="ascii", errors="surrogateescape", bufsize=65536):
         self.file = file
         self.encoding = encoding
         self.errors = errors
+        self.bufsize = bufsize
+        self.buffer = []
+        self.buffered = 0
 
     def write(self, s):
-        self.file.write(s.encode(self.encoding, errors=self.errors))
+        self.buffer.append(s)
+        self.buffered += len(s)
+        if self.buffered >= self.bufsize:
+            self.flush()
 
     def write_bytes(self, b):
+        self.flush()
         self.file.write(b)
 
+    def flush(self):
+        """write the buffered strings to the file"""
+        if self.buffer:
+            self.file.write("".join(self.buffer).encode(self.encoding, errors=self.errors))
+            self.buffer = []
+            self.buffered = 0
+
     def tell(self):
+        self.flush()
         return self.file.tell()
 
+    def getvalue(self):
+        """return the content of the file (an io.BytesIO instance)"""
+        self.flush()
+        return self.file.getvalue()
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
         return self.file.__exit__(exc_type, exc_value, traceback)
+
+
+class WorkerProcessError(Exception):
+
+    """operation not available in a worker process of processpages"""
+
+
+# pages and page processing function of the running processpages call,
+# shared with the worker processes by forking
+_pages = None
+_processpage = None
+_inworker = False
+_workerpageno = None
+
+def checkworkerprocess(operation):
+    """raise WorkerProcessError when called within a worker process
+
+    Operations, which are bound to the state of the parent process (like
+    communicating with a running TeX interpreter), must call this function to
+    move the processing of the page back to the parent process.
+    """
+    if _inworker:
+        raise WorkerProcessError("%s not available in a worker process" % operation)
+
+def workerpageno():
+    """return the number of the page processed in a worker process or None
+
+    State shared by all pages (like font encodings) is not transferred back to
+    the parent process. Pages processed in a worker process need to keep such
+    state for themselves, using the page number to create unique names.
+    """
+    return _workerpageno
+
+def _initworker():
+    global _inworker
+    _inworker = True
+
+def _processpageinworker(pageno):
+    global _workerpageno
+    _workerpageno = pageno
+    try:
+        return pickle.dumps(_processpage(_pages[pageno]))
+    except Exception:
+        # the page is processed in the parent process again, which also
+        # reports errors in the page processing itself
+        logger.debug("processing page %i in a worker process failed" % pageno, exc_info=True)
+        return None
+    finally:
+        _workerpageno = None
+
+def processpages(pages, processpage, workers=None):
+    """process pages and yield the results of processpage(page) in page order
+
+    For workers larger than one, the pages are processed by the given number
+    of forked worker processes. The results are transferred back to the parent
+    process by pickling. Pages, which cannot be processed in a worker process
+    (see checkworkerprocess) or whose result cannot be pickled, are processed
+    in the parent process in page order, while the worker processes continue
+    with the following pages. Those pages do not depend on state changed in
+    the parent process, as operations changing it are not available in the
+    worker processes. At most twice the number of workers pages are processed
+    ahead of the page yielded, so that their results are not accumulated in
+    memory.
+    """
+    global _pages, _processpage
+    if workers is not None and workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning("processing pages in worker processes requires the fork start method, disabling workers")
+        workers = None
+    if workers is None or workers < 2 or len(pages) < 2 or _inworker:
+        for page in pages:
+            yield processpage(page)
+        return
+    context = multiprocessing.get_context("fork")
+    try:
+        _pages = pages
+        _processpage = processpage
+        workers = min(workers, len(pages))
+        with context.Pool(workers, initializer=_initworker) as pool:
+            results = collections.deque()
+            for pageno in range(len(pages)):
+                for nextpageno in range(pageno + len(results), min(pageno + 2*workers, len(pages))):
+                    results.append(pool.apply_async(_processpageinworker, (nextpageno,)))
+                result = results.popleft().get()
+                if result is None:
+                    yield processpage(pages[pageno])
+                else:
+                    yield pickle.loads(result)
+    finally:
+        _pages = None
+        _processpage = None
@@ -15,9 +15,13 @@ pykpathsea_ext_module = Extension("pyx.pykpathsea",
                                   libraries=["kpathsea"])
 t1code_ext_module = Extension("pyx.font._t1code",
                               sources=["pyx/font/_t1code.c"])
+normpathcode_ext_module = Extension("pyx._normpathcode",
+                                    sources=["pyx/_normpathcode.c"])
 if cfg.has_option("PyX", "build_pykpathsea") and cfg.getboolean("PyX", "build_pykpathsea"):
     ext_modules.append(pykpathsea_ext_module)
 if cfg.has_option("PyX", "build_t1code") and cfg.getboolean("PyX", "build_t1code"):
     ext_modules.append(t1code_ext_module)
+if cfg.has_option("PyX", "build_normpathcode") and cfg.getboolean("PyX", "build_normpathcode"):
+    ext_modules.append(normpathcode_ext_module)
 
 setup(ext_modules=ext_modules)
@@ -0,0 +1,104 @@
+import sys
+if sys.path[0] != "../..":
+    sys.path.insert(0, "../..")
+
+import io, math, re, unittest
+
+from pyx import *
+
+class CanvasTestCase(unittest.TestCase):
+
+    def reusedcanvas(self, *attrs):
+        c = canvas.canvas()
+        sc = canvas.canvas()
+        sc.stroke(path.circle(0, 0, 1), attrs)
+        for i in range(3):
+            c.insert(sc, [trafo.translate(i, 0)])
+        return c
+
+    def testReusePDF(self):
+        f = io.BytesIO()
+        self.reusedcanvas().writePDFfile(f, write_compress=False)
+        content = f.getvalue().decode("latin-1")
+        self.assertEqual(content.count("/Subtype /Form"), 1)
+        self.assertEqual(content.count(" Do\n"), 3)
+        self.assertEqual(content.count("\nS\n"), 1)
+
+    def testReusePDFBBox(self):
+        # a sharp miter join of a thick line extends far beyond the path
+        sc = canvas.canvas()
+        sc.stroke(path.path(path.moveto_pt(0, 0), path.lineto_pt(10, 0.5), path.lineto_pt(0, 1)),
+                  [style.linewidth(5*unit.t_pt), style.miterlimit(100)])
+        tip_pt = 10 + 2.5 / math.sin(math.atan2(0.5, 10))
+        c = canvas.canvas()
+        for i in range(3):
+            c.insert(sc, [trafo.translate(i, 0)])
+        for scale in [1, 0.1, 10]:
+            outer = canvas.canvas()
+            outer.insert(c, [trafo.scale(scale)])
+            f = io.BytesIO()
+            outer.writePDFfile(f, write_compress=False)
+            llx, lly, urx, ury = map(float, re.search(r"/Subtype /Form\n/BBox \[(.*?)\]", f.getvalue().decode("latin-1")).group(1).split())
+            self.assertGreaterEqual(urx, tip_pt)
+            # the bound by the miterlimit
+            self.assertLessEqual(urx, 10 + 2.5*100 + 2.5 + 1e-3)
+
+    def testReusePS(self):
+        f = io.BytesIO()
+        self.reusedcanvas().writeEPSfile(f)
+        content = f.getvalue().decode("latin-1")
+        self.assertEqual(content.count(" arc\n"), 1)
+        self.assertEqual(content.count(" canvas1\n"), 3)
+
+    def testReusePSSmallBody(self):
+        c = canvas.canvas()
+        sc = canvas.canvas()
+        sc.stroke(path.path())
+        for i in range(3):
+            c.insert(sc)
+        f = io.BytesIO()
+        c.writeEPSfile(f)
+        content = f.getvalue().decode("latin-1")
+        # the body is smaller than a procedure call
+        self.assertNotIn("canvas1", content)
+        self.assertEqual(content.count("\nstroke\n"), 3)
+
+    def testReuseSVG(self):
+        f = io.BytesIO()
+        self.reusedcanvas().writeSVGfile(f)
+        content = f.getvalue().decode("utf-8")
+        self.assertEqual(content.count("<path "), 1)
+        self.assertEqual(content.count("<use "), 3)
+
+    def testReuseNested(self):
+        c = canvas.canvas()
+        sc = canvas.canvas()
+        sc.insert(self.reusedcanvas())
+        sc.insert(self.reusedcanvas(), [trafo.translate(0, 3)])
+        c.insert(sc)
+        c.insert(sc, [trafo.translate(10, 0)])
+        f = io.BytesIO()
+        c.writePDFfile(f, write_compress=False)
+        content = f.getvalue().decode("latin-1")
+        names = re.findall(r"/(canvas\d+) \d+ 0 R", content)
+        self.assertEqual(len(names), 3)
+        self.assertEqual(len(set(names)), 3)
+
+    def testReuseStable(self):
+        for method in ["writePDFfile", "writeEPSfile", "writeSVGfile"]:
+            outputs = []
+            for i in range(2):
+                f = io.BytesIO()
+                getattr(self.reusedcanvas(), method)(f)
+                outputs.append(re.sub(rb"CreationDate.*\n", b"", f.getvalue()))
+            self.assertEqual(outputs[0], outputs[1])
+
+    def testNoReusePattern(self):
+        f = io.BytesIO()
+        self.reusedcanvas(deco.filled([pattern.hatched45])).writePDFfile(f, write_compress=False)
+        content = f.getvalue().decode("latin-1")
+        self.assertEqual(content.count("/Subtype /Form"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,8 @@ if sys.path[0] != "../..":
 
 import unittest
 
-import io
+import io, math, os, re, tempfile
+from pyx import config, graph
 from pyx.graph import data
 
 class DataTestCase(unittest.TestCase):
@@ -49,6 +50,33 @@ class DataTestCase(unittest.TestCase):
         self.assertAlmostEqual(mydata2.columns["d"][0], 1.0)
         self.assertAlmostEqual(mydata2.columns["d"][1], 4.0)
 
+        # failing rows result in None, columns hide the context
+        mydata = data.points([[1, 0], [2, 1]], a=1, b=2)
+        mydata2 = data.data(mydata, c="a/b", d="sqrt(b-c)", e="$1+b", context={"b": 5, "c": 1})
+        self.assertEqual(mydata2.columns["c"], [None, 2.0])
+        self.assertEqual(mydata2.columns["d"], [None, 0.0])
+        self.assertEqual(mydata2.columns["e"], [1, 3])
+        self.assertRaises(TypeError, data.data, mydata, c="a+None")
+
+    def testFunction(self):
+        g = graph.graphxy(width=8, x=graph.axis.lin(), y=graph.axis.log())
+        context = {"a": 2}
+        mydata = data.function("y(x) = a*log(x)", min=-1, max=1, points=5, context=context)
+        context["a"] = 3
+        columns = mydata.dynamiccolumns(g, {})
+        self.assertEqual(columns["x"], [-1, -0.5, 0, 0.5, 1])
+        self.assertEqual(columns["y"][:3], [None, None, None])
+        self.assertAlmostEqual(columns["y"][3], 2*math.log(0.5))
+        self.assertEqual(columns["y"][4], 0)
+        # the context of the instance is evaluated late
+        mydata.context["a"] = 4
+        self.assertAlmostEqual(mydata.dynamiccolumns(g, {})["y"][3], 4*math.log(0.5))
+        mydata = data.function("y(t) = t", min=1, max=100, points=3)
+        for y, expected in zip(mydata.dynamiccolumns(g, {"t": "y"})["y"], [1, 10, 100]):
+            self.assertAlmostEqual(y, expected)
+        self.assertRaises(ValueError, data.function, "y(x) = x", context={"x": 1})
+        self.assertRaises(SyntaxError, data.function, "y(x) = x +")
+
     def testFile(self):
         testfile = io.StringIO("""#a
 0
@@ -80,6 +108,78 @@ class DataTestCase(unittest.TestCase):
         self.assertEqual(mydata.columns["row"], [4, 6, 8])
         self.assertEqual(mydata.title, "title")
 
+    def testFileMemorymap(self):
+        with tempfile.TemporaryFile() as testfile:
+            testfile.write(b"""# a b
+0 1
+# comment
+1 eins
+2
+
+3 3
+4 4
+5 5
+6 6""")
+            testfile.flush()
+            testfile.seek(0)
+            mydata = data.file(testfile, memorymap=1, row=0, c="2*a")
+            self.assertEqual(list(mydata.columns["row"]), [1, 2, 3, 4, 5, 6, 7])
+            self.assertEqual(list(mydata.columns["a"]), [0, 1, 2, 3, 4, 5, 6])
+            self.assertEqual(mydata.columns["b"], [1, "eins", None, 3, 4, 5, 6])
+            self.assertEqual(mydata.columns["c"], [0, 2, 4, 6, 8, 10, 12])
+            testfile.seek(0)
+            mydata = data.file(testfile, memorymap=1, skiphead=2, skiptail=2, every=2, row=0, b=2)
+            self.assertEqual(list(mydata.columns["row"]), [3, 5])
+            self.assertEqual(list(mydata.columns["b"]), [None, 4])
+        with tempfile.TemporaryFile() as testfile:
+            self.assertEqual(data.file(testfile, memorymap=1).columnnames, [])
+            testfile.write(b'1 "a b" 2\n3 "c" 4\n')
+            testfile.flush()
+            testfile.seek(0)
+            mydata = data.file(testfile, memorymap=1, a=1, b=2, c=3)
+            self.assertEqual(mydata.columns["b"], ["a b", "c"])
+            self.assertEqual(mydata.columns["c"], [2, 4])
+            testfile.seek(0)
+            self.assertRaises(ValueError, data.file, testfile, memorymap=1, columnpattern=re.compile(r"(.*?)(,|$)"))
+        with tempfile.TemporaryFile() as testfile:
+            testfile.write(b"# a b c\n")
+            testfile.flush()
+            testfile.seek(0)
+            mydata = data.file(testfile, memorymap=1)
+            testfile.seek(0)
+            self.assertEqual(mydata.columns, data.file(io.TextIOWrapper(testfile)).columns)
+            self.assertEqual(mydata.columns["a"], [])
+        self.assertRaises(ValueError, data.file, io.StringIO("1 2\n3 4\n"), memorymap=1, x=1, y=2)
+
+    def testFileCache(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, "test.dat")
+            with open(filename, "w") as f:
+                f.write("1 2\n3 4\n")
+            hits = data.filecache.hits
+            self.assertEqual(data.file(filename, a=1).columns["a"], [1, 3])
+            self.assertEqual(data.file(filename, a=1).columns["a"], [1, 3])
+            self.assertEqual(data.filecache.hits, hits + 1)
+            # the size of the entry is the estimated memory of the columns
+            bytes = data.filecache.bytes
+            data.filecache.invalidate(filename)
+            self.assertGreater(bytes - data.filecache.bytes, 4*sys.getsizeof(1.0))
+            with open(filename, "w") as f:
+                f.write("5 6\n")
+            self.assertEqual(data.file(filename, a=1).columns["a"], [5])
+            entries = len(data.filecache)
+            data.filecache.invalidate(filename)
+            self.assertEqual(len(data.filecache), entries - 1)
+            # modification while the file is read
+            cache = config.cache()
+            stamp = cache.stamp(filename)
+            with open(filename, "w") as f:
+                f.write("7 8 9\n")
+            cache.put("key", "value", filename, stamp=stamp)
+            self.assertIsNone(cache.get("key"))
+            cache.put("key", "value", filename)
+            self.assertEqual(cache.get("key"), "value")
+
     def testSec(self):
         testfile = io.StringIO("""[sec1]
 opt1=a1
@@ -108,6 +208,15 @@ opt3=a3""")
         for i in range(10):
             self.assertEqual(mydata.columns["x"][i], i)
             self.assertEqual(mydata.columns["y"][i], -i)
+        mydata = data.paramfunction("k", 0, 1, "x, y = k, a*k", points=3, context={"a": 2})
+        self.assertEqual(mydata.columns, {"x": [0, 0.5, 1], "y": [0, 1, 2]})
+        self.assertEqual(data.paramfunction("k", 0, 1, "x, y = k, k", points=0).columns, {"x": [], "y": []})
+        self.assertRaises(TypeError, data.paramfunction, "k", 0, 1, "x = k", points=3)
+        self.assertRaises(ValueError, data.paramfunction, "k", 0, 1, "x, y = k, k, k", points=3)
+        self.assertRaises(ValueError, data.paramfunction, "k", 0, 1, "x, y, z = k, k", points=3)
+        # errors are not masked
+        self.assertRaises(ZeroDivisionError, data.paramfunction, "k", 0, 1, "x, y = k, 1/k", points=3)
+        self.assertRaises(ValueError, data.paramfunction, "k", 0, 1, "x, y = k, k", context={"k": 1})
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ import sys
 if sys.path[0] != "../..":
     sys.path.insert(0, "../..")
 
-import unittest
+import io, unittest
 
 from pyx import *
 from pyx.deco import *
@@ -71,6 +71,33 @@ class DecoTestCase(unittest.TestCase):
         self.assertAlmostEqual(d.nostrokeranges[0][0], 0.05)
         self.assertAlmostEqual(d.nostrokeranges[0][1], 0.65)
 
+    def testPDFgstate(self):
+        c = canvas.canvas()
+        c.stroke(path.line(0, 0, 1, 0), [color.rgb.red])
+        c.stroke(path.line(0, 0, 1, 0), [color.rgb.red, style.linewidth.thick])
+        c.fill(path.rect(0, 0, 1, 1), [color.rgb.red])
+        c.stroke(path.line(0, 0, 1, 0))
+        c2 = canvas.canvas([color.rgb.red])
+        c2.stroke(path.line(0, 0, 1, 0))
+        c.insert(c2)
+        c.stroke(path.line(0, 0, 1, 0), [color.transparency(0.5)])
+        c.insert(canvas.canvas([trafo.rotate(90)])).stroke(path.line(0, 0, 1, 0), [color.rgb.red])
+        c.stroke(path.line(0, 0, 1, 0), [color.rgb.red])
+        f = io.BytesIO()
+        c.writePDFfile(f, write_compress=False)
+        content = f.getvalue().decode("latin-1")
+        content = content[content.index("stream\n")+7:content.index("endstream")]
+        self.assertEqual([line for line in content.split("\n") if line[-2:] not in [" m", " l"]],
+                         ["1.000000 0.000000 0.000000 RG", "0.566929 w", "S",
+                          "0.801759 w", "S",
+                          "1.000000 0.000000 0.000000 rg", "h", "f",
+                          "0.000000 G", "0.566929 w", "S",
+                          "1.000000 0.000000 0.000000 RG", "S",
+                          "0.000000 G", "/Transparency-Stroke-0.500000 gs", "S",
+                          "q", "0.000000 1.000000 -1.000000 0.000000 0.000000 0.000000 cm",
+                          "1.000000 0.000000 0.000000 RG", "/Transparency-Stroke-1.000000 gs", "S", "Q",
+                          "1.000000 0.000000 0.000000 RG", "/Transparency-Stroke-1.000000 gs", "S", ""])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+import sys
+if sys.path[0] != "../..":
+    sys.path.insert(0, "../..")
+
+import io, math, os, random, unittest
+
+from pyx import graph, unit
+from pyx.graph import style
+
+
+class privatedata: pass
+
+
+class pointline(style.line):
+
+    """line drawn by the per-point protocol"""
+
+    def drawpoint(self, privatedata, sharedata, graph, point):
+        style.line.drawpoint(self, privatedata, sharedata, graph, point)
+
+
+class pointsymbol(style.symbol):
+
+    """symbol drawn by the per-point protocol"""
+
+    def drawpoint(self, privatedata, sharedata, graph, point):
+        style.symbol.drawpoint(self, privatedata, sharedata, graph, point)
+
+
+class GraphStyleTestCase(unittest.TestCase):
+
+    def distance(self, point, line):
+        result = None
+        x_pt, y_pt = point
+        for (x1_pt, y1_pt), (x2_pt, y2_pt) in zip(line[:-1], line[1:]):
+            dx_pt, dy_pt = x2_pt - x1_pt, y2_pt - y1_pt
+            d2 = dx_pt*dx_pt + dy_pt*dy_pt
+            t = d2 and min(1, max(0, ((x_pt-x1_pt)*dx_pt + (y_pt-y1_pt)*dy_pt)/d2))
+            d = math.hypot(x1_pt + t*dx_pt - x_pt, y1_pt + t*dy_pt - y_pt)
+            if result is None or d < result:
+                result = d
+        return result
+
+    def testSimplifyTolerance(self):
+        r = random.Random(1)
+        line = style.line(simplify=1)
+        for points in [[(0.02*i, r.uniform(-10, 10)) for i in range(1000)],
+                       [(10*math.sin(0.01*i), 10*math.cos(0.013*i)) for i in range(1000)],
+                       [(0.002*i, 0) for i in range(1000)]]:
+            simplified = line.simplifypoints(points, 0.3)
+            self.assertEqual(simplified[0], points[0])
+            self.assertEqual(simplified[-1], points[-1])
+            self.assertLess(len(simplified), len(points))
+            for point in points:
+                self.assertLess(self.distance(point, simplified), 0.3)
+        # at most four points per column
+        self.assertLessEqual(len(line.simplifypoints([(0.001*i, r.random()) for i in range(100000)], 1)), 400)
+
+    def drawline(self, line, vposs):
+        data = privatedata()
+        line.initpointstopath(data)
+        for vpos in vposs:
+            line.addpoint(data, lambda x, y: (100*x, 100*y), True, all(0 <= v <= 1 for v in vpos), vpos)
+        line.addpointstopath(data)
+        return data.path.normpath()
+
+    def testSimplifyClipping(self):
+        vposs = [(0.0001*i, 0.5 + 0.7*math.sin(0.002*i)) for i in range(10000)]
+        normpath = self.drawline(style.line(), vposs)
+        simplified = self.drawline(style.line(simplify=0.5*unit.t_pt), vposs)
+        self.assertEqual(len(simplified.normsubpaths), len(normpath.normsubpaths))
+        self.assertGreater(len(normpath.normsubpaths), 1)
+        for normsubpath, simplifiednormsubpath in zip(normpath.normsubpaths, simplified.normsubpaths):
+            self.assertLess(len(simplifiednormsubpath.normsubpathitems), len(normsubpath.normsubpathitems))
+            self.assertEqual(simplifiednormsubpath.atbegin_pt(), normsubpath.atbegin_pt())
+            self.assertEqual(simplifiednormsubpath.atend_pt(), normsubpath.atend_pt())
+
+    def plot(self, styles):
+        # axes without labels need no TeX
+        g = graph.graphxy(width=8, x=graph.axis.lin(min=0, max=10, painter=graph.axis.painter.regular(labelattrs=None)),
+                          y=graph.axis.log(min=0.1, max=10, painter=graph.axis.painter.regular(labelattrs=None)))
+        # runs of valid points interrupted by out of range, None and invalid values
+        xs = [0.2*i - 1 for i in range(60)]
+        ys = [10**(1.5*math.sin(0.3*i)) for i in range(60)]
+        xs[20] = ys[25] = None
+        ys[30], ys[31], ys[40] = 0, -1, "a"
+        g.plot([graph.data.values(x=xs, y=ys),
+                graph.data.points([[1, 1], [2, None], ["a", 3], [3, 30], [4, 4]], x=1, y=2),
+                graph.data.function("y(x) = 1/(x-2)", points=20)], styles)
+        f = io.BytesIO()
+        sourcedateepoch = os.environ.get("SOURCE_DATE_EPOCH")
+        os.environ["SOURCE_DATE_EPOCH"] = "0"
+        try:
+            g.writePSfile(f)
+        finally:
+            if sourcedateepoch is None:
+                del os.environ["SOURCE_DATE_EPOCH"]
+            else:
+                os.environ["SOURCE_DATE_EPOCH"] = sourcedateepoch
+        return f.getvalue()
+
+    def testDrawPoints(self):
+        self.assertTrue(graph.graph.hasdrawpoints(style.line()))
+        self.assertTrue(graph.graph.hasdrawpoints(style.symbol()))
+        self.assertFalse(graph.graph.hasdrawpoints(pointline()))
+        self.assertFalse(graph.graph.hasdrawpoints(style.errorbar()))
+        for styles, pointstyles in [([style.line()], [pointline()]),
+                                    ([style.symbol()], [pointsymbol()]),
+                                    ([style.line(), style.symbol()], [pointline(), pointsymbol()]),
+                                    ([style.line(simplify=0.1*unit.t_pt)], [pointline(simplify=0.1*unit.t_pt)])]:
+            self.assertEqual(self.plot(styles), self.plot(pointstyles))
+
+
+if __name__ == "__main__":
+    unittest.main()
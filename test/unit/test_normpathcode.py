@@ -0,0 +1,72 @@
+import sys
+if sys.path[0] != "../..":
+    sys.path.insert(0, "../..")
+
+import unittest, random
+
+from pyx import normpathcode
+try:
+    from pyx import _normpathcode
+except ImportError:
+    _normpathcode = None
+
+
+@unittest.skipIf(_normpathcode is None, "C extension module _normpathcode not available")
+class NormpathcodeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.curves = [tuple(random.uniform(-100, 100) for i in range(8)) for j in range(50)]
+        self.curves.append((0, 0, 0, 0, 0, 0, 1, 1))
+        self.curves.append((0, 0, 1, 0, 2, 0, 3, 0))
+
+    def assertAlmostEqualList(self, l1, l2):
+        self.assertEqual(len(l1), len(l2))
+        for x1, x2 in zip(l1, l2):
+            if isinstance(x1, (tuple, list)):
+                self.assertAlmostEqualList(x1, x2)
+            else:
+                self.assertAlmostEqual(x1, x2, 9)
+
+    def testrealpolyroots(self):
+        for cs, roots in [((), [0]), ((0,), [0]), ((1, -2), [2]), ((1, 0, -4), [-2, 2]), ((0, 1, 0, -4), [-2, 2]),
+                          ((1, -6, 11, -6), [1, 2, 3]), ((1, 0, 0, 0, -1), [-1, 1]),
+                          ((1, -10, 35, -50, 24), [1, 2, 3, 4]), ((2, 0, 1), []), ((1, 0, 0, 0), [0])]:
+            self.assertAlmostEqualList(sorted(_normpathcode.realpolyroots(*cs)), roots)
+        self.assertRaises(RuntimeError, _normpathcode.realpolyroots, 1, 0, 0, 0, 0, 1)
+
+    def testsplitflatten(self):
+        for curve in self.curves:
+            for t in [0.5, 0.2, 1.3]:
+                self.assertAlmostEqualList(_normpathcode.splitcurve_pt(*curve, t), normpathcode.splitcurve_pt(*curve, t))
+            for epsilon in [1e-1, 1e-3]:
+                for intersect in [0, 1]:
+                    l1 = _normpathcode.flatline_pt(curve, epsilon, intersect)
+                    l2 = normpathcode.flatline_pt(curve, epsilon, intersect)
+                    if l1 is None:
+                        self.assertEqual(l2, None)
+                    else:
+                        self.assertAlmostEqualList(l1, l2)
+                self.assertAlmostEqualList(_normpathcode.flatten_pt(*curve, epsilon), normpathcode.flatten_pt(*curve, epsilon))
+        for l in [(1, 2, 3), (1, 1, 1), (0, 0, 0)]:
+            for param in [-0.5, 0, 0.3, 1, 1.5]:
+                self.assertAlmostEqual(_normpathcode.lineparam(param, *l), normpathcode.lineparam(param, *l))
+
+    def testcurve(self):
+        params = [-0.5, 0, 0.1, 0.5, 0.9, 1, 2]
+        for curve in self.curves[:-2]:
+            self.assertAlmostEqualList(_normpathcode.curveat_pt(*curve, params), normpathcode.curveat_pt(*curve, params))
+            self.assertAlmostEqualList(_normpathcode.curvecurvature_pt(*curve, params), normpathcode.curvecurvature_pt(*curve, params))
+        self.assertRaises(ZeroDivisionError, _normpathcode.curvecurvature_pt, 0, 0, 0, 0, 0, 0, 0, 0, [0.5])
+
+    def testlineintersect(self):
+        lines = [tuple(random.uniform(-10, 10) for i in range(4)) for j in range(100)]
+        lines.extend([(0, 0, 1, 0), (1, 0, 2, 0), (0.5, 0, 0.5, 1e-9), (2, 0, 3, 0), (0, 1e-9, 1, 1e-9)])
+        for line1 in lines:
+            for line2 in lines:
+                self.assertAlmostEqualList(_normpathcode.lineintersect_pt(*line1, *line2, 1e-5),
+                                           normpathcode.lineintersect_pt(*line1, *line2, 1e-5))
+
+
+if __name__ == "__main__":
+    unittest.main()
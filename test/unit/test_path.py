@@ -6,8 +6,10 @@ import unittest
 
 from pyx import *
 from pyx.path import *
-from pyx.normpath import normpathparam
-import math
+from pyx.normpath import normpathparam, normsubpathitemarray, _area_pt, _overlappingpairs
+from pyx import bbox, writer
+from pyx.path import pdfmoveto_pt
+import io, math, random
 set(epsilon=1e-7)
 
 class NormpathTestCase(unittest.TestCase):
@@ -119,6 +121,49 @@ class NormpathTestCase(unittest.TestCase):
         self.assertAlmostEqual(p.at_pt(4.5)[0], 3)
         self.assertAlmostEqual(p.at_pt(4.5)[1], 1.5)
 
+    def assertAlmostEqualTrafos(self, trafos, expected):
+        self.assertEqual(len(trafos), len(expected))
+        for t, (a, b, c, d, e, f) in zip(trafos, expected):
+            self.assertAlmostEqual(t.matrix[0][0], a)
+            self.assertAlmostEqual(t.matrix[0][1], b)
+            self.assertAlmostEqual(t.matrix[1][0], c)
+            self.assertAlmostEqual(t.matrix[1][1], d)
+            self.assertAlmostEqual(t.vector[0], e)
+            self.assertAlmostEqual(t.vector[1], f)
+
+    def testevaluate(self):
+        # segment boundaries, params out of range, unsorted and repeated params
+        nsp = normsubpath([normline_pt(0, 0, 10, 0),
+                           normcurve_pt(10, 0, 20, 0, 20, 10, 20, 20),
+                           normline_pt(20, 20, 20, 30)])
+        params = [2.7, -0.5, 0, 1, 0.3, 1, 2, 3.5, 1.5, 3]
+        s = math.sqrt(0.1)
+        trafos = [(0, -1, 1, 0, 20, 27), (1, 0, 0, 1, -5, 0), (1, 0, 0, 1, 0, 0), (1, 0, 0, 1, 10, 0),
+                  (1, 0, 0, 1, 3, 0), (1, 0, 0, 1, 10, 0), (0, -1, 1, 0, 20, 20), (0, -1, 1, 0, 20, 35),
+                  (s, -3*s, 3*s, s, 18.75, 6.25), (0, -1, 1, 0, 20, 30)]
+        self.assertAlmostEqualTrafos(nsp.trafo(params), trafos)
+        self.assertAlmostEqualTrafos(nsp.rotation(params), [t[:4] + (0, 0) for t in trafos])
+        for curvature, expected in zip(nsp.curvature_pt(params), [0, 0, 0, 1/15, 0, 1/15, 0, 0, 0.067461923, 0]):
+            self.assertAlmostEqual(curvature, expected)
+        closed = normsubpath([normcurve_pt(0, 0, 10, 0, 10, 10, 0, 10),
+                              normline_pt(0, 10, 0, 0)], closed=1)
+        params = [-0.5, 0, 0.5, 1, 1.5, 2, 2.5]
+        trafos = [(0.8, 0.6, -0.6, 0.8, -22.5, 10), (1, 0, 0, 1, 0, 0), (0, -1, 1, 0, 7.5, 5), (0, 1, -1, 0, 0, 10),
+                  (0, 1, -1, 0, 0, 5), (0, 1, -1, 0, 0, 0), (0, 1, -1, 0, 0, -5)]
+        self.assertAlmostEqualTrafos(closed.trafo(params), trafos)
+        self.assertAlmostEqualTrafos(closed.rotation(params), [t[:4] + (0, 0) for t in trafos])
+        for curvature, expected in zip(closed.curvature_pt(params), [0.032/3, 1/15, 0.8/3, 0, 0, 0, 0]):
+            self.assertAlmostEqual(curvature, expected)
+        # params of several normsubpaths
+        p = normpath([nsp, closed])
+        params = [normpathparam(p, 1, 0.5), normpathparam(p, 0, 1), normpathparam(p, 0, -1), normpathparam(p, 1, 2.5)]
+        self.assertAlmostEqualTrafos(p.trafo(params), [(0, -1, 1, 0, 7.5, 5), (1, 0, 0, 1, 10, 0),
+                                                       (1, 0, 0, 1, -10, 0), (0, 1, -1, 0, 0, -5)])
+        for curvature, expected in zip(p.curvature_pt(params), [0.8/3, 1/15, 0, 0]):
+            self.assertAlmostEqual(curvature, expected)
+        for param, t in zip(params, p.trafo(params)):
+            self.assertAlmostEqualTrafos([p.trafo(param)], [t.matrix[0] + t.matrix[1] + t.vector])
+
     def testarclentoparam(self):
         p = ( normpath([normsubpath([normline_pt(0, 0, 10, 0),
                                    normline_pt(10, 0, 10, 20),
@@ -135,6 +180,26 @@ class NormpathTestCase(unittest.TestCase):
         for arclen, arclen2 in zip(arclens, p.paramtoarclen(p.arclentoparam(arclens))):
             self.assertAlmostEqual(unit.tom(arclen), unit.tom(arclen2), 4)
 
+        # unsorted params within a single curve
+        p = normpath([normsubpath([normcurve_pt(0, 0, 10, 10, 20, 10, 30, 0)])])
+        arclens_pt = [20, 5, 30, 10]
+        for arclen_pt, arclen2_pt in zip(arclens_pt, p.paramtoarclen_pt(p.arclentoparam_pt(arclens_pt))):
+            self.assertAlmostEqual(arclen_pt, arclen2_pt, 4)
+
+    def testarclencache(self):
+        sp = normsubpath([normline_pt(0, 0, 10, 0)])
+        self.assertAlmostEqual(sp.arclen_pt(), 10)
+        self.assertAlmostEqual(sp.arclentoparam_pt([15])[0], 1.5)
+        sp.append(normline_pt(10, 0, 10, 10))
+        self.assertAlmostEqual(sp.arclen_pt(), 20)
+        self.assertAlmostEqual(sp.arclentoparam_pt([15])[0], 1.5)
+        sp.join(normsubpath([normline_pt(10, 20, 0, 20)]))
+        self.assertAlmostEqual(sp.arclen_pt(), 40)
+        self.assertAlmostEqual(sp._paramtoarclen_pt([2.5])[0][0], 25)
+        sp.close()
+        self.assertAlmostEqual(sp.arclen_pt(), 60)
+        self.assertAlmostEqual(sp.arclentoparam_pt([50])[0], 4.5)
+
     def testsplit(self):
         p = normline_pt(0, 0, 10, 0)
         self.assertRaises(ValueError, p.segments, [])
@@ -282,6 +347,16 @@ class NormpathTestCase(unittest.TestCase):
         self.assertAlmostEqualNormsubpath(normsubpath([normcurve_pt(0, 0, 5, 5, 0, 5, 5, 0)], epsilon=1),
                                           normsubpath([normcurve_pt(0, 0, 2.5, 2.5, 2.5, 3.405172413793103, 2.5, 3.75), normcurve_pt(2.5, 3.75, 2.5, 3.405172413793103, 2.5, 2.5, 5, 0)], epsilon=None))
 
+    def testintersectclosepoints(self):
+        # a zigzag crossing a line several times within epsilon: the close
+        # intersection points are equivalent to each other, also transitively
+        points = [(-1, -1)] + [(i*0.02, 0.02 if i % 2 else -0.02) for i in range(8)] + [(1, -1)]
+        p1 = normsubpath([normline_pt(-1, 0, 1, 0)])
+        p2 = normsubpath([normline_pt(x1, y1, x2, y2) for (x1, y1), (x2, y2) in zip(points[:-1], points[1:])])
+        p1.epsilon = p2.epsilon = 0.05
+        self.assertEqual(len(p1.intersect(p2)[0]), 1)
+        self.assertEqual(len(p2.intersect(p1)[0]), 1)
+
     def testintersectnormsubpath(self):
         smallposy = 0.09
         smallnegy = -0.01
@@ -378,6 +453,247 @@ class NormpathTestCase(unittest.TestCase):
         self.assertAlmostEqual(intersect[0][2], 2.9)
         self.assertAlmostEqual(intersect[0][3], 3.5)
 
+    def testintersectmanyitems(self):
+        p1 = normsubpath([normline_pt(i, i % 2, i+1, (i+1) % 2) for i in range(100)])
+        p2 = normsubpath([normline_pt(i, 0.5, i+1, 0.5) for i in range(100)])
+        intersect = p1.intersect(p2)
+        self.assertEqual(len(intersect[0]), 100)
+        for i, (param1, param2) in enumerate(zip(*intersect)):
+            self.assertAlmostEqual(param1, i+0.5)
+            self.assertAlmostEqual(param2, i+0.5)
+
+    def testoverlappingpairs(self):
+        r = random.Random(1)
+        def randombbox():
+            x, y = r.uniform(0, 100), r.uniform(0, 100)
+            return bbox.bbox_pt(x, y, x + r.choice([0, r.uniform(0, 5), r.uniform(0, 100)]),
+                                      y + r.choice([0, r.uniform(0, 5), r.uniform(0, 100)]))
+        # stacked horizontal and vertical bboxes overlapping in one direction only
+        stacked = ([bbox.bbox_pt(0, 0.01*i, 100, 0.01*i+0.005) for i in range(200)] +
+                   [bbox.bbox_pt(0.01*i, 0, 0.01*i+0.005, 100) for i in range(200)])
+        for bboxes_a, bboxes_b in [([randombbox() for i in range(300)], [randombbox() for i in range(200)]),
+                                   (stacked, stacked[1:] + [randombbox() for i in range(20)]),
+                                   ([], stacked)]:
+            expected = [(i, j) for i, bbox_a in enumerate(bboxes_a) for j, bbox_b in enumerate(bboxes_b)
+                        if bbox_a.llx_pt <= bbox_b.urx_pt and bbox_b.llx_pt <= bbox_a.urx_pt and
+                           bbox_a.lly_pt <= bbox_b.ury_pt and bbox_b.lly_pt <= bbox_a.ury_pt]
+            self.assertEqual(_overlappingpairs(bboxes_a, bboxes_b), expected)
+            self.assertEqual(_overlappingpairs(bboxes_a, bboxes_b, leafsize=2), expected)
+
+    def testflatten(self):
+        c = normcurve_pt(0, 0, 100, 200, 200, -100, 300, 100)
+        for intersect in [False, True]:
+            lines = c._flatten_pt(1e-3, intersect=intersect)
+            self.assertEqual(lines[0][0], 0)
+            self.assertEqual(lines[-1][0] + lines[-1][1], 1)
+            self.assertEqual(lines[0][2:4], (0, 0))
+            self.assertEqual(lines[-1][4:6], (300, 100))
+            for line1, line2 in zip(lines[:-1], lines[1:]):
+                self.assertEqual(line1[0] + line1[1], line2[0])
+                self.assertEqual(line1[4:6], line2[2:4])
+        # the arclen error is bounded by the lengths of the control polygons
+        lines = c._flatten_pt(1e-3)
+        self.assertTrue(sum([l1_pt + l2_pt + l3_pt - math.hypot(x1_pt-x0_pt, y1_pt-y0_pt)
+                             for t0, dt, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt, l3_pt in lines]) < 2e-3)
+        # in intersect mode, the curve is close to the lines
+        for t0, dt, x0_pt, y0_pt, x1_pt, y1_pt, l1_pt, l2_pt, l3_pt in c._flatten_pt(1e-3, intersect=True):
+            x_pt, y_pt = c.at_pt([t0 + 0.5*dt])[0]
+            d_pt = abs((x1_pt-x0_pt)*(y0_pt-y_pt) - (x0_pt-x_pt)*(y1_pt-y0_pt)) / math.hypot(x1_pt-x0_pt, y1_pt-y0_pt)
+            self.assertTrue(d_pt < 1e-3)
+
+    def testcompact(self):
+        items = [normline_pt(0, 0, 1, 0), normline_pt(1, 0, 1, 1),
+                 normcurve_pt(1, 1, 2, 1, 2, 2, 2, 3), normline_pt(2, 3, 0, 0)]
+        sp1 = normsubpath(items)
+        sp2 = normsubpath(items, compact=1)
+        self.assertTrue(isinstance(sp2.normsubpathitems, normsubpathitemarray))
+        self.assertAlmostEqualNormsubpath(sp1, sp2)
+        self.assertEqual(sp1.bbox().highrestuple_pt(), sp2.bbox().highrestuple_pt())
+        self.assertAlmostEqual(sp1.arclen_pt(), sp2.arclen_pt())
+        self.assertAlmostEqualNormsubpath(sp1.transformed(trafo.rotate(30)), sp2.transformed(trafo.rotate(30)))
+        self.assertAlmostEqualNormsubpath(sp1.transformed(trafo.scale(2)), sp2.transformed(trafo.scale(2)))
+        self.assertEqual(sp1.pathitems()[-1].__class__, sp2.pathitems()[-1].__class__)
+        sp2.normsubpathitems.pop()
+        sp2.normsubpathitems.append(normline_pt(2, 3, 3, 3))
+        self.assertAlmostEqualNormsubpathitem(sp2[-1], normline_pt(2, 3, 3, 3))
+        self.assertEqual(len(sp2.normsubpathitems.points_pt), 14)
+
+        sp1 = normsubpath()
+        sp2 = normsubpath()
+        points_pt = [(1, 0), (1, 1e-9), (2, 1e-9), (2, 1), (2, 1+1e-9)]
+        for i, point_pt in enumerate(points_pt):
+            sp1.append(normline_pt(*(points_pt[i-1] if i else (0, 0)) + point_pt))
+        sp2.appendlines_pt(0, 0, points_pt)
+        self.assertAlmostEqualNormsubpath(sp1, sp2)
+        self.assertAlmostEqualNormsubpathitem(sp1.skippedline, sp2.skippedline)
+
+    def testbboxcache(self):
+        p = line_pt(0, 0, 1, 1)
+        p.bbox().enlarge_pt(10)
+        self.assertEqual(p.bbox().highrestuple_pt(), (0, 0, 1, 1))
+        p.append(lineto_pt(2, 0))
+        self.assertEqual(p.bbox().highrestuple_pt(), (0, 0, 2, 1))
+        p.extend([lineto_pt(2, 3)])
+        self.assertEqual(p.bbox().highrestuple_pt(), (0, 0, 2, 3))
+        p += line_pt(-1, 0, 0, 0)
+        self.assertEqual(p.bbox().highrestuple_pt(), (-1, 0, 2, 3))
+
+        # the canvas bbox follows changes of its items after their insertion
+        c = canvas.canvas()
+        p = line_pt(0, 0, 1, 1)
+        c.stroke(p)
+        self.assertEqual(c.bbox().highrestuple_pt(), (0, 0, 1, 1))
+        p.append(lineto_pt(5, 5))
+        self.assertEqual(c.bbox().highrestuple_pt(), (0, 0, 5, 5))
+        c.layer("a").stroke(line_pt(0, 0, 6, 1))
+        self.assertEqual(c.bbox().highrestuple_pt(), (0, 0, 6, 5))
+
+    def testtransformed(self):
+        items = [normline_pt(0, 0, 1, 0), normcurve_pt(1, 0, 2, 1, 2, 2, 2, 3), normline_pt(2, 3, 2, 3+1e-6),
+                 normline_pt(2, 3+1e-6, 0, 0)]
+        for t in [trafo.rotate(30).scaled(2), trafo.scale(1e-2), trafo.identity]:
+            for closed in [0, 1]:
+                for compact in [0, 1]:
+                    sp = normsubpath(items, closed=closed, compact=compact)
+                    expected = normsubpath(epsilon=sp.epsilon)
+                    for item in sp:
+                        expected.append(item.transformed(t))
+                    if closed:
+                        expected.close()
+                    self.assertAlmostEqualNormsubpath(sp.transformed(t), expected)
+                    self.assertEqual(isinstance(sp.transformed(t).normsubpathitems, normsubpathitemarray), bool(compact))
+            b = normpath([normsubpath(items)]).bbox()
+            tb = b.transformed(t)
+            corners = [t.apply_pt(x_pt, y_pt) for x_pt in (b.llx_pt, b.urx_pt) for y_pt in (b.lly_pt, b.ury_pt)]
+            self.assertEqual(tb.highrestuple_pt(), (min([x for x, y in corners]), min([y for x, y in corners]),
+                                                    max([x for x, y in corners]), max([y for x, y in corners])))
+            b.transform(t)
+            self.assertEqual(b.highrestuple_pt(), tb.highrestuple_pt())
+
+    def testoutput(self):
+        items = [normline_pt(0, 0, 1, 0), normcurve_pt(1, 0, 2, 1, 2, 2, 2, 3), pdfmoveto_pt(2, 3, 3, 3)]
+        sp = normsubpath(items, closed=1, epsilon=None)
+        for method, expected in [("outputPS", "0 0 moveto\n1 0 lineto\n2 1 2 2 2 3 curveto\n3 3 lineto\nclosepath\n"),
+                                 ("outputPDF", "0.000000 0.000000 m\n1.000000 0.000000 l\n"
+                                               "2.000000 1.000000 2.000000 2.000000 2.000000 3.000000 c\nh\n")]:
+            file = writer.writer(io.BytesIO(), bufsize=10)
+            getattr(sp, method)(file, None)
+            self.assertEqual(file.getvalue().decode("ascii"), expected)
+        self.assertEqual(sp.returnSVGdata(True), "M0 0L1 0C2 -1 2 -2 2 -3L3 -3Z")
+
+    def testnormsubpathitemarrayedit(self):
+        def randomitem():
+            # few distinct points to get shared and unshared beginnings
+            x0_pt, y0_pt, x1_pt, y1_pt = [random.choice([1, 2]) for i in range(4)]
+            return random.choice([normline_pt(x0_pt, y0_pt, x1_pt, y1_pt),
+                                  normcurve_pt(x0_pt, y0_pt, 3, 4, 5, 6, x1_pt, y1_pt),
+                                  pdfmoveto_pt(x0_pt, y0_pt, x1_pt, y1_pt)])
+        random.seed(12)
+        for n in range(200):
+            items = [randomitem() for i in range(random.randrange(6))]
+            array = normsubpathitemarray(items)
+            for op in range(5):
+                i = random.randrange(-len(items)-1, len(items)+2)
+                kind = random.randrange(5)
+                if kind == 0 and -len(items) <= i < len(items):
+                    item = randomitem()
+                    items[i] = item
+                    array[i] = item
+                elif kind == 1 and -len(items) <= i < len(items):
+                    del items[i]
+                    del array[i]
+                elif kind == 2:
+                    item = randomitem()
+                    items.insert(i, item)
+                    array.insert(i, item)
+                elif kind == 3:
+                    j = random.randrange(-len(items)-1, len(items)+2)
+                    newitems = [randomitem() for k in range(random.randrange(3))]
+                    items[i:j] = newitems
+                    array[i:j] = newitems
+                else:
+                    j = random.randrange(-len(items)-1, len(items)+2)
+                    del items[i:j]
+                    del array[i:j]
+                self.assertEqual(len(array), len(items))
+                self.assertEqual(array.curves, len([item for item in items if isinstance(item, normcurve_pt)]))
+                expected = normsubpathitemarray(items)
+                self.assertEqual(expected.points_pt, array.points_pt)
+                self.assertEqual(expected.starts, array.starts)
+                self.assertEqual(expected.tags, array.tags)
+                for item1, item2 in zip(array, items):
+                    self.assertEqual(type(item1), type(item2))
+                    self.assertEqual(item1.bbox().highrestuple_pt(), item2.bbox().highrestuple_pt())
+                    self.assertEqual(item1.atbegin_pt(), item2.atbegin_pt())
+                    self.assertEqual(item1.atend_pt(), item2.atend_pt())
+        self.assertRaises(IndexError, array.__setitem__, len(array), normline_pt(0, 0, 1, 1))
+        self.assertRaises(IndexError, array.__delitem__, len(array))
+
+    def testbooleanoperations(self):
+        def area_pt(np):
+            return sum([_area_pt(nsp) for nsp in np.normsubpaths])
+        r1 = rect_pt(0, 0, 10, 10).normpath()
+        r2 = rect_pt(5, 5, 10, 10).normpath()
+        for result, area, bbox, subpaths in [(r1.union(r2), 175, (0, 0, 15, 15), 1),
+                                             (r1.intersection(r2), 25, (5, 5, 10, 10), 1),
+                                             (r1.difference(r2), 75, (0, 0, 10, 10), 1),
+                                             (r2.difference(r1), 75, (5, 5, 15, 15), 1),
+                                             (r1.union(rect_pt(20, 0, 10, 10)), 200, (0, 0, 30, 10), 2),
+                                             (r1.intersection(rect_pt(20, 0, 10, 10)), 0, None, 0),
+                                             (r1.difference(rect_pt(2, 2, 2, 2)), 96, (0, 0, 10, 10), 2)]:
+            self.assertEqual(len(result), subpaths)
+            self.assertAlmostEqual(area_pt(result), area)
+            if bbox is not None:
+                for x1, x2 in zip(result.bbox().highrestuple_pt(), bbox):
+                    self.assertAlmostEqual(x1, x2)
+
+        # shared pieces of the boundaries
+        r3 = rect_pt(10, 0, 10, 10).reversed().normpath()
+        self.assertEqual(len(r1.union(r3)), 1)
+        self.assertEqual(len(r1.union(r3)[0]), 6)
+        self.assertAlmostEqual(area_pt(r1.union(r3)), 200)
+        self.assertAlmostEqual(area_pt(r1.union(r1)), 100)
+        self.assertAlmostEqual(area_pt(r1.intersection(r1)), 100)
+        self.assertEqual(len(r1.difference(r1)), 0)
+
+        c1 = circle_pt(0, 0, 10).normpath()
+        c2 = circle_pt(10, 0, 10).normpath()
+        circle = area_pt(c1)
+        lens = area_pt(c1.intersection(c2))
+        self.assertAlmostEqual(lens, 200*math.acos(0.5) - 10*math.sqrt(75), 2)
+        self.assertAlmostEqual(area_pt(c1.union(c2)), 2*circle - lens, 5)
+        self.assertAlmostEqual(area_pt(c1.difference(c2)), circle - lens, 5)
+        self.assertAlmostEqual(area_pt(c1.union(c1.reversed())), circle)
+        self.assertEqual(len(c1.difference(c1)), 0)
+
+        paths = [circle_pt(10*(i % 5), 10*(i // 5), 6) for i in range(20)] + [rect_pt(100, 0, 10, 10)]
+        result = normpath.union_all(paths)
+        # outer boundary, 12 holes between the circles and the rectangle
+        self.assertEqual(len(result), 14)
+        successive = paths[0].normpath()
+        for p in paths[1:-1]:
+            successive = successive.union(p)
+        self.assertEqual(len(successive), 13)
+        self.assertAlmostEqual(area_pt(result), area_pt(successive) + 100, 5)
+
+        # self-intersecting subpath: two triangles of area 100 each
+        bowtie = path(moveto_pt(0, 0), lineto_pt(20, 20), lineto_pt(20, 0), lineto_pt(0, 20), closepath()).normpath()
+        r4 = rect_pt(5, -5, 10, 30).normpath()
+        self.assertAlmostEqual(area_pt(bowtie.union(r4)), 450)
+        self.assertAlmostEqual(area_pt(bowtie.intersection(r4)), 50)
+        self.assertAlmostEqual(area_pt(bowtie.difference(r4)), 150)
+        self.assertAlmostEqual(area_pt(r4.difference(bowtie)), 250)
+        self.assertAlmostEqual(area_pt(bowtie.union(bowtie)), 200)
+
+        # overlapping subpaths: the lens does not belong to the region (even-odd rule)
+        circles = (circle_pt(10, 10, 8) + circle_pt(18, 10, 8)).normpath()
+        r5 = rect_pt(12, 0, 4, 30).normpath()
+        crescents = area_pt(circle_pt(10, 10, 8).normpath().difference(circle_pt(18, 10, 8)))
+        self.assertAlmostEqual(area_pt(circles.union(circles)), 2*crescents, 5)
+        inside = area_pt(circles.intersection(r5))
+        self.assertAlmostEqual(area_pt(circles.union(r5)), 2*crescents + 120 - inside, 5)
+        self.assertAlmostEqual(area_pt(circles.difference(r5)), 2*crescents - inside, 5)
+        self.assertAlmostEqual(inside, 9.5156, 2)
 
 if __name__ == "__main__":
     unittest.main()
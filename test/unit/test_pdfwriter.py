@@ -0,0 +1,115 @@
+import sys
+if sys.path[0] != "../..":
+    sys.path.insert(0, "../..")
+
+import io, re, unittest, zlib
+
+from pyx import *
+
+class PDFwriterTestCase(unittest.TestCase):
+
+    def writedocument(self, **kwargs):
+        pages = []
+        for i in range(3):
+            c = canvas.canvas()
+            if not i:
+                c.insert(bitmap.bitmap(0, 0, bitmap.image(2, 2, "RGB", bytes(range(12))), width=1))
+            c.stroke(path.circle(0, 0, i+1), [color.transparency(0.5)])
+            pages.append(document.page(c))
+        f = io.BytesIO()
+        document.document(pages).writePDFfile(f, **kwargs)
+        return f.getvalue()
+
+    def getstream(self, data, pos):
+        start = data.index(b"stream\n", pos) + 7
+        end = data.index(b"endstream\n", start)
+        return zlib.decompress(data[start:end])
+
+    def testObjectStreams(self):
+        for streaming in [False, True]:
+            data = self.writedocument(objectstreams=True, streaming=streaming)
+            self.assertTrue(data.startswith(b"%PDF-1.5\n"))
+            self.assertNotIn(b"\ntrailer\n", data)
+            xrefpos = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+            xref = re.match(rb"(\d+) 0 obj\n<<\n/Type /XRef\n/Size (\d+)\n/W \[1 (\d) 2\]\n", data[xrefpos:])
+            self.assertIsNotNone(xref)
+            size, width = int(xref.group(2)), int(xref.group(3))
+            entries = self.getstream(data, xrefpos)
+            self.assertEqual(len(entries), size*(width+3))
+            compressed = 0
+            for refno in range(1, size):
+                entry = entries[refno*(width+3):(refno+1)*(width+3)]
+                field2 = int.from_bytes(entry[1:width+1], "big")
+                field3 = int.from_bytes(entry[width+1:], "big")
+                if entry[0] == 1:
+                    self.assertTrue(data[field2:].startswith(b"%i 0 obj\n" % refno))
+                else:
+                    self.assertEqual(entry[0], 2)
+                    objstmpos = int.from_bytes(entries[field2*(width+3)+1:field2*(width+3)+width+1], "big")
+                    first = int(re.match(rb"\d+ 0 obj\n<<\n/Type /ObjStm\n/N \d+\n/First (\d+)\n", data[objstmpos:]).group(1))
+                    objstm = self.getstream(data, objstmpos)
+                    header = objstm[:first].split()
+                    self.assertEqual(int(header[2*field3]), refno)
+                    self.assertNotIn(b"stream", objstm)
+                    compressed += 1
+            # catalog, pages, info, the three page objects and the shared extgstate
+            self.assertEqual(compressed, 7)
+            # the image and the three content streams are stored as objects
+            self.assertEqual(data.count(b"\nstream\n"), 1 + 3 + len(re.findall(rb"/Type /ObjStm", data)) + 1)
+
+    def getobjects(self, data):
+        # the objects of a document with a classic xref table by their refnos
+        xrefpos = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+        xref = re.match(rb"xref\n0 (\d+)\n0000000000 65535 f \n", data[xrefpos:])
+        objects = {}
+        for refno in range(1, int(xref.group(1))):
+            pos = xrefpos + xref.end() + 20*(refno-1)
+            entry = re.match(rb"(\d{10}) 00000 n \n", data[pos:pos+20])
+            self.assertIsNotNone(entry)
+            start = int(entry.group(1))
+            self.assertTrue(data[start:].startswith(b"%i 0 obj\n" % refno))
+            objects[refno] = data[start:data.index(b"endobj\n", start)]
+        self.assertTrue(data[xrefpos+xref.end()+20*(len(objects)):].startswith(b"trailer\n"))
+        return objects
+
+    def getpagecontents(self, data):
+        objects = self.getobjects(data)
+        root = int(re.search(rb"/Root (\d+) 0 R", data).group(1))
+        pages = int(re.search(rb"/Pages (\d+) 0 R", objects[root]).group(1))
+        count = int(re.search(rb"/Count (\d+)", objects[pages]).group(1))
+        kids = [int(refno) for refno in re.findall(rb"(\d+) 0 R", re.search(rb"/Kids \[(.*?)\]", objects[pages]).group(1))]
+        self.assertEqual(len(kids), count)
+        contents = []
+        for kid in kids:
+            self.assertIn(b"/Type /Page\n", objects[kid])
+            content = objects[int(re.search(rb"/Contents (\d+) 0 R", objects[kid]).group(1))]
+            contents.append(self.getstream(content, 0))
+        return contents
+
+    def testStreaming(self):
+        data = self.writedocument(streaming=True)
+        contents = self.getpagecontents(data)
+        self.assertEqual(len(contents), 3)
+        self.assertEqual(contents, self.getpagecontents(self.writedocument()))
+        # the page objects are written before the shared resources
+        self.assertLess(data.index(b"/Type /Page\n"), data.index(b"/Type /ExtGState"))
+
+    def testCompression(self):
+        data = self.writedocument(compressthreads=1)
+        self.assertEqual(self.writedocument(), data)
+        self.assertEqual(self.writedocument(compressthreads=4, streaming=True), self.writedocument(compressthreads=1, streaming=True))
+        for compresslevel in [1, 9]:
+            f = io.BytesIO()
+            c = canvas.canvas()
+            c.stroke(path.circle(0, 0, 1))
+            stats = document.document([document.page(c)]).writePDFfile(f, compresslevel=compresslevel).compressionstats
+            data = f.getvalue()
+            pos = data.index(b"/Filter /FlateDecode\n")
+            content = self.getstream(data, pos)
+            start = data.index(b"stream\n", pos) + 7
+            self.assertEqual(data[start:data.index(b"endstream\n", start)], zlib.compress(content, compresslevel))
+            self.assertEqual(stats, {"content": [1, len(content), len(zlib.compress(content, compresslevel))]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import sys
+if sys.path[0] != "../..":
+    sys.path.insert(0, "../..")
+
+import io, json, logging, os, shutil, struct, tempfile, threading, unittest
+
+from pyx import *
+from pyx.dvi import dvifile
+
+
+class fakebox:
+
+    def __init__(self, expr):
+        self.expr = expr
+
+
+class fakeengine:
+
+    """engine recording its lifecycle instead of running an interpreter"""
+
+    instances = []
+
+    def __init__(self):
+        self.state = text.STATE_START
+        self.finished = 0
+        self.instances.append(self)
+
+    def start(self):
+        self.state = text.STATE_PREAMBLE
+
+    def preamble(self, expr, texmessages=[]):
+        self.state = text.STATE_PREAMBLE
+
+    def text_pt(self, x_pt, y_pt, expr, *args, **kwargs):
+        self.state = text.STATE_TYPESET
+        box = fakebox(expr)
+        box.do_finish = self.do_finish
+        return box
+
+    def do_finish(self):
+        if self.state == text.STATE_DONE:
+            return
+        self.finished += 1
+        self.state = text.STATE_DONE
+
+
+class TypesetManyTestCase(unittest.TestCase):
+
+    def testFallback(self):
+        class textptengine:
+            def text_pt(self, x_pt, y_pt, expr, textattrs=[]):
+                return x_pt, y_pt, expr, textattrs
+        self.assertEqual(text.typeset_many_pt(textptengine(), [(0, 1, "a", []), (2, 3, "b", [text.halign.left])]),
+                         [(0, 1, "a", []), (2, 3, "b", [text.halign.left])])
+        class textmanyptengine(textptengine):
+            def text_many_pt(self, texts):
+                return ["many"]*len(texts)
+        self.assertEqual(text.typeset_many_pt(textmanyptengine(), [(0, 1, "a", [])]), ["many"])
+
+
+class TexEnginePoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fakeengine.instances = []
+
+    def waitforidle(self, pool):
+        with pool.condition:
+            while len(pool.idle) < pool.size:
+                pool.condition.wait()
+
+    def testFinishOnReset(self):
+        pool = text.TexEnginePool(fakeengine, size=2)
+        self.waitforidle(pool)
+        box = pool.text_pt(0, 0, "a")
+        pool.reset()
+        self.waitforidle(pool)
+        self.assertEqual(len(fakeengine.instances), 4)
+        for instance in fakeengine.instances[:2]:
+            self.assertEqual(instance.finished, 1)
+        # the text box finishes its instance under the lock of the pool
+        self.assertNotEqual(box.do_finish, fakeengine.instances[0].do_finish)
+        box.do_finish()
+        self.assertFalse(any(instance.finished for instance in fakeengine.instances[2:]))
+
+    def testReplaceDone(self):
+        pool = text.TexEnginePool(fakeengine, size=1)
+        pool.text_pt(0, 0, "a").do_finish()
+        self.assertEqual(pool.text_pt(0, 0, "b").expr, "b")
+        self.waitforidle(pool)
+        self.assertEqual([instance.finished for instance in fakeengine.instances], [1, 0])
+
+    @unittest.skipUnless(shutil.which("tex"), "TeX not available")
+    def testThreadedExtents(self):
+        exprs = ["x", "$x^2$", "Hello, world!", r"\vrule height 1cm depth 2cm width 3cm"] * 5
+        single = text.SingleTexEngine()
+        expected = [(box.left_pt, box.right_pt, box.height_pt, box.depth_pt)
+                    for box in [single.text_pt(0, 0, expr) for expr in exprs]]
+        pool = text.TexEnginePool(text.SingleTexEngine, size=3)
+        results = [None] * len(exprs)
+        def typeset(i):
+            box = pool.text_pt(0, 0, exprs[i])
+            results[i] = box.left_pt, box.right_pt, box.height_pt, box.depth_pt
+        threads = [threading.Thread(target=typeset, args=(i,)) for i in range(len(exprs))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        pool.reset()
+        single.do_finish()
+        self.assertEqual(results, expected)
+
+
+@unittest.skipUnless(shutil.which("tex"), "TeX not available")
+class SingleEngineTestCase(unittest.TestCase):
+
+    def testTextManyError(self):
+        for texipc in [False, True]:
+            engine = text.SingleTexEngine(texipc=texipc)
+            with self.assertRaises(text.TexResultError) as cm:
+                engine.text_many_pt([(0, 0, "first", []), (0, 0, r"\undefinedmacro", []), (0, 0, "last", [])])
+            self.assertIn(r"\undefinedmacro", str(cm.exception))
+            self.assertNotIn("first", str(cm.exception))
+            self.assertNotIn("last", str(cm.exception))
+            # the DVI pages of the failed texts are skipped
+            c = canvas.canvas()
+            boxes = engine.text_many_pt([(0, 0, "x", []), (0, 10, r"\vrule width 1cm height 1cm", [])])
+            for box in boxes:
+                c.insert(box)
+            c.writePDFfile(io.BytesIO())
+            self.assertEqual(len(boxes[1].dvicanvas.items), 1)
+            self.assertEqual(len(boxes[0].dvicanvas.items), 1)
+            self.assertAlmostEqual(unit.topt(boxes[1].width), 72/2.54)
+
+
+class TypesetCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dirname = tempfile.mkdtemp()
+        os.chdir(self.dirname)
+        # a font with a single character "A" of 5pt width and height
+        with open("pyxtest.tfm", "wb") as f:
+            f.write(struct.pack(">12h", 15, 2, 65, 65, 2, 2, 1, 1, 0, 0, 0, 0))
+            f.write(struct.pack(">9l", 0, 10 << 20, (1 << 24) | (1 << 20), 0, 1 << 19, 0, 1 << 19, 0, 0))
+        def bop(page):
+            return struct.pack(">B10ll", 139, ord("P"), ord("y"), ord("X"), page, 0, 0, 0, 0, 0, 0, -1)
+        fntdef = struct.pack(">BBlllBB", 243, 0, 0, 10 << 16, 10 << 16, 0, 7) + b"pyxtest"
+        marker = b"PyX:marker m"
+        self.dvidata = (struct.pack(">BBLLLB", 247, 2, 25400000, 473628672, 1000, 0) +
+                        bop(1) + fntdef + bytes([171, 65, 239, len(marker)]) + marker + bytes([140]) +
+                        bop(2) + bytes([171, 65, 65]) + struct.pack(">Bll", 137, 1 << 16, 1 << 17) + bytes([140, 248]))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dirname)
+
+    def describe(self, items, markers):
+        itembboxes = [item.bbox() for item in items]
+        return ([(type(item).__name__, getattr(item, "charcodes", None), (abbox.llx_pt, abbox.lly_pt, abbox.urx_pt, abbox.ury_pt))
+                 for item, abbox in zip(items, itembboxes)],
+                dict((name, tuple(map(unit.topt, pos))) for name, pos in markers.items()))
+
+    def testPageDVI(self):
+        df = dvifile.DVIfile("test.dvi", data=self.dvidata)
+        for pageno in [1, 2]:
+            page = df.readpage()
+            dvipage = dvifile.DVIfile("page.dvi", data=df.pagedvi()).readpage([ord("P"), ord("y"), ord("X"), pageno, 0, 0, 0, 0, 0, 0])
+            self.assertEqual(self.describe(dvipage.items, dvipage.markers), self.describe(page.items, page.markers))
+        self.assertEqual(len(page.items), 2)
+
+    def testCache(self):
+        df = dvifile.DVIfile("test.dvi", data=self.dvidata)
+        page = df.readpage()
+        cache = text.TypesetCache(os.path.join(self.dirname, "cache"))
+        key = ["version", "engine", ["tex"], "ascii", [], "A", False]
+        self.assertIsNone(cache.get(key))
+        cache.put(key, (1, 2, 3, 4), df.pagedvi())
+        extent_pt, items, markers = cache.get(key)
+        self.assertEqual(extent_pt, (1, 2, 3, 4))
+        self.assertEqual(self.describe(items, markers), self.describe(page.items, page.markers))
+        # the stored key must match
+        with open(cache.filename(key), "rb") as f:
+            header, dvidata = f.read().split(b"\n", 1)
+        with open(cache.filename(key), "wb") as f:
+            f.write(json.dumps({"key": key[:-1] + [True], "extent_pt": [1, 2, 3, 4]}).encode("ascii") + b"\n" + dvidata)
+        self.assertIsNone(cache.get(key))
+        # neither pickled nor broken entries are loaded
+        with open(cache.filename(key), "wb") as f:
+            f.write(b"\x80\x04\x95" + header + b"\n" + dvidata[:-3])
+        with self.assertLogs("pyx", logging.WARNING):
+            self.assertIsNone(cache.get(key))
+        with open(cache.filename(key), "wb") as f:
+            f.write(header + b"\n" + dvidata[:-3])
+        with self.assertLogs("pyx", logging.WARNING):
+            self.assertIsNone(cache.get(key))
+        # temporary files are removed when storing fails
+        os.unlink(cache.filename(key))
+        os.mkdir(cache.filename(key))
+        self.assertRaises(OSError, cache.put, key, (1, 2, 3, 4), dvidata)
+        self.assertEqual(os.listdir(cache.dirname), [os.path.basename(cache.filename(key))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -131,6 +131,37 @@ class TrafoTestCase(unittest.TestCase):
                               (0,1), (-0.5,0.5)), \
                "wrong trafo.translation/trafo.rotation/trafo.scaling definition"
 
+    def testFusedMethods(self):
+        t = trafo.translate(1, 2)*trafo.rotate(30)*trafo.scale(2, 3)
+        for t1, t2 in [(t.translated_pt(3, 4), trafo.translate_pt(3, 4)*t),
+                       (t.translated(3, 4), trafo.translate(3, 4)*t),
+                       (t.rotated_pt(40), trafo.rotate_pt(40)*t),
+                       (t.rotated_pt(40, 3, 4), trafo.rotate_pt(40, 3, 4)*t),
+                       (t.rotated(40, 3, 4), trafo.rotate(40, 3, 4)*t),
+                       (t.scaled_pt(2, 0.5), trafo.scale_pt(2, 0.5)*t),
+                       (t.scaled_pt(2, x=3, y=4), trafo.scale_pt(2, x=3, y=4)*t),
+                       (t.scaled(2, 0.5, 3, 4), trafo.scale(2, 0.5, 3, 4)*t)]:
+            assert isEqual(t1, t2), "fused trafo method not consistent with multiplication result"
+        self.assertRaises(trafo.TrafoException, t.rotated_pt, 40, 3)
+
+    def testIdentityInverseCache(self):
+        t = trafo.rotate(72).translated(1, 2)
+        assert t*trafo.identity is t
+        assert trafo.identity*t is t
+        assert t.inverse() is t.inverse()
+        assert t.inverse().inverse() is t
+        assert isEqual(t.inverse()*t, trafo.trafo())
+        self.assertRaises(AttributeError, setattr, t, "foo", 1)
+
+    def testApplyMany(self):
+        t = trafo.rotate(72).translated_pt(1, 2)
+        points_pt = [0, 0, 1, 0, 3, 4]
+        result = t.apply_pt_many(points_pt)
+        self.assertEqual(len(result), 6)
+        for i in range(0, 6, 2):
+            for x1, x2 in zip(result[i:i+2], t.apply_pt(*points_pt[i:i+2])):
+                self.assertAlmostEqual(x1, x2)
+
 
 if __name__ == "__main__":
     unittest.main()
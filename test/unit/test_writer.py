@@ -0,0 +1,135 @@
+import sys
+if sys.path[0] != "../..":
+    sys.path.insert(0, "../..")
+
+import io, multiprocessing, os, re, time, unittest
+
+from pyx import *
+from pyx import baseclasses, bbox, config, font, writer
+from pyx.font import afmfile
+
+
+class parentonly(baseclasses.canvasitem):
+
+    """canvas item to be processed in the parent process only"""
+
+    def bbox(self):
+        return bbox.empty()
+
+    def requiretextregion(self):
+        return False
+
+    def requiregstate(self):
+        return False
+
+    def processPS(self, file, awriter, context, registry, bbox):
+        writer.checkworkerprocess("test item")
+        file.write("%% parent %i\n" % os.getpid())
+
+    def processPDF(self, file, awriter, context, registry, bbox):
+        writer.checkworkerprocess("test item")
+        file.write("%% parent %i\n" % os.getpid())
+
+
+class finishedmarker(parentonly):
+
+    """canvas item recording the process it was created in"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+
+    def processPS(self, file, awriter, context, registry, bbox):
+        file.write("%% finished %i\n" % self.pid)
+
+    def processPDF(self, file, awriter, context, registry, bbox):
+        file.write("%% finished %i\n" % self.pid)
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork start method not available")
+class WriterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sourcedateepoch = os.environ.get("SOURCE_DATE_EPOCH")
+        os.environ["SOURCE_DATE_EPOCH"] = "0"
+
+    def tearDown(self):
+        if self.sourcedateepoch is None:
+            del os.environ["SOURCE_DATE_EPOCH"]
+        else:
+            os.environ["SOURCE_DATE_EPOCH"] = self.sourcedateepoch
+
+    def writedocument(self, method, parentonlypages=(), **kwargs):
+        pages = []
+        for i in range(7):
+            c = canvas.canvas()
+            c.stroke(path.circle(0, 0, i+1), [color.rgb.red, style.linewidth(0.01*i)])
+            c.fill(path.rect(0, 0, i, 1), [color.gray(0.1*i)])
+            if i in parentonlypages:
+                c.insert(parentonly())
+            pages.append(document.page(c))
+        f = io.BytesIO()
+        getattr(document.document(pages), method)(f, **kwargs)
+        return f.getvalue()
+
+    def testWorkers(self):
+        for method in ["writePSfile", "writePDFfile"]:
+            serial = self.writedocument(method)
+            self.assertEqual(self.writedocument(method, workers=3), serial)
+        serial = self.writedocument("writePDFfile", streaming=True)
+        self.assertEqual(self.writedocument("writePDFfile", streaming=True, workers=3), serial)
+
+    def testParentOnlyPages(self):
+        for method in ["writePSfile", "writePDFfile"]:
+            kwargs = {"compress": False} if method == "writePDFfile" else {}
+            serial = self.writedocument(method, parentonlypages=[1, 4], **kwargs)
+            self.assertEqual(self.writedocument(method, parentonlypages=[1, 4], workers=3, **kwargs), serial)
+            self.assertEqual(serial.count(b"%% parent %i\n" % os.getpid()), 2)
+
+    def testFonts(self):
+        with config.open("Times-Roman", [config.format.afm], ascii=True) as metricfile:
+            times = font.T1builtinfont("Times-Roman", afmfile.AFMfile(metricfile))
+        pages = []
+        for i in range(4):
+            c = canvas.canvas()
+            c.insert(times.text_pt(0, 0, "page %i" % i, 10))
+            pages.append(document.page(c))
+        for method in ["writePSfile", "writePDFfile"]:
+            f = io.BytesIO()
+            getattr(document.document(pages), method)(f, workers=3)
+            # the pages are processed in the worker processes using encodings of their own
+            self.assertEqual(sorted(set(re.findall(rb"Times-Roman-\w+", f.getvalue()))),
+                             [b"Times-Roman-page%iencoding0" % i for i in range(4)])
+
+    def testTextBoxes(self):
+        pages = []
+        for i in range(4):
+            box = text.textextbox_pt(0, 0, 0, 10, 10, 0, None, None, False, [])
+            box.do_finish = lambda box=box: box.setdvipage([finishedmarker()], {})
+            c = canvas.canvas()
+            c.insert(canvas.canvas()).insert(box)
+            pages.append(document.page(c))
+        for method in ["writePSfile", "writePDFfile"]:
+            f = io.BytesIO()
+            getattr(document.document(pages), method)(f, workers=3, **({"compress": False} if method == "writePDFfile" else {}))
+            # the text boxes are finished before processing the pages in worker processes
+            self.assertEqual(f.getvalue().count(b"%% finished %i\n" % os.getpid()), 4)
+
+    def testPagesInFlight(self):
+        processed = multiprocessing.get_context("fork").Value("i", 0)
+        def processpage(page):
+            with processed.get_lock():
+                processed.value += 1
+            return page
+        pages = writer.processpages(list(range(100)), processpage, workers=2)
+        self.assertEqual(next(pages), 0)
+        time.sleep(0.1)
+        self.assertLessEqual(processed.value, 4)
+        self.assertEqual(list(pages), list(range(1, 100)))
+
+    def testProcessPages(self):
+        self.assertEqual(list(writer.processpages(list(range(10)), lambda page: page*page, workers=4)),
+                         [page*page for page in range(10)])
+
+
+if __name__ == "__main__":
+    unittest.main()